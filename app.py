@@ -1,11 +1,80 @@
+import atexit
+import base64
+import gzip
+import io
+import json
+import multiprocessing
 import os
+import shutil
+import socket
+import tempfile
+import threading
 import uuid
-
-from flask import Flask, jsonify, redirect, render_template, request, url_for
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+
+import click
+from flask import (
+    Flask,
+    jsonify,
+    redirect,
+    render_template,
+    request,
+    stream_with_context,
+    url_for,
+)
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import and_, event, insert, or_, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import IntegrityError
+
+from models import (
+    Action,
+    Hand,
+    HandReplay,
+    HandResult,
+    ImportJob,
+    Player,
+    PlayerName,
+    PlayerStats,
+    Position,
+    db,
+)
+from migrations import rebuild_hand_results, rebuild_player_stats, run_migrations
+from equity import (
+    STREET_BOARD_CARDS,
+    EquityCalculator,
+    PreflopEquityTable,
+    build_preflop_table,
+    suits_interact,
+)
+from hand_evaluator import HandEvaluator
+from phh_parser import iter_phh_paths, load_phh_file
+from poker_engine import (
+    PLAYER_STAT_COUNTERS,
+    STREETS,
+    HandState,
+    add_player_stats,
+    count_player_stats,
+    replay_stored_hand,
+)
+from response_cache import create_response_cache
+
 
-from models import Action, Hand, Player, Position, db
-from poker_engine import PokerHandBuilder
+# Bump whenever the replay frames HandState records change so stored timelines are rebuilt
+REPLAY_VERSION = 3
+# Bump when the hand JSON or the detail/replay-ui templates change, so ETags
+# (and cached copies) from the previous rendering are not reused
+HAND_RESPONSE_VERSION = 2
+
+# Failed hands kept per import job for the status endpoint
+IMPORT_JOB_MAX_ERRORS = 100
+# Spool files of streaming imports start with this, so orphans can be found
+IMPORT_SPOOL_PREFIX = "jamnesia-import-"
+
+# Hands fetched per server-side cursor batch when exporting
+EXPORT_BATCH_SIZE = 500
 
 
 def get_poker_positions(player_count):
@@ -37,145 +106,7 @@ def get_poker_positions(player_count):
 def process_hand_actions(players_data, actions, small_blind, big_blind):
     """Process hand actions with automatic street progression based on betting rounds.
     Streets automatically advance when all active players have acted and betting is complete."""
-    player_stacks = {p["name"]: p["stack"] for p in players_data}
-    player_bets = {p["name"]: 0 for p in players_data}
-    processed_actions = []
-    current_pot = 0.0
-    players_with_actions = set()
-    
-    # Track active players (not folded)
-    active_players = set(p["name"] for p in players_data)
-    folded_players = set()
-    
-    # Street progression
-    streets = ["preflop", "flop", "turn", "river"]
-    current_street_index = 0
-    current_street = streets[current_street_index]
-    current_bet = 0
-    
-    # Set initial blinds for preflop
-    if len(players_data) >= 2:
-        sb_player = players_data[0]["name"]
-        bb_player = players_data[1]["name"]
-        player_bets[sb_player] = small_blind
-        player_bets[bb_player] = big_blind
-        current_pot = small_blind + big_blind
-        current_bet = big_blind
-
-    # Track players who have acted in current street
-    players_acted_this_street = set()
-    
-    for action in actions:
-        player_name = action["player_name"]
-        action_type = action["action_type"]
-        amount = action.get("amount", 0)
-
-        # Track players who have actions
-        players_with_actions.add(player_name)
-
-        # Validate player exists and is active
-        if player_name not in player_stacks:
-            raise ValueError(f"Player {player_name} not found")
-        if player_name in folded_players:
-            raise ValueError(f"Player {player_name} has already folded")
-
-        # Process the action
-        if action_type == "fold":
-            folded_players.add(player_name)
-            active_players.discard(player_name)
-            processed_action = {
-                "player_name": player_name,
-                "action_type": "fold",
-                "amount": 0,
-                "street": current_street,
-                "pot_size": current_pot,
-                "remaining_stack": player_stacks[player_name] - player_bets[player_name]
-            }
-            processed_actions.append(processed_action)
-
-        elif action_type == "check":
-            if current_bet > player_bets[player_name]:
-                raise ValueError(f"{player_name} cannot check when there's a bet to call")
-            processed_action = {
-                "player_name": player_name,
-                "action_type": "check",
-                "amount": 0,
-                "street": current_street,
-                "pot_size": current_pot,
-                "remaining_stack": player_stacks[player_name] - player_bets[player_name]
-            }
-            processed_actions.append(processed_action)
-
-        elif action_type == "call":
-            call_amount = max(0, current_bet - player_bets[player_name])
-            available_chips = player_stacks[player_name] - player_bets[player_name]
-            actual_amount = min(call_amount, available_chips)
-            player_bets[player_name] += actual_amount
-            current_pot += actual_amount
-            processed_action = {
-                "player_name": player_name,
-                "action_type": "call",
-                "amount": actual_amount,
-                "street": current_street,
-                "pot_size": current_pot,
-                "remaining_stack": player_stacks[player_name] - player_bets[player_name]
-            }
-            processed_actions.append(processed_action)
-
-        elif action_type in ["bet", "raise"]:
-            total_bet = amount
-            additional_amount = total_bet - player_bets[player_name]
-            available_chips = player_stacks[player_name] - player_bets[player_name]
-            
-            if additional_amount > available_chips:
-                raise ValueError(f"{player_name} cannot bet ${total_bet} (only ${available_chips} additional available)")
-            
-            player_bets[player_name] = total_bet
-            current_bet = max(current_bet, total_bet)
-            current_pot += additional_amount
-            processed_action = {
-                "player_name": player_name,
-                "action_type": action_type,
-                "amount": amount,
-                "street": current_street,
-                "pot_size": current_pot,
-                "remaining_stack": player_stacks[player_name] - player_bets[player_name]
-            }
-            processed_actions.append(processed_action)
-
-        # Mark player as having acted this street
-        players_acted_this_street.add(player_name)
-
-        # Check if betting round is complete and we should advance to next street
-        # Only check after each action, not during action processing
-        if should_advance_street(active_players, folded_players, players_acted_this_street, player_bets, current_bet):
-            # Advance to next street if not at river
-            if current_street_index < len(streets) - 1:
-                current_street_index += 1
-                current_street = streets[current_street_index]
-                current_bet = 0
-                # Reset player bets for new street
-                for p_name in player_bets:
-                    player_bets[p_name] = 0
-                # Reset players who acted this street
-                players_acted_this_street = set()
-
-    # Add fold actions for players who don't have any actions recorded
-    # Auto-folds are added in player order at the end
-    for player in players_data:
-        player_name = player["name"]
-        if player_name not in players_with_actions:
-            fold_action = {
-                "player_name": player_name,
-                "action_type": "fold",
-                "amount": 0,
-                "street": "preflop",  # Auto-folds are always preflop
-                "pot_size": current_pot,
-                "remaining_stack": player_stacks[player_name] - player_bets[player_name]
-            }
-            processed_actions.append(fold_action)
-
-    return processed_actions
+    return HandState(players_data, small_blind, big_blind, record=False).process(actions)
 
 
 def should_advance_street(active_players, folded_players, players_acted_this_street, player_bets, current_bet):
@@ -214,21 +145,121 @@ elif os.path.exists("data"):
     # Render environment - use relative path to data directory
     default_db_path = "sqlite:///data/jamnesia.db"
 
-app.config["SQLALCHEMY_DATABASE_URI"] = os.environ.get(
-    "DATABASE_URL", default_db_path
+
+def normalize_database_url(url):
+    """Accept the postgres:// scheme Heroku and Render hand out.
+
+    SQLAlchemy only recognizes postgresql://, so rewrite the legacy alias.
+    """
+    if url.startswith("postgres://"):
+        return "postgresql://" + url[len("postgres://"):]
+    return url
+
+
+app.config["SQLALCHEMY_DATABASE_URI"] = normalize_database_url(
+    os.environ.get("DATABASE_URL", default_db_path)
 )
+if app.config["SQLALCHEMY_DATABASE_URI"].startswith("postgresql"):
+    # Each gunicorn worker keeps its own pool; size it so
+    # workers * (pool_size + max_overflow) stays under max_connections.
+    app.config["SQLALCHEMY_ENGINE_OPTIONS"] = {
+        "pool_size": int(os.environ.get("DB_POOL_SIZE", 5)),
+        "max_overflow": int(os.environ.get("DB_MAX_OVERFLOW", 10)),
+        "pool_timeout": int(os.environ.get("DB_POOL_TIMEOUT", 30)),
+        "pool_recycle": int(os.environ.get("DB_POOL_RECYCLE", 1800)),
+        "pool_pre_ping": True,  # Drop connections the server closed while idle
+    }
 app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
 app.config["SECRET_KEY"] = os.environ.get("SECRET_KEY", "dev-secret-key")
 
+# Hand list paging
+app.config["HANDS_PAGE_SIZE"] = int(os.environ.get("HANDS_PAGE_SIZE", 50))
+app.config["HANDS_PAGE_SIZE_MAX"] = 500
+# Cap on ?limit= for player-name autocomplete
+app.config["PLAYER_NAMES_LIMIT_MAX"] = 100
+
+# Bulk import: hands written per transaction
+app.config["BULK_IMPORT_CHUNK_SIZE"] = int(os.environ.get("BULK_IMPORT_CHUNK_SIZE", 500))
+# Processes that validate and prepare imported hands (1 = in the request thread)
+app.config["IMPORT_WORKERS"] = int(os.environ.get("IMPORT_WORKERS", 1))
+# Hands per task sent to an import worker
+app.config["IMPORT_WORK_UNIT"] = int(os.environ.get("IMPORT_WORK_UNIT", 50))
+# Where streaming imports spool their upload (None = system temp directory)
+app.config["IMPORT_SPOOL_DIR"] = os.environ.get("IMPORT_SPOOL_DIR")
+# An unfinished import job with no heartbeat for this long has lost its worker
+app.config["IMPORT_JOB_STALE_SECONDS"] = int(os.environ.get("IMPORT_JOB_STALE_SECONDS", 600))
+# On PostgreSQL, player/action batches at least this large are written with COPY
+app.config["POSTGRES_COPY_MIN_ROWS"] = int(os.environ.get("POSTGRES_COPY_MIN_ROWS", 200))
+
+# Where rendered hand/detail/replay responses are cached: "memory" (per
+# worker), "sqlite:///path" (a file shared by all workers) or "redis://..."
+app.config["RESPONSE_CACHE_URL"] = os.environ.get("RESPONSE_CACHE_URL", "memory")
+# Total body size the cache may hold
+app.config["RESPONSE_CACHE_MAX_BYTES"] = int(
+    os.environ.get("RESPONSE_CACHE_MAX_BYTES", 64 * 1024 * 1024)
+)
+
+# Showdown lookup tables, built on first use and memory-mapped by every process
+app.config["HAND_RANK_TABLE"] = os.environ.get(
+    "HAND_RANK_TABLE", os.path.join(app.instance_path, "hand_ranks.npy")
+)
+# Equity spots with more runouts than EQUITY_EXACT_LIMIT are sampled instead of
+# enumerated, EQUITY_SAMPLES boards from a generator seeded with EQUITY_SEED;
+# each worker remembers the last EQUITY_CACHE_SIZE spots
+app.config["EQUITY_SAMPLES"] = int(os.environ.get("EQUITY_SAMPLES", 20000))
+app.config["EQUITY_EXACT_LIMIT"] = int(os.environ.get("EQUITY_EXACT_LIMIT", 50000))
+app.config["EQUITY_SEED"] = int(os.environ.get("EQUITY_SEED", 0))
+app.config["EQUITY_CACHE_SIZE"] = int(os.environ.get("EQUITY_CACHE_SIZE", 4096))
+# Heads-up preflop equities of the 169 starting hands, written by
+# `flask build-preflop-equity` and memory-mapped when the app starts
+app.config["PREFLOP_EQUITY_TABLE"] = os.environ.get(
+    "PREFLOP_EQUITY_TABLE", os.path.join(app.instance_path, "preflop_equity.npy")
+)
+
+# Applied to every new SQLite connection so several gunicorn workers can share
+# one database file: WAL lets readers run alongside the single writer, and
+# busy_timeout makes a second writer wait for the lock instead of failing.
+app.config["SQLITE_PRAGMAS"] = {
+    "journal_mode": "WAL",
+    "busy_timeout": int(os.environ.get("SQLITE_BUSY_TIMEOUT_MS", 5000)),
+    "synchronous": "NORMAL",  # Safe with WAL; fsync only at checkpoints
+    "mmap_size": 256 * 1024 * 1024,
+    "cache_size": -64 * 1024,  # Negative = KiB, i.e. 64 MiB per connection
+}
+
 db.init_app(app)
+response_cache = create_response_cache(
+    app.config["RESPONSE_CACHE_URL"], app.config["RESPONSE_CACHE_MAX_BYTES"]
+)
+
+
+def set_sqlite_pragmas(dbapi_connection, connection_record):
+    """Apply SQLITE_PRAGMAS to a freshly opened SQLite connection"""
+    cursor = dbapi_connection.cursor()
+    for name, value in app.config["SQLITE_PRAGMAS"].items():
+        cursor.execute(f"PRAGMA {name} = {value}")
+    cursor.close()
+
+
+with app.app_context():
+    if db.engine.dialect.name == "sqlite":
+        event.listen(db.engine, "connect", set_sqlite_pragmas)
+
+
+def migrate_database():
+    """Bring the schema up to date; run once per process start, never per request"""
+    with app.app_context():
+        return run_migrations(db.engine)
 
 
-@app.before_request
-def create_tables():
-    """Create tables on first startup"""
-    if not hasattr(create_tables, "_called"):
-        db.create_all()
-        create_tables._called = True
+@app.cli.command("migrate")
+def migrate_command():
+    """Apply pending schema migrations."""
+    applied = migrate_database()
+    for version, description in applied:
+        click.echo(f"Applied migration {version}: {description}")
+    if not applied:
+        click.echo("Database schema is up to date")
 
 
 @app.route("/")
@@ -243,134 +274,795 @@ def input_form():
     return render_template("input.html")
 
 
+def prepare_hand(data):
+    """Validate a hand payload and build the rows to store for it.
+
+    A single HandState pass validates the actions and produces the PHH content
+    and the serialized replay timelines. Raises ValueError when the hand is
+    invalid.
+    """
+    # Check required fields
+    required_fields = ["players", "actions"]
+    for field in required_fields:
+        if field not in data:
+            raise ValueError(f"Missing required field: {field}")
+
+    # Validate maximum number of players
+    players_data = data["players"]
+    if len(players_data) >= 10:
+        raise ValueError("Maximum of 9 players allowed")
+
+    # Generate play ID if not specified
+    play_id = data.get("play_id", str(uuid.uuid4()))
+    small_blind = data.get("small_blind", 1.0)
+    big_blind = data.get("big_blind", 2.0)
+    hole_cards = data.get("hole_cards", {})
+
+    # Combine board cards into single string if separated
+    board_string = data.get("board", "")
+    if not board_string:
+        # Try to build from separate flop/turn/river fields
+        if "flop" in data and data["flop"]:
+            board_string += data["flop"]
+        if "turn" in data and data["turn"]:
+            board_string += data["turn"]
+        if "river" in data and data["river"]:
+            board_string += data["river"]
+
+    # Player rows with position strings
+    positions = None
+    players = []
+    for i, player_data in enumerate(players_data):
+        # Use position from frontend if provided, otherwise calculate
+        position = player_data.get("position")
+        if not position:
+            positions = positions or get_poker_positions(len(players_data))
+            position = positions[i]
+        players.append(
+            {
+                "name": player_data["name"],
+                "stack": player_data["stack"],
+                "hole_cards": hole_cards.get(player_data["name"], ""),
+                "position": position,
+            }
+        )
+
+    # One pass validates the actions and records the PHH lines and replay frames
+    state = HandState(players, small_blind, big_blind, board_string)
+    processed_actions = state.process(data["actions"])
+    # The rank table is only mapped for hands that reach a showdown
+    showdown = state.showdown(get_hand_evaluator() if state.contested_showdown() else None)
+
+    # Action rows with corrected amounts; finish()'s auto-folds come last
+    first_auto_fold = len(processed_actions) - len(state.auto_folded)
+    actions = [
+        {
+            "street": action_data.get("street", "preflop"),
+            "player_name": action_data["player_name"],
+            "action_type": action_data["action_type"],
+            "amount": action_data.get("amount", 0),
+            "pot_size": action_data.get("pot_size", 0.0),
+            "remaining_stack": action_data.get("remaining_stack", 0.0),
+            "action_order": i,
+            "auto_folded": i >= first_auto_fold,
+        }
+        for i, action_data in enumerate(processed_actions)
+    ]
+
+    hand = {
+        "play_id": play_id,
+        "game_type": data.get("game_type", "No Limit Texas Holdem"),
+        "board": board_string,
+        "small_blind": small_blind,
+        "big_blind": big_blind,
+        "phh_content": state.phh(
+            data["hole_cards"] if "hole_cards" in data else {},
+            {street: data[street] for street in ("flop", "turn", "river") if street in data},
+        ),
+        "created_at": datetime.utcnow(),
+    }
+    replay_data = state.replay(play_id, replay_meta(hand))
+    return {
+        "hand": hand,
+        "players": players,
+        "actions": actions,
+        "stats": count_player_stats(
+            [player["name"] for player in players], processed_actions, state.auto_folded
+        ),
+        "results": [
+            dict(result, player_name=name) for name, result in showdown["results"].items()
+        ],
+        "replays": {
+            replay_format: serialize_replay(encode(replay_data))
+            for replay_format, encode in REPLAY_FORMATS.items()
+        },
+    }
+
+
+def dialect_insert(model):
+    """INSERT construct with ON CONFLICT support for the current database.
+
+    Returns None on dialects without native upserts so callers can fall back.
+    """
+    dialect = db.session.get_bind().dialect.name
+    if dialect == "postgresql":
+        return postgresql.insert(model)
+    if dialect == "sqlite":
+        return sqlite.insert(model)
+    return None
+
+
+def record_player_names(names):
+    """Add names to the player_names autocomplete table, skipping known ones"""
+    rows = [{"name": name, "name_key": PlayerName.key_for(name)} for name in set(names) if name]
+    if not rows:
+        return
+
+    statement = dialect_insert(PlayerName)
+    if statement is not None:
+        statement = statement.on_conflict_do_nothing()
+    else:
+        known = set(
+            db.session.scalars(
+                select(PlayerName.name).where(PlayerName.name.in_([row["name"] for row in rows]))
+            )
+        )
+        rows = [row for row in rows if row["name"] not in known]
+        if not rows:
+            return
+        statement = insert(PlayerName)
+    db.session.execute(statement, rows)
+
+
+def record_player_stats(hand_stats):
+    """Add the stat counts of newly inserted hands to player_stats.
+
+    One upsert for the batch increments existing rows in place. Rows are
+    written in name order so concurrent imports lock them in the same order.
+    """
+    totals = {}
+    for stats in hand_stats:
+        add_player_stats(totals, stats)
+    if not totals:
+        return
+    rows = [dict(totals[name], name=name) for name in sorted(totals)]
+
+    statement = dialect_insert(PlayerStats)
+    if statement is not None:
+        statement = statement.on_conflict_do_update(
+            index_elements=["name"],
+            set_={
+                counter: getattr(PlayerStats, counter) + getattr(statement.excluded, counter)
+                for counter in PLAYER_STAT_COUNTERS
+            },
+        )
+        db.session.execute(statement, rows)
+        return
+
+    existing = {
+        stats.name: stats
+        for stats in PlayerStats.query.filter(PlayerStats.name.in_(list(totals)))
+    }
+    new_rows = []
+    for row in rows:
+        stats = existing.get(row["name"])
+        if stats is None:
+            new_rows.append(row)
+            continue
+        for counter in PLAYER_STAT_COUNTERS:
+            setattr(stats, counter, getattr(stats, counter) + row[counter])
+    if new_rows:
+        db.session.execute(insert(PlayerStats), new_rows)
+
+
+def copy_csv(columns, rows):
+    """Serialize rows as COPY ... WITH (FORMAT csv) input.
+
+    Strings are always quoted so an empty string stays distinct from NULL,
+    which CSV COPY reads from an unquoted empty field.
+    """
+    buffer = io.StringIO()
+    for row in rows:
+        fields = []
+        for column in columns:
+            value = column_value(column, row)
+            if value is None:
+                fields.append("")
+            elif isinstance(value, str):
+                fields.append('"' + value.replace('"', '""') + '"')
+            else:
+                fields.append(str(value))
+        buffer.write(",".join(fields) + "\n")
+    buffer.seek(0)
+    return buffer
+
+
+def column_value(column, row):
+    """Value for column in row, applying the model default when absent"""
+    if column.key in row:
+        return row[column.key]
+    default = column.default
+    if default is None:
+        return None
+    if default.is_callable:
+        return default.arg(None)
+    return default.arg
+
+
+def copy_rows(model, rows):
+    """Bulk-write rows with PostgreSQL COPY on the session's connection"""
+    table = model.__table__
+    columns = [column for column in table.columns if not column.primary_key]
+    statement = (
+        f"COPY {table.name} ({', '.join(column.name for column in columns)}) "
+        "FROM STDIN WITH (FORMAT csv)"
+    )
+    buffer = copy_csv(columns, rows)
+
+    cursor = db.session.connection().connection.dbapi_connection.cursor()
+    try:
+        if hasattr(cursor, "copy_expert"):  # psycopg2
+            cursor.copy_expert(statement, buffer)
+        else:  # psycopg 3
+            with cursor.copy(statement) as copy:
+                copy.write(buffer.getvalue())
+    finally:
+        cursor.close()
+
+
+def bulk_insert(model, rows):
+    """executemany INSERT, switching to COPY for large PostgreSQL batches"""
+    if (
+        db.session.get_bind().dialect.name == "postgresql"
+        and len(rows) >= app.config["POSTGRES_COPY_MIN_ROWS"]
+    ):
+        copy_rows(model, rows)
+    else:
+        db.session.execute(insert(model), rows)
+
+
+def insert_prepared_hands(prepared_hands):
+    """Insert prepared hands with one executemany per table.
+
+    Does not commit, so callers decide the transaction boundaries. Returns the
+    new hand ids in the order of prepared_hands.
+    """
+    if not prepared_hands:
+        return []
+
+    db.session.execute(insert(Hand), [prepared["hand"] for prepared in prepared_hands])
+    play_ids = [prepared["hand"]["play_id"] for prepared in prepared_hands]
+    id_by_play_id = dict(
+        db.session.execute(
+            select(Hand.play_id, Hand.id).where(Hand.play_id.in_(play_ids))
+        ).all()
+    )
+    hand_ids = [id_by_play_id[play_id] for play_id in play_ids]
+
+    player_rows = []
+    action_rows = []
+    result_rows = []
+    replay_rows = []
+    for hand_id, prepared in zip(hand_ids, prepared_hands):
+        player_rows.extend(dict(row, hand_id=hand_id) for row in prepared["players"])
+        action_rows.extend(dict(row, hand_id=hand_id) for row in prepared["actions"])
+        result_rows.extend(dict(row, hand_id=hand_id) for row in prepared.get("results", ()))
+        replay_rows.extend(
+            {"hand_id": hand_id, "format": replay_format, "version": REPLAY_VERSION, "payload": payload}
+            for replay_format, payload in prepared.get("replays", {}).items()
+        )
+    if player_rows:
+        bulk_insert(Player, player_rows)
+        record_player_names(row["name"] for row in player_rows)
+        record_player_stats(prepared["stats"] for prepared in prepared_hands if "stats" in prepared)
+    if action_rows:
+        bulk_insert(Action, action_rows)
+    if result_rows:
+        bulk_insert(HandResult, result_rows)
+    if replay_rows:
+        db.session.execute(insert(HandReplay), replay_rows)
+
+    return hand_ids
+
+
 @app.route("/api/save-hand", methods=["POST"])
 def save_hand():
     """Save hand to database"""
     try:
         data = request.get_json()
 
-        # Check required fields
-        required_fields = ["players", "actions"]
-        for field in required_fields:
-            if field not in data:
-                return jsonify({"error": f"Missing required field: {field}"}), 400
+        try:
+            prepared = prepare_hand(data)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
 
-        # Validate maximum number of players
-        players_data = data["players"]
-        if len(players_data) >= 10:
-            return jsonify({"error": "Maximum of 9 players allowed"}), 400
+        hand_id = insert_prepared_hands([prepared])[0]
+        db.session.commit()
 
-        # Generate play ID if not specified
-        play_id = data.get("play_id", str(uuid.uuid4()))
+        return jsonify(
+            {
+                "status": "success",
+                "hand_id": hand_id,
+                "play_id": prepared["hand"]["play_id"],
+                "phh_content": prepared["hand"]["phh_content"],
+            }
+        )
 
-        # Build hand with PokerKit
-        builder = PokerHandBuilder()
-        players_data = data["players"]
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({"error": str(e)}), 500
 
-        builder.create_game(
-            players=players_data,
-            small_blind=data.get("small_blind", 1.0),
-            big_blind=data.get("big_blind", 2.0),
-        )
 
-        # Set hole cards
-        if "hole_cards" in data:
-            builder.deal_hole_cards(data["hole_cards"])
+def read_bulk_hands():
+    """Read the hands of a bulk import request body.
 
-        # Process actions using shared logic
+    Accepts a JSON array, a {"hands": [...]} object, or NDJSON (one hand per
+    line) when the content type is application/x-ndjson.
+    """
+    if request.mimetype == "application/x-ndjson":
+        return [
+            json.loads(line)
+            for line in request.get_data(as_text=True).splitlines()
+            if line.strip()
+        ]
+
+    data = request.get_json()
+    if isinstance(data, dict):
+        data = data.get("hands")
+    if not isinstance(data, list):
+        raise ValueError("Expected a JSON array of hands")
+    return data
+
+
+def prepare_hand_entries(chunk, start_index=0):
+    """Validate and prepare a list of hands without touching the database.
+
+    Returns a (result, prepared) pair per input hand, in input order; prepared
+    is None when the hand failed. Items that are exceptions (e.g. unparsable
+    NDJSON lines) are reported as errors. Runs in import worker processes, so
+    everything it returns must pickle.
+    """
+    entries = []
+    for index, data in enumerate(chunk, start=start_index):
+        result = {"index": index}
         try:
-            processed_actions = process_hand_actions(
-                players_data, 
-                data["actions"], 
-                data.get("small_blind", 1.0), 
-                data.get("big_blind", 2.0)
+            if isinstance(data, Exception):
+                raise ValueError(str(data))
+            if not isinstance(data, dict):
+                raise ValueError("Hand must be a JSON object")
+            prepared = prepare_hand(data)
+        except (ValueError, KeyError, TypeError) as e:
+            result.update(status="error", error=str(e))
+            entries.append((result, None))
+            continue
+        result["play_id"] = prepared["hand"]["play_id"]
+        entries.append((result, prepared))
+    return entries
+
+
+def store_hand_entries(entries):
+    """Store prepared hands in a single transaction.
+
+    Takes the pairs from prepare_hand_entries and returns their result dicts,
+    in order, updated with the outcome of the write.
+    """
+    prepared_hands = [prepared for _, prepared in entries if prepared is not None]
+    prepared_results = [result for result, prepared in entries if prepared is not None]
+
+    # Reject play_ids that already exist or repeat within the chunk
+    existing = set(
+        db.session.execute(
+            select(Hand.play_id).where(
+                Hand.play_id.in_([r["play_id"] for r in prepared_results])
             )
-        except ValueError as e:
-            return jsonify({"error": str(e)}), 400
+        ).scalars()
+    )
+    unique_hands = []
+    unique_results = []
+    for prepared, result in zip(prepared_hands, prepared_results):
+        if result["play_id"] in existing:
+            result.update(
+                status="error", error=f"Duplicate play_id: {result['play_id']}"
+            )
+            continue
+        existing.add(result["play_id"])
+        unique_hands.append(prepared)
+        unique_results.append(result)
 
-        # Add actions to builder
-        for action in processed_actions:
-            builder.add_action(action["player_name"], action["action_type"], action.get("amount", 0))
-
-        # Set board cards
-        if "flop" in data:
-            builder.deal_flop(data["flop"])
-        if "turn" in data:
-            builder.deal_turn(data["turn"])
-        if "river" in data:
-            builder.deal_river(data["river"])
-
-        # Generate PHH
-        phh_content = builder.generate_phh()
-
-        # Combine board cards into single string if separated
-        board_string = data.get("board", "")
-        if not board_string:
-            # Try to build from separate flop/turn/river fields
-            if "flop" in data and data["flop"]:
-                board_string += data["flop"]
-            if "turn" in data and data["turn"]:
-                board_string += data["turn"]
-            if "river" in data and data["river"]:
-                board_string += data["river"]
-
-        # Save to database
-        hand = Hand(
-            play_id=play_id,
-            game_type=data.get("game_type", "No Limit Texas Holdem"),
-            board=board_string,
-            small_blind=data.get("small_blind", 1.0),
-            big_blind=data.get("big_blind", 2.0),
-            phh_content=phh_content,
-        )
+    try:
+        hand_ids = insert_prepared_hands(unique_hands)
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        for result in unique_results:
+            result.update(status="error", error=str(e))
+    else:
+        for hand_id, result in zip(hand_ids, unique_results):
+            result.update(status="success", hand_id=hand_id)
+
+    return [result for result, _ in entries]
 
-        db.session.add(hand)
-        db.session.flush()  # Get ID
-
-        # Save player information with position strings
-        for i, player_data in enumerate(players_data):
-            # Use position from frontend if provided, otherwise calculate
-            position = player_data.get("position")
-            if not position:
-                positions = get_poker_positions(len(players_data))
-                position = positions[i]
-            player = Player(
-                hand_id=hand.id,
-                name=player_data["name"],
-                stack=player_data["stack"],
-                hole_cards=data.get("hole_cards", {}).get(player_data["name"], ""),
-                position=position,
+
+_hand_evaluator = None
+_hand_evaluator_lock = threading.Lock()
+
+
+def get_hand_evaluator():
+    """The showdown evaluator, mapping HAND_RANK_TABLE on first use in each process"""
+    global _hand_evaluator
+    with _hand_evaluator_lock:
+        if _hand_evaluator is None:
+            _hand_evaluator = HandEvaluator.load(app.config["HAND_RANK_TABLE"])
+        return _hand_evaluator
+
+
+_equity_calculator = None
+_equity_calculator_lock = threading.Lock()
+
+
+def get_equity_calculator():
+    """This process's equity calculator and its cache of computed spots"""
+    global _equity_calculator
+    with _equity_calculator_lock:
+        if _equity_calculator is None:
+            _equity_calculator = EquityCalculator(
+                get_hand_evaluator(),
+                samples=app.config["EQUITY_SAMPLES"],
+                exact_limit=app.config["EQUITY_EXACT_LIMIT"],
+                seed=app.config["EQUITY_SEED"],
+                cache_size=app.config["EQUITY_CACHE_SIZE"],
             )
-            db.session.add(player)
-
-        # Save action information with corrected amounts
-        for i, action_data in enumerate(processed_actions):
-            action = Action(
-                hand_id=hand.id,
-                street=action_data.get("street", "preflop"),
-                player_name=action_data["player_name"],
-                action_type=action_data["action_type"],
-                amount=action_data.get("amount", 0),
-                pot_size=action_data.get("pot_size", 0.0),
-                remaining_stack=action_data.get("remaining_stack", 0.0),
-                action_order=i,
+        return _equity_calculator
+
+
+preflop_equity = None
+
+
+def load_preflop_equity():
+    """Map PREFLOP_EQUITY_TABLE if it has been built (None until then)"""
+    global preflop_equity
+    path = app.config["PREFLOP_EQUITY_TABLE"]
+    preflop_equity = PreflopEquityTable.load(path) if os.path.exists(path) else None
+    return preflop_equity
+
+
+load_preflop_equity()
+
+
+_prepare_pool = None
+_prepare_pool_workers = 0  # IMPORT_WORKERS the pool was started with
+_prepare_pool_lock = threading.Lock()
+
+
+def get_prepare_pool():
+    """The shared process pool for import validation, or None to prepare inline.
+
+    Created on first use in each process (so after gunicorn forks) with
+    IMPORT_WORKERS processes. The workers are started by a fork server rather
+    than forked from this possibly multi-threaded process.
+    """
+    global _prepare_pool, _prepare_pool_workers
+    workers = app.config["IMPORT_WORKERS"]
+    if workers <= 1:
+        return None
+    with _prepare_pool_lock:
+        if _prepare_pool is None or _prepare_pool_workers != workers:
+            if _prepare_pool is not None:
+                _prepare_pool.shutdown()
+            methods = multiprocessing.get_all_start_methods()
+            context = multiprocessing.get_context(
+                "forkserver" if "forkserver" in methods else "spawn"
             )
-            db.session.add(action)
+            _prepare_pool = ProcessPoolExecutor(max_workers=workers, mp_context=context)
+            _prepare_pool_workers = workers
+        return _prepare_pool
+
+
+def shutdown_prepare_pool():
+    """Stop the import worker processes, if any were started"""
+    global _prepare_pool
+    with _prepare_pool_lock:
+        if _prepare_pool is not None:
+            _prepare_pool.shutdown()
+            _prepare_pool = None
+
+
+atexit.register(shutdown_prepare_pool)
+
+
+def iter_prepared_chunks(chunks, pool=None, start_index=0):
+    """Yield prepare_hand_entries output for each chunk, in chunk order.
+
+    With a pool, each chunk is split into IMPORT_WORK_UNIT sized tasks so
+    pickling is amortized over several hands, and the next chunk is already
+    being prepared while the caller writes the current one. Results are
+    re-sequenced into input order, so writes happen in the order hands
+    arrived.
+    """
+    index = start_index
+    if pool is None:
+        for chunk in chunks:
+            yield prepare_hand_entries(chunk, index)
+            index += len(chunk)
+        return
+
+    unit = app.config["IMPORT_WORK_UNIT"]
+    pending = deque()
+    for chunk in chunks:
+        pending.append(
+            [
+                pool.submit(prepare_hand_entries, chunk[offset : offset + unit], index + offset)
+                for offset in range(0, len(chunk), unit)
+            ]
+        )
+        index += len(chunk)
+        # Keep one chunk in flight ahead of the one being written
+        if len(pending) > 1:
+            yield [entry for future in pending.popleft() for entry in future.result()]
+    while pending:
+        yield [entry for future in pending.popleft() for entry in future.result()]
+
+
+def import_hands(hands, chunk_size):
+    """Validate and store hands in chunks, one transaction per chunk.
+
+    Returns one result dict per input hand, in input order.
+    """
+    results = []
+    for entries in iter_prepared_chunks(iter_chunks(hands, chunk_size), get_prepare_pool()):
+        results.extend(store_hand_entries(entries))
+    return results
+
+
+@app.route("/api/hands/bulk", methods=["POST"])
+def bulk_import_hands():
+    """Import many hands in one request with batched inserts"""
+    try:
+        hands = read_bulk_hands()
+        chunk_size = int(
+            request.args.get("chunk_size", app.config["BULK_IMPORT_CHUNK_SIZE"])
+        )
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be positive")
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    results = import_hands(hands, chunk_size)
+    failed = sum(1 for result in results if result["status"] == "error")
+    return jsonify(
+        {
+            "status": "success" if not failed else "partial",
+            "total": len(results),
+            "succeeded": len(results) - failed,
+            "failed": failed,
+            "results": results,
+        }
+    )
+
+
+def iter_ndjson(stream):
+    """Yield one parsed hand per non-blank NDJSON line.
+
+    Lines that are not valid JSON are yielded as the ValueError describing
+    them, so callers can report them without stopping the stream.
+    """
+    for line_number, line in enumerate(stream, start=1):
+        if not line.strip():
+            continue
+        try:
+            yield json.loads(line)
+        except ValueError as e:
+            yield ValueError(f"Line {line_number}: invalid JSON ({e})")
+
+
+def iter_chunks(items, chunk_size):
+    """Group an iterable into lists of at most chunk_size items"""
+    chunk = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) == chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def import_job_owner():
+    """Owner id stored on the import jobs this process runs"""
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def import_job_owner_alive(owner):
+    """False when owner is a process on this host that has exited, else True.
+
+    Owners on other hosts cannot be checked and count as alive; their jobs go
+    stale through the heartbeat instead.
+    """
+    host, _, pid = owner.rpartition(":")
+    if host != socket.gethostname() or not pid.isdigit():
+        return True
+    try:
+        os.kill(int(pid), 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
 
+def import_job_is_stale(job, now=None):
+    """Whether an unfinished job's worker is gone (exited or silent too long)"""
+    if job.status not in ("queued", "running"):
+        return False
+    if job.owner and not import_job_owner_alive(job.owner):
+        return True
+    last_seen = job.heartbeat_at or job.created_at
+    limit = timedelta(seconds=app.config["IMPORT_JOB_STALE_SECONDS"])
+    return last_seen is not None and (now or datetime.utcnow()) - last_seen > limit
+
+
+def fail_import_job(job, error):
+    """Mark a job failed with error and remove its spool file (commit separately)"""
+    job.status = "failed"
+    job.errors = json.dumps(json.loads(job.errors or "[]") + [{"error": error}])
+    job.finished_at = datetime.utcnow()
+    if job.spool_path:
+        try:
+            os.unlink(job.spool_path)
+        except FileNotFoundError:
+            pass
+
+
+def recover_import_jobs():
+    """Fail import jobs whose worker died and delete spool files no job uses.
+
+    Runs at startup (gunicorn's master, ``python app.py``) after migrations;
+    a recycled, redeployed or crashed worker takes its import threads with
+    it. Returns (failed jobs, removed spool files).
+    """
+    with app.app_context():
+        unfinished = ImportJob.query.filter(ImportJob.status.in_(("queued", "running"))).all()
+        stale = [job for job in unfinished if import_job_is_stale(job)]
+        for job in stale:
+            fail_import_job(job, "Import worker stopped before the job finished")
         db.session.commit()
+        in_use = {job.spool_path for job in unfinished if job not in stale}
+        db.session.remove()
+
+    removed = 0
+    spool_dir = app.config["IMPORT_SPOOL_DIR"] or tempfile.gettempdir()
+    for name in os.listdir(spool_dir):
+        path = os.path.join(spool_dir, name)
+        if name.startswith(IMPORT_SPOOL_PREFIX) and path not in in_use:
+            try:
+                os.unlink(path)
+                removed += 1
+            except FileNotFoundError:
+                pass
+    return len(stale), removed
 
-        return jsonify(
-            {
-                "status": "success",
-                "hand_id": hand.id,
-                "play_id": play_id,
-                "phh_content": phh_content,
-            }
+
+def run_import_job(job_id, spool_path, chunk_size):
+    """Import a spooled NDJSON file in rolling batches, recording progress.
+
+    Only one batch of hands is held in memory at a time, so memory stays flat
+    however many hands the file contains.
+    """
+    with app.app_context():
+        job = db.session.get(ImportJob, job_id)
+        job.status = "running"
+        job.heartbeat_at = datetime.utcnow()
+        db.session.commit()
+        errors = []
+        try:
+            with open(spool_path, "rb") as spool:
+                chunks = iter_chunks(iter_ndjson(spool), chunk_size)
+                for entries in iter_prepared_chunks(chunks, get_prepare_pool()):
+                    results = store_hand_entries(entries)
+                    failed = [r for r in results if r["status"] == "error"]
+                    errors.extend(failed[: IMPORT_JOB_MAX_ERRORS - len(errors)])
+
+                    job = db.session.get(ImportJob, job_id)
+                    job.processed += len(results)
+                    job.failed += len(failed)
+                    job.succeeded += len(results) - len(failed)
+                    job.errors = json.dumps(errors)
+                    job.heartbeat_at = datetime.utcnow()
+                    db.session.commit()
+            job.status = "completed"
+        except Exception as e:
+            db.session.rollback()
+            job = db.session.get(ImportJob, job_id)
+            job.status = "failed"
+            job.errors = json.dumps(errors + [{"error": str(e)}])
+        finally:
+            job.finished_at = datetime.utcnow()
+            db.session.commit()
+            db.session.remove()
+            if os.path.exists(spool_path):
+                os.unlink(spool_path)
+
+
+@app.route("/api/hands/import", methods=["POST"])
+def start_import_job():
+    """Start a streaming NDJSON import and return a job id to poll.
+
+    The request body is copied to a spool file in fixed-size blocks and
+    imported by a background thread, so neither step holds the whole upload
+    in memory.
+    """
+    try:
+        chunk_size = int(
+            request.args.get("chunk_size", app.config["BULK_IMPORT_CHUNK_SIZE"])
         )
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be positive")
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
 
+    spool_fd, spool_path = tempfile.mkstemp(
+        prefix=IMPORT_SPOOL_PREFIX, suffix=".ndjson", dir=app.config["IMPORT_SPOOL_DIR"]
+    )
+    # Recorded before the upload so recovery knows the spool file is in use
+    job = ImportJob(
+        id=str(uuid.uuid4()),
+        status="queued",
+        owner=import_job_owner(),
+        heartbeat_at=datetime.utcnow(),
+        spool_path=spool_path,
+    )
+    db.session.add(job)
+    db.session.commit()
+    try:
+        with os.fdopen(spool_fd, "wb") as spool:
+            shutil.copyfileobj(request.stream, spool)
     except Exception as e:
-        db.session.rollback()
-        return jsonify({"error": str(e)}), 500
+        fail_import_job(job, f"Upload failed: {e}")
+        db.session.commit()
+        raise
+    job.heartbeat_at = datetime.utcnow()
+    db.session.commit()
+
+    threading.Thread(
+        target=run_import_job,
+        args=(job.id, spool_path, chunk_size),
+        daemon=True,
+    ).start()
+
+    return (
+        jsonify(
+            {
+                "job_id": job.id,
+                "status": job.status,
+                "status_url": url_for("get_import_job", job_id=job.id),
+            }
+        ),
+        202,
+    )
+
+
+@app.route("/api/import-jobs/<job_id>")
+def get_import_job(job_id):
+    """Get progress of a streaming import job"""
+    job = db.session.get(ImportJob, job_id)
+    if not job:
+        return jsonify({"error": "Import job not found"}), 404
+    if import_job_is_stale(job):
+        fail_import_job(job, "Import worker stopped before the job finished")
+        db.session.commit()
+
+    return jsonify(
+        {
+            "job_id": job.id,
+            "status": job.status,
+            "processed": job.processed,
+            "succeeded": job.succeeded,
+            "failed": job.failed,
+            "errors": json.loads(job.errors or "[]"),
+            "created_at": job.created_at.isoformat(),
+            "finished_at": job.finished_at.isoformat() if job.finished_at else None,
+        }
+    )
 
 
 def get_sample_hand_patterns():
@@ -542,7 +1234,7 @@ def get_sample_hand_patterns():
         },
         "all_in": {
             "name": "All-in Showdown",
-            "description": "Short stack goes all-in preflop",
+            "description": "Short stack goes all-in preflop, the others build a side pot",
             "players": [
                 {"name": "ShortStack", "stack": 15.0},  # SB
                 {"name": "BigStack", "stack": 200.0},   # BB
@@ -583,45 +1275,47 @@ def get_sample_hand_patterns():
                 },
                 {
                     "player_name": "BigStack",
-                    "action_type": "check",
+                    "action_type": "bet",
+                    "amount": 20.0,  # Side pot between the two bigger stacks
                     "street": "flop",
-                    "pot_size": 45.0,
-                    "remaining_stack": 185.0,
+                    "pot_size": 65.0,
+                    "remaining_stack": 165.0,
                 },
                 {
                     "player_name": "MidStack",
-                    "action_type": "check",
+                    "action_type": "call",
+                    "amount": 20.0,
                     "street": "flop",
-                    "pot_size": 45.0,
-                    "remaining_stack": 60.0,
+                    "pot_size": 85.0,
+                    "remaining_stack": 40.0,
                 },
                 {
                     "player_name": "BigStack",
                     "action_type": "check",
                     "street": "turn",
-                    "pot_size": 45.0,
-                    "remaining_stack": 185.0,
+                    "pot_size": 85.0,
+                    "remaining_stack": 165.0,
                 },
                 {
                     "player_name": "MidStack",
                     "action_type": "check",
                     "street": "turn",
-                    "pot_size": 45.0,
-                    "remaining_stack": 60.0,
+                    "pot_size": 85.0,
+                    "remaining_stack": 40.0,
                 },
                 {
                     "player_name": "BigStack",
                     "action_type": "check",
                     "street": "river",
-                    "pot_size": 45.0,
-                    "remaining_stack": 185.0,
+                    "pot_size": 85.0,
+                    "remaining_stack": 165.0,
                 },
                 {
                     "player_name": "MidStack",
                     "action_type": "check",
                     "street": "river",
-                    "pot_size": 45.0,
-                    "remaining_stack": 60.0,
+                    "pot_size": 85.0,
+                    "remaining_stack": 40.0,
                 },
             ],
             "small_blind": 1.0,
@@ -901,147 +1595,244 @@ def create_sample():
         sample_hand_data["play_id"] = str(uuid.uuid4())  # Add unique play_id
 
         # Use the same validation logic as save_hand
-        data = sample_hand_data
+        try:
+            prepared = prepare_hand(sample_hand_data)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 500
 
-        # Validate maximum number of players
-        players_data = data["players"]
-        if len(players_data) >= 10:
-            return jsonify({"error": "Maximum of 9 players allowed"}), 400
+        hand_id = insert_prepared_hands([prepared])[0]
+        db.session.commit()
 
-        play_id = data.get("play_id", str(uuid.uuid4()))
+        return jsonify(
+            {
+                "status": "success",
+                "hand_id": hand_id,
+                "play_id": prepared["hand"]["play_id"],
+            }
+        )
+
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({"error": str(e)}), 500
 
-        # Build hand with PokerKit
-        builder = PokerHandBuilder()
 
-        builder.create_game(
-            players=players_data,
-            small_blind=data.get("small_blind", 1.0),
-            big_blind=data.get("big_blind", 2.0),
+def encode_hand_cursor(created_at, hand_id):
+    """Encode a (created_at, id) keyset position as an opaque cursor string"""
+    raw = f"{created_at.isoformat()}|{hand_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_hand_cursor(cursor):
+    """Decode a cursor produced by encode_hand_cursor into (created_at, id)"""
+    padded = cursor + "=" * (-len(cursor) % 4)
+    try:
+        created_at, hand_id = (
+            base64.urlsafe_b64decode(padded.encode()).decode().split("|")
         )
+        return datetime.fromisoformat(created_at), int(hand_id)
+    except (ValueError, UnicodeDecodeError):
+        raise ValueError(f"Invalid cursor: {cursor}")
 
-        # Set hole cards
-        if "hole_cards" in data:
-            builder.deal_hole_cards(data["hole_cards"])
 
-        # Process actions using shared logic
-        try:
-            processed_actions = process_hand_actions(
-                players_data,
-                data["actions"],
-                data.get("small_blind", 1.0),
-                data.get("big_blind", 2.0)
+@app.route("/api/hands")
+def list_hands():
+    """Get a page of saved hands, newest first.
+
+    Pages are keyset-paginated on (created_at, id) so deep pages cost the same
+    as the first one, and only the listed columns are loaded (never phh_content).
+    """
+    try:
+        limit = min(
+            int(request.args.get("limit", app.config["HANDS_PAGE_SIZE"])),
+            app.config["HANDS_PAGE_SIZE_MAX"],
+        )
+        if limit < 1:
+            raise ValueError("limit must be positive")
+        cursor = request.args.get("cursor")
+        position = decode_hand_cursor(cursor) if cursor else None
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    query = db.session.query(
+        Hand.id, Hand.play_id, Hand.game_type, Hand.created_at
+    ).order_by(Hand.created_at.desc(), Hand.id.desc())
+    if position:
+        created_at, hand_id = position
+        query = query.filter(
+            or_(
+                Hand.created_at < created_at,
+                and_(Hand.created_at == created_at, Hand.id < hand_id),
             )
-        except ValueError as e:
-            return jsonify({"error": str(e)}), 500
+        )
+
+    # Fetch one extra row to know whether another page exists
+    hands = query.limit(limit + 1).all()
+    next_cursor = None
+    if len(hands) > limit:
+        hands = hands[:limit]
+        next_cursor = encode_hand_cursor(hands[-1].created_at, hands[-1].id)
+
+    # Return HTML for HTMX requests
+    if request.headers.get("HX-Request"):
+        response = app.make_response(
+            render_template(
+                "hands_list.html",
+                hands=hands,
+                next_cursor=next_cursor,
+                limit=limit,
+                is_next_page=position is not None,
+            )
+        )
+    else:
+        # Return JSON for normal API requests
+        response = jsonify(
+            [
+                {
+                    "id": hand.id,
+                    "play_id": hand.play_id,
+                    "game_type": hand.game_type,
+                    "created_at": hand.created_at.isoformat(),
+                }
+                for hand in hands
+            ]
+        )
 
-        # Add actions to builder
-        for action in processed_actions:
-            builder.add_action(action["player_name"], action["action_type"], action.get("amount", 0))
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+        response.headers["Link"] = (
+            f'<{url_for("list_hands", cursor=next_cursor, limit=limit)}>; rel="next"'
+        )
+    return response
+
+
+def parse_export_filters(args):
+    """Build SQL conditions for an export from request/CLI filter arguments.
+
+    Supported filters: ``from``/``to`` (ISO dates or datetimes, inclusive, on
+    created_at), ``player`` (hands the player was dealt into) and ``stakes``
+    (``"small/big"`` blinds).
+    """
+    conditions = []
+    if args.get("from"):
+        conditions.append(Hand.created_at >= datetime.fromisoformat(args["from"]))
+    if args.get("to"):
+        to = datetime.fromisoformat(args["to"])
+        if len(args["to"]) == 10:  # date only: include the whole day
+            conditions.append(Hand.created_at < to + timedelta(days=1))
+        else:
+            conditions.append(Hand.created_at <= to)
+    if args.get("player"):
+        conditions.append(
+            select(Player.id)
+            .where(Player.hand_id == Hand.id, Player.name == args["player"])
+            .exists()
+        )
+    if args.get("stakes"):
+        try:
+            small_blind, big_blind = (float(b) for b in args["stakes"].split("/"))
+        except ValueError:
+            raise ValueError(f"Invalid stakes: {args['stakes']} (expected small/big)")
+        conditions.append(Hand.small_blind == small_blind)
+        conditions.append(Hand.big_blind == big_blind)
+    return conditions
+
+
+def iter_phhs(conditions):
+    """Yield the PHHS export of matching hands in blocks of EXPORT_BATCH_SIZE.
+
+    Rows are streamed from a server-side cursor with yield_per, so only one
+    batch of phh_content is held in memory at a time.
+    """
+    query = (
+        select(Hand.phh_content)
+        .where(*conditions)
+        .order_by(Hand.id)
+        .execution_options(yield_per=EXPORT_BATCH_SIZE)
+    )
+    number = 0
+    for batch in db.session.execute(query).scalars().partitions():
+        sections = []
+        for phh_content in batch:
+            number += 1
+            sections.append(f"[{number}]\n{phh_content or ''}\n\n")
+        yield "".join(sections)
+
+
+@app.route("/api/export.phhs")
+def export_phhs():
+    """Stream matching hands as one PHHS document"""
+    try:
+        conditions = parse_export_filters(request.args)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
 
-        # Set board cards
-        if "flop" in data:
-            builder.deal_flop(data["flop"])
+    response = app.response_class(
+        stream_with_context(iter_phhs(conditions)), mimetype="text/plain"
+    )
+    response.headers["Content-Disposition"] = "attachment; filename=hands.phhs"
+    return response
 
-        # Generate PHH
-        phh_content = builder.generate_phh()
 
-        # Combine board cards into single string
-        board_string = ""
-        if "flop" in data and data["flop"]:
-            board_string += data["flop"]
-        if "turn" in data and data["turn"]:
-            board_string += data["turn"]
-        if "river" in data and data["river"]:
-            board_string += data["river"]
+def hand_cache_key(endpoint, play_id, *parts, version=None):
+    """Response cache key for a hand endpoint, ending in the response version.
 
-        # Save to database
-        hand = Hand(
-            play_id=play_id,
-            game_type=data.get("game_type", "No Limit Texas Holdem"),
-            board=board_string,
-            small_blind=data.get("small_blind", 1.0),
-            big_blind=data.get("big_blind", 2.0),
-            phh_content=phh_content,
-        )
+    Versioned keys keep entries rendered before a version bump from being
+    served out of a persistent cache backend.
+    """
+    if version is None:
+        version = HAND_RESPONSE_VERSION
+    return (endpoint, play_id, *parts, f"v{version}")
 
-        db.session.add(hand)
-        db.session.flush()
-
-        # Save player information with position strings
-        for i, player_data in enumerate(players_data):
-            # Use position from frontend if provided, otherwise calculate
-            position = player_data.get("position")
-            if not position:
-                positions = get_poker_positions(len(players_data))
-                position = positions[i]
-            player = Player(
-                hand_id=hand.id,
-                name=player_data["name"],
-                stack=player_data["stack"],
-                hole_cards=data.get("hole_cards", {}).get(player_data["name"], ""),
-                position=position,
-            )
-            db.session.add(player)
-
-        # Save action information with corrected amounts
-        for i, action_data in enumerate(processed_actions):
-            action = Action(
-                hand_id=hand.id,
-                street=action_data.get("street", "preflop"),
-                player_name=action_data["player_name"],
-                action_type=action_data["action_type"],
-                amount=action_data.get("amount", 0),
-                pot_size=action_data.get("pot_size", 0.0),
-                remaining_stack=action_data.get("remaining_stack", 0.0),
-                action_order=i,
-            )
-            db.session.add(action)
 
-        db.session.commit()
+def hand_etag(hand_id, key):
+    """Strong ETag for a hand response: hand id, endpoint (and format), version"""
+    return "-".join([str(hand_id), *key[:1], *key[2:]])
 
-        return jsonify({"status": "success", "hand_id": hand.id, "play_id": play_id})
 
-    except Exception as e:
-        db.session.rollback()
-        return jsonify({"error": str(e)}), 500
+def revalidated_response(response, etag):
+    """Let browsers and proxies store a hand response but revalidate it on every use.
 
+    Hand URLs carry no rendering version, so a fresh-for-a-while response
+    would outlive a version bump; revalidating costs a 304 for If-None-Match.
+    """
+    response.set_etag(etag)
+    response.cache_control.public = True
+    response.cache_control.no_cache = True
+    return response.make_conditional(request)
 
-@app.route("/api/hands")
-def list_hands():
-    """Get list of saved hands"""
-    hands = Hand.query.order_by(Hand.created_at.desc()).all()
 
-    # Return HTML for HTMX requests
-    if request.headers.get("HX-Request"):
-        return render_template("hands_list.html", hands=hands)
+def cached_hand_response(key):
+    """The cached response for key, or None when it has to be rendered"""
+    entry = response_cache.get(key)
+    if entry is None:
+        return None
+    return revalidated_response(
+        app.response_class(entry["body"], mimetype=entry["mimetype"]), entry["etag"]
+    )
 
-    # Return JSON for normal API requests
-    return jsonify(
-        [
-            {
-                "id": hand.id,
-                "play_id": hand.play_id,
-                "game_type": hand.game_type,
-                "created_at": hand.created_at.isoformat(),
-            }
-            for hand in hands
-        ]
+
+def cache_hand_response(key, hand_id, response):
+    """Store a rendered hand response and return it with caching headers"""
+    etag = hand_etag(hand_id, key)
+    response_cache.set(
+        key, {"body": response.get_data(), "mimetype": response.mimetype, "etag": etag}
     )
+    return revalidated_response(response, etag)
 
 
 @app.route("/api/hands/<play_id>")
 def get_hand(play_id):
     """Get specific hand details"""
-    hand = Hand.query.filter_by(play_id=play_id).first()
+    key = hand_cache_key("hand", play_id)
+    cached = cached_hand_response(key)
+    if cached:
+        return cached
+
+    hand = Hand.get_with_details(play_id)
     if not hand:
         return jsonify({"error": "Hand not found"}), 404
 
-    players = Player.query.filter_by(hand_id=hand.id).all()
-    actions = (
-        Action.query.filter_by(hand_id=hand.id).order_by(Action.action_order).all()
-    )
-
-    return jsonify(
+    response = jsonify(
         {
             "hand": {
                 "id": hand.id,
@@ -1058,7 +1849,7 @@ def get_hand(play_id):
                     "hole_cards": p.hole_cards,
                     "position": p.position,
                 }
-                for p in players
+                for p in hand.players
             ],
             "actions": [
                 {
@@ -1068,281 +1859,508 @@ def get_hand(play_id):
                     "amount": a.amount,
                     "action_order": a.action_order,
                 }
-                for a in actions
+                for a in hand.actions
             ],
         }
     )
+    return cache_hand_response(key, hand.id, response)
 
 
 @app.route("/api/hands/<play_id>/details")
 def get_hand_details_html(play_id):
     """Get specific hand details as HTML for modal display"""
-    hand = Hand.query.filter_by(play_id=play_id).first()
+    key = hand_cache_key("details", play_id)
+    cached = cached_hand_response(key)
+    if cached:
+        return cached
+
+    hand = Hand.get_with_details(play_id)
     if not hand:
         return '<div class="text-red-500">Hand not found</div>', 404
 
-    players = Player.query.filter_by(hand_id=hand.id).order_by(Player.position).all()
-    actions = (
-        Action.query.filter_by(hand_id=hand.id).order_by(Action.action_order).all()
+    # Same order as ORDER BY position: missing positions first
+    players = sorted(
+        hand.players, key=lambda p: (p.position is not None, p.position or "")
     )
 
-    return render_template(
+    html = render_template(
         "hand_detail.html",
         hand=hand,
         players=players,
-        actions=actions,
+        actions=hand.actions,
         Position=Position,
     )
+    return cache_hand_response(key, hand.id, app.response_class(html, mimetype="text/html"))
 
 
 @app.route("/api/hands/<play_id>/replay-ui")
 def get_hand_replay_ui(play_id):
     """Get hand replay UI as HTML for modal display"""
+    key = hand_cache_key("replay-ui", play_id)
+    cached = cached_hand_response(key)
+    if cached:
+        return cached
+
     hand = Hand.query.filter_by(play_id=play_id).first()
     if not hand:
         return '<div class="text-red-500">Hand not found</div>', 404
 
-    return render_template("hand_replay.html", hand=hand)
+    html = render_template("hand_replay.html", hand=hand)
+    return cache_hand_response(key, hand.id, app.response_class(html, mimetype="text/html"))
+
+
+@app.route("/api/hands/<play_id>/equity")
+def get_hand_equity(play_id):
+    """Win, tie and equity percentages of the live players as a street begins"""
+    street = request.args.get("street", "preflop")
+    if street not in STREET_BOARD_CARDS:
+        return jsonify({"error": f"Invalid street: {street}"}), 400
+    # Preflop bodies depend on which table, if any, is mapped
+    source = "calculated"
+    if street == "preflop" and preflop_equity is not None:
+        source = f"table{preflop_equity.digest}"
+    key = hand_cache_key("equity", play_id, street, source)
+    cached = cached_hand_response(key)
+    if cached:
+        return cached
+
+    hand = Hand.get_with_details(play_id)
+    if not hand:
+        return jsonify({"error": "Hand not found"}), 404
+
+    board = (hand.board or "")[: 2 * STREET_BOARD_CARDS[street]]
+    if len(board) < 2 * STREET_BOARD_CARDS[street]:
+        return jsonify({"error": f"Hand has no {street} cards"}), 400
+    # Players who folded on an earlier street are out of the pot
+    folded = {
+        action.player_name
+        for action in hand.actions
+        if action.action_type == "fold" and STREETS.index(action.street) < STREETS.index(street)
+    }
+    live = [player for player in hand.players if player.name not in folded]
+    unknown = [player.name for player in live if not player.hole_cards or "?" in player.hole_cards]
+    if unknown:
+        return jsonify({"error": f"Hole cards unknown for: {', '.join(unknown)}"}), 400
+
+    try:
+        hole_cards = [player.hole_cards for player in live]
+        if (
+            street == "preflop"
+            and len(live) == 2
+            and preflop_equity is not None
+            and not suits_interact(*hole_cards)
+        ):
+            first, second = hole_cards
+            equity = {
+                "method": "preflop_table",
+                "runouts": None,
+                "players": [
+                    preflop_equity.lookup(first, second),
+                    preflop_equity.lookup(second, first),
+                ],
+            }
+        else:
+            equity = get_equity_calculator().calculate(hole_cards, board)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    response = jsonify(
+        {
+            "play_id": hand.play_id,
+            "street": street,
+            "board": board,
+            "method": equity["method"],
+            "runouts": equity["runouts"],
+            "players": [
+                dict(name=player.name, hole_cards=player.hole_cards, **result)
+                for player, result in zip(live, equity["players"])
+            ],
+        }
+    )
+    return cache_hand_response(key, hand.id, response)
+
+
+@app.route("/api/cache/stats")
+def get_cache_stats():
+    """Response cache hit/miss/eviction counters and current size.
+
+    Counters are for the worker that answers; entries and bytes describe the
+    backend, which shared backends report for every worker at once.
+    """
+    response = jsonify(response_cache.stats())
+    response.cache_control.no_store = True
+    return response
+
+
+@app.route("/api/players/<name>/stats")
+def get_player_stats(name):
+    """VPIP, PFR, 3-bet, AF and WTSD for one player, with the counts behind them"""
+    stats = db.session.get(PlayerStats, name)
+    if not stats:
+        return jsonify({"error": "Player not found"}), 404
+    return jsonify(stats.to_dict())
+
+
+@app.route("/api/players/<name>/results")
+def get_player_results(name):
+    """A player's stored per-hand results in hand order, with running totals for graphs"""
+    rows = db.session.execute(
+        select(Hand.play_id, HandResult.invested, HandResult.won, HandResult.net)
+        .join(Hand, Hand.id == HandResult.hand_id)
+        .where(HandResult.player_name == name)
+        .order_by(HandResult.hand_id)
+    ).all()
+    if not rows:
+        return jsonify({"error": "Player not found"}), 404
+
+    total = 0.0
+    results = []
+    for row in rows:
+        total = round(total + row.net, 2)
+        results.append(
+            {
+                "play_id": row.play_id,
+                "invested": row.invested,
+                "won": row.won,
+                "net": row.net,
+                "total": total,
+            }
+        )
+    return jsonify({"name": name, "hands": len(results), "net": total, "results": results})
 
 
 @app.route("/api/players/names")
 def get_player_names():
-    """Get list of unique player names for autocomplete"""
+    """Get player names for autocomplete.
+
+    ``?prefix=`` narrows the list to names starting with it (case-insensitive)
+    and ``?limit=`` returns only the first N alphabetically. Responses carry an
+    ETag so the browser can revalidate an unchanged list with a 304.
+    """
+    prefix = request.args.get("prefix", "").strip()
     try:
-        # Get unique player names from database
-        player_names = db.session.query(Player.name).distinct().all()
-        names = [name[0] for name in player_names if name[0]]  # Extract string from tuple
-        return jsonify(sorted(names))  # Return sorted list
+        limit = request.args.get("limit")
+        if limit is not None:
+            limit = min(int(limit), app.config["PLAYER_NAMES_LIMIT_MAX"])
+            if limit < 1:
+                raise ValueError("limit must be positive")
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    try:
+        response = jsonify(PlayerName.search(prefix, limit))
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+    response.add_etag()
+    response.cache_control.no_cache = True  # Reuse only after revalidating
+    return response.make_conditional(request)
+
+
+def replay_meta(hand):
+    """Replay "meta" block for a hand row (a Hand or its prepared dict)"""
+    get = hand.get if isinstance(hand, dict) else lambda field: getattr(hand, field)
+    return {
+        "game_type": get("game_type"),
+        "small_blind": float(get("small_blind")),
+        "big_blind": float(get("big_blind")),
+        "board": get("board"),
+        "created_at": get("created_at").isoformat(),
+    }
+
+
+def build_replay_data(hand, players, actions):
+    """Build the step-by-step replay timeline for a stored hand.
+
+    Hands are normally replayed from the timeline recorded when they were
+    saved; this rebuilds it from the stored rows for older hands and after a
+    REPLAY_VERSION bump.
+    """
+    state = replay_stored_hand(hand, players, actions)
+    state.showdown(get_hand_evaluator() if state.contested_showdown() else None)
+    return state.replay(hand.play_id, replay_meta(hand))
+
+
+def serialize_replay(replay_data):
+    """Compact, gzip-compressed JSON bytes as stored in hand_replays"""
+    return gzip.compress(json.dumps(replay_data, separators=(",", ":")).encode(), mtime=0)
+
+
+def store_replay(hand_id, replay_format, payload, replay_id=None):
+    """Persist a serialized replay timeline, replacing a stale row if given"""
+    if replay_id:
+        db.session.execute(
+            update(HandReplay)
+            .where(HandReplay.id == replay_id)
+            .values(version=REPLAY_VERSION, payload=payload)
+        )
+    else:
+        values = dict(
+            hand_id=hand_id, format=replay_format, version=REPLAY_VERSION, payload=payload
+        )
+        statement = dialect_insert(HandReplay)
+        if statement is not None:
+            # Another worker may have stored the same timeline first; keep the newest
+            statement = statement.values(values).on_conflict_do_update(
+                index_elements=["hand_id", "format"],
+                set_={"version": REPLAY_VERSION, "payload": payload},
+            )
+        else:
+            statement = insert(HandReplay).values(values)
+        db.session.execute(statement)
+    try:
+        db.session.commit()
+    except IntegrityError:
+        # Another worker stored the same timeline first; theirs is equivalent
+        db.session.rollback()
+
+
+def replay_response(payload, etag):
+    """Serve stored replay bytes, passing the gzip stream through when accepted.
+
+    The gzip and identity bodies differ, so each gets its own strong ETag.
+    """
+    if "gzip" in request.accept_encodings:
+        response = app.response_class(payload, mimetype="application/json")
+        response.headers["Content-Encoding"] = "gzip"
+        etag += "-gzip"
+    else:
+        response = app.response_class(
+            gzip.decompress(payload), mimetype="application/json"
+        )
+    response.vary.add("Accept-Encoding")
+    return revalidated_response(response, etag)
+
+
+# Step-level fields that delta-encoded steps only carry when they change
+REPLAY_DELTA_STEP_FIELDS = ("street", "pot_size", "board", "current_bet")
+
+
+def encode_replay_delta(replay_data):
+    """Delta-encode a replay timeline.
+
+    The table state of the first step is sent once under "players"; every step
+    then carries only the step fields and per-seat player fields that differ
+    from the previous step. Player changes are keyed by the seat's index in the
+    "players" list.
+    """
+    steps = replay_data["steps"]
+    delta_steps = []
+    previous = None
+    for step in steps:
+        delta_step = {
+            "step": step["step"],
+            "description": step["description"],
+            "action": step["action"],
+        }
+        for field in REPLAY_DELTA_STEP_FIELDS:
+            if previous is None or step[field] != previous[field]:
+                delta_step[field] = step[field]
+        if previous is not None:
+            changes = {}
+            for index, (player, before) in enumerate(
+                zip(step["players"], previous["players"])
+            ):
+                changed = {
+                    field: value
+                    for field, value in player.items()
+                    if before.get(field) != value
+                }
+                if changed:
+                    changes[str(index)] = changed
+            if changes:
+                delta_step["players"] = changes
+        delta_steps.append(delta_step)
+        previous = step
+
+    return {
+        "format": "delta",
+        "hand_id": replay_data["hand_id"],
+        "total_steps": replay_data["total_steps"],
+        "players": steps[0]["players"] if steps else [],
+        "steps": delta_steps,
+        "meta": replay_data["meta"],
+    }
+
+
+REPLAY_FORMATS = {
+    "full": lambda replay_data: replay_data,
+    "delta": encode_replay_delta,
+}
+
 
 @app.route("/api/hands/<play_id>/replay")
 def get_hand_replay(play_id):
-    """Get hand replay data with step-by-step progression"""
-    hand = Hand.query.filter_by(play_id=play_id).first()
+    """Get hand replay data with step-by-step progression.
+
+    ``?format=delta`` returns the delta-encoded timeline (see
+    encode_replay_delta). Timelines are stored when the hand is saved, so a
+    request is a single read of the stored bytes; hands without a current
+    timeline have it rebuilt and stored on first request.
+    """
+    replay_format = request.args.get("format", "full")
+    if replay_format not in REPLAY_FORMATS:
+        return (
+            jsonify(
+                {
+                    "error": f"Unknown replay format: {replay_format}. "
+                    f"Available formats: {list(REPLAY_FORMATS)}"
+                }
+            ),
+            400,
+        )
+
+    key = hand_cache_key("replay", play_id, replay_format, version=REPLAY_VERSION)
+    cached = response_cache.get(key)
+    if cached:
+        return replay_response(cached["body"], cached["etag"])
+
+    stored = (
+        db.session.query(
+            HandReplay.id, HandReplay.hand_id, HandReplay.version, HandReplay.payload
+        )
+        .join(Hand, Hand.id == HandReplay.hand_id)
+        .filter(Hand.play_id == play_id, HandReplay.format == replay_format)
+        .first()
+    )
+    if stored and stored.version == REPLAY_VERSION:
+        return cache_replay(key, stored.hand_id, stored.payload)
+
+    hand = Hand.get_with_details(play_id)
     if not hand:
         return jsonify({"error": "Hand not found"}), 404
 
-    players = Player.query.filter_by(hand_id=hand.id).all()
-    actions = (
-        Action.query.filter_by(hand_id=hand.id).order_by(Action.action_order).all()
+    replay_data = REPLAY_FORMATS[replay_format](
+        build_replay_data(hand, hand.players, hand.actions)
+    )
+    payload = serialize_replay(replay_data)
+    hand_id = hand.id  # Read before store_replay commits and expires the hand
+    store_replay(hand_id, replay_format, payload, stored.id if stored else None)
+    return cache_replay(key, hand_id, payload)
+
+
+def cache_replay(key, hand_id, payload):
+    """Keep a stored replay payload in the response cache and serve it"""
+    etag = hand_etag(hand_id, key)
+    response_cache.set(key, {"body": payload, "mimetype": "application/json", "etag": etag})
+    return replay_response(payload, etag)
+
+
+def iter_parsed_files(files, pool, window):
+    """load_phh_file results in file order, with at most window parses in flight.
+
+    Parse tasks are submitted only as the caller consumes results, so the
+    prepare tasks iter_prepared_chunks queues on the same pool run between
+    them instead of behind every file, and only a window of parsed files is
+    held in memory.
+    """
+    pending = deque()
+    for path in files:
+        pending.append(pool.submit(load_phh_file, path))
+        if len(pending) >= window:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+
+@app.cli.command("import-phh")
+@click.argument("paths", nargs=-1, required=True, type=click.Path(exists=True))
+@click.option(
+    "--workers",
+    default=os.cpu_count(),
+    show_default=True,
+    help="Parser processes (1 parses in this process).",
+)
+@click.option("--chunk-size", type=int, help="Hands written per transaction.")
+def import_phh_command(paths, workers, chunk_size):
+    """Import .phh/.phhs files or directories of them into the database."""
+    files = list(iter_phh_paths(paths))
+    chunk_size = chunk_size or app.config["BULK_IMPORT_CHUNK_SIZE"]
+    succeeded = failed = 0
+    errors = []
+
+    pool = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+    try:
+        if pool:
+            parsed_files = iter_parsed_files(files, pool, window=workers * 2)
+        else:
+            parsed_files = map(load_phh_file, files)
+
+        hands = (hand for file_hands in parsed_files for hand in file_hands)
+        # The same pool validates the parsed hands while this process writes
+        for entries in iter_prepared_chunks(iter_chunks(hands, chunk_size), pool):
+            for result in store_hand_entries(entries):
+                if result["status"] == "success":
+                    succeeded += 1
+                else:
+                    failed += 1
+                    errors.append(result["error"])
+    finally:
+        if pool:
+            pool.shutdown()
+
+    click.echo(
+        f"Imported {succeeded} hands from {len(files)} files ({failed} failed)"
     )
+    for error in errors[:IMPORT_JOB_MAX_ERRORS]:
+        click.echo(f"  {error}", err=True)
 
-    # Build replay steps with proper state tracking
-    replay_steps = []
-
-    # Initialize player state tracking
-    player_state = {}
-    for p in players:
-        player_state[p.name] = {
-            "name": p.name,
-            "original_stack": p.stack,
-            "current_stack": p.stack,
-            "hole_cards": p.hole_cards,
-            "position": p.position,
-            "current_bet": 0,
-            "total_invested": 0,
-            "is_active": True,
-            "has_folded": False,
-        }
 
-    current_pot = 0
-    current_street = "preflop"
-    board_cards = []
+@app.cli.command("rebuild-player-stats")
+def rebuild_player_stats_command():
+    """Recount player_stats from every stored hand (run with imports stopped)."""
+    with db.engine.begin() as conn:
+        players = rebuild_player_stats(conn)
+    click.echo(f"Rebuilt stats for {players} players")
 
-    # Step 0: Initial game state
-    initial_state = {
-        "step": 0,
-        "description": "Hand begins",
-        "street": "preflop",
-        "players": [
-            {
-                "name": state["name"],
-                "stack": state["current_stack"],
-                "hole_cards": state["hole_cards"],
-                "position": state["position"],
-                "current_bet": state["current_bet"],
-                "is_active": state["is_active"],
-            }
-            for state in player_state.values()
-        ],
-        "pot_size": current_pot,
-        "board": board_cards.copy(),
-        "current_bet": 0,
-        "action": None,
-    }
-    replay_steps.append(initial_state)
-
-    # Step 1: Post blinds
-    if len(players) >= 2:
-        sb_player = next((p for p in players if p.position == "SB"), None)
-        bb_player = next((p for p in players if p.position == "BB"), None)
-
-        if sb_player:
-            player_state[sb_player.name]["current_stack"] -= hand.small_blind
-            player_state[sb_player.name]["current_bet"] = hand.small_blind
-            player_state[sb_player.name]["total_invested"] = hand.small_blind
-            current_pot += hand.small_blind
-
-        if bb_player:
-            player_state[bb_player.name]["current_stack"] -= hand.big_blind
-            player_state[bb_player.name]["current_bet"] = hand.big_blind
-            player_state[bb_player.name]["total_invested"] = hand.big_blind
-            current_pot += hand.big_blind
-
-        blinds_state = {
-            "step": 1,
-            "description": f"Blinds posted: {sb_player.name if sb_player else 'SB'} (${hand.small_blind}), {bb_player.name if bb_player else 'BB'} (${hand.big_blind})",
-            "street": "preflop",
-            "players": [
-                {
-                    "name": state["name"],
-                    "stack": state["current_stack"],
-                    "hole_cards": state["hole_cards"],
-                    "position": state["position"],
-                    "current_bet": state["current_bet"],
-                    "is_active": state["is_active"],
-                }
-                for state in player_state.values()
-            ],
-            "pot_size": current_pot,
-            "board": board_cards.copy(),
-            "current_bet": hand.big_blind,
-            "action": {"type": "blinds", "description": "Blinds posted"},
-        }
-        replay_steps.append(blinds_state)
-
-    # Add each action as a step
-    current_step = len(replay_steps)
-    for action in actions:
-        # Update board cards when street changes
-        if action.street != current_street:
-            current_street = action.street
-            if hand.board:
-                # Parse board cards: "AhKd5c" -> ["Ah", "Kd", "5c"]
-                board_str = hand.board.replace(" ", "")  # Remove any spaces
-                board_parts = []
-                
-                # Parse pairs of characters as cards
-                i = 0
-                while i < len(board_str) - 1:
-                    card = board_str[i:i+2]
-                    if len(card) == 2:  # Valid card format
-                        board_parts.append(card)
-                    i += 2
-                
-                # Set board cards based on street
-                if action.street == "flop" and len(board_parts) >= 3:
-                    board_cards = board_parts[:3]
-                elif action.street == "turn" and len(board_parts) >= 4:
-                    board_cards = board_parts[:4]
-                elif action.street == "river" and len(board_parts) >= 5:
-                    board_cards = board_parts[:5]
-
-            # Reset current bets for new street
-            for state in player_state.values():
-                state["current_bet"] = 0
-            
-            # Add intermediate step with all players having null actions
-            street_intermediate_step = {
-                "step": current_step,
-                "description": f"{current_street.capitalize()} - waiting for action",
-                "street": current_street,
-                "players": [
-                    {
-                        "name": state["name"],
-                        "stack": state["current_stack"],
-                        "hole_cards": state["hole_cards"],
-                        "position": state["position"],
-                        "current_bet": 0,  # Reset bets for new street
-                        "is_active": state["is_active"],
-                    }
-                    for state in player_state.values()
-                ],
-                "pot_size": current_pot,
-                "board": board_cards.copy(),
-                "current_bet": 0,
-                "action": None,  # No action - clear state
-            }
-            replay_steps.append(street_intermediate_step)
-            current_step += 1
-
-        # Process the action
-        player_name = action.player_name
-        if player_name in player_state:
-            if action.action_type == "fold":
-                player_state[player_name]["is_active"] = False
-                player_state[player_name]["has_folded"] = True
-                player_state[player_name]["current_bet"] = 0
-            elif action.action_type in ["bet", "raise"]:
-                additional_bet = (
-                    action.amount - player_state[player_name]["current_bet"]
-                )
-                player_state[player_name]["current_stack"] -= additional_bet
-                player_state[player_name]["current_bet"] = action.amount
-                player_state[player_name]["total_invested"] += additional_bet
-                current_pot += additional_bet
-            elif action.action_type == "call":
-                player_state[player_name]["current_stack"] -= action.amount
-                player_state[player_name]["current_bet"] += action.amount
-                player_state[player_name]["total_invested"] += action.amount
-                current_pot += action.amount
-            elif action.action_type == "check":
-                # No money changes on check
-                pass
 
-        action_state = {
-            "step": current_step,
-            "description": f"{action.player_name} {action.action_type}"
-            + (f" ${action.amount}" if action.amount > 0 else ""),
-            "street": action.street,
-            "players": [
-                {
-                    "name": state["name"],
-                    "stack": state["current_stack"],
-                    "hole_cards": state["hole_cards"],
-                    "position": state["position"],
-                    "current_bet": state["current_bet"],
-                    "is_active": state["is_active"],
-                }
-                for state in player_state.values()
-            ],
-            "pot_size": current_pot,
-            "board": board_cards.copy(),
-            "current_bet": max(
-                state["current_bet"]
-                for state in player_state.values()
-                if state["is_active"]
-            )
-            if any(state["is_active"] for state in player_state.values())
-            else 0,
-            "action": {
-                "player": action.player_name,
-                "type": action.action_type,
-                "amount": action.amount,
-                "street": action.street,
-            },
-        }
-        replay_steps.append(action_state)
-        current_step += 1
+@app.cli.command("rebuild-hand-results")
+def rebuild_hand_results_command():
+    """Award every stored hand's pots again and rewrite hand_results."""
+    with db.engine.begin() as conn:
+        hands = rebuild_hand_results(conn, get_hand_evaluator())
+    click.echo(f"Stored results for {hands} hands")
 
-    return jsonify(
-        {
-            "hand_id": hand.play_id,
-            "total_steps": len(replay_steps),
-            "steps": replay_steps,
-            "meta": {
-                "game_type": hand.game_type,
-                "small_blind": hand.small_blind,
-                "big_blind": hand.big_blind,
-                "board": hand.board,
-                "created_at": hand.created_at.isoformat(),
-            },
-        }
+
+@app.cli.command("build-preflop-equity")
+@click.option(
+    "--samples", default=20000, show_default=True, help="Boards dealt per starting-hand matchup."
+)
+@click.option("--seed", default=0, show_default=True, help="Random generator seed.")
+def build_preflop_equity_command(samples, seed):
+    """Sample every heads-up starting-hand matchup into PREFLOP_EQUITY_TABLE."""
+    path = app.config["PREFLOP_EQUITY_TABLE"]
+    with click.progressbar(length=1, label="Matchups") as bar:
+
+        def progress(done, total):
+            bar.length = total
+            bar.update(done - bar.pos)
+
+        table = build_preflop_table(
+            get_hand_evaluator(), samples=samples, seed=seed, progress=progress
+        )
+    PreflopEquityTable(table).save(path)
+    load_preflop_equity()
+    click.echo(f"Wrote preflop equities to {path}; restart the app to map them")
+
+
+@app.cli.command("export-phhs")
+@click.argument("output", type=click.File("w"))
+@click.option("--from", "from_", help="Earliest created_at (ISO date).")
+@click.option("--to", help="Latest created_at (ISO date).")
+@click.option("--player", help="Only hands this player was dealt into.")
+@click.option("--stakes", help='Blinds as "small/big", e.g. "1/2".')
+def export_phhs_command(output, from_, to, player, stakes):
+    """Stream matching hands into a .phhs file (- for stdout)."""
+    conditions = parse_export_filters(
+        {"from": from_, "to": to, "player": player, "stakes": stakes}
     )
+    for block in iter_phhs(conditions):
+        output.write(block)
 
 
 if __name__ == "__main__":
+    migrate_database()
+    recover_import_jobs()
     port = int(os.environ.get("PORT", 8000))
     app.run(debug=True, host="0.0.0.0", port=port)
@@ -0,0 +1,213 @@
+"""
+Columnar batch validation for large numbers of synthetic hands.
+
+validate_batch applies the same betting rules as process_hand_actions (no
+checking into a bet, no betting past what earlier streets left of the stack,
+no actions but folds from all-in players, automatic street advance) to
+many hands at once. Actions come in as parallel NumPy columns and the hands
+are walked in lockstep: step k applies the k-th action of every hand with
+one set of vectorized operations, so the Python loop runs once per action
+depth rather than once per action.
+
+Seats are indices into each hand's row of ``stacks``; blinds come from seats
+0 and 1 as in HandState. Each hand stops at its first error, which is
+reported per hand rather than raised. Players who never acted are not
+auto-folded, so the output has exactly one row per input action.
+"""
+
+from typing import Any, Dict, List, Sequence
+
+import numpy as np
+
+from poker_engine import STREETS
+
+# Action codes
+FOLD = 0
+CHECK = 1
+CALL = 2
+BET = 3
+RAISE = 4
+ACTION_CODES = {"fold": FOLD, "check": CHECK, "call": CALL, "bet": BET, "raise": RAISE}
+
+# Per-hand error codes, each matching a ValueError process_hand_actions raises
+ERROR_NONE = 0
+ERROR_UNKNOWN_PLAYER = 1
+ERROR_FOLDED = 2
+ERROR_CHECK_FACING_BET = 3
+ERROR_OVER_BET = 4
+ERROR_UNKNOWN_ACTION = 5  # Not an error for process_hand_actions, which ignores the action
+ERROR_ALL_IN = 6
+
+
+def hands_to_columns(hands: Sequence[Dict[str, Any]]) -> Dict[str, np.ndarray]:
+    """Convert save-hand style dicts into validate_batch arguments.
+
+    Each hand needs "players" (name and stack) and "actions"; player names are
+    expected to be unique within a hand. Unknown names get seat -1 and unknown
+    action types code -1, so they are reported as errors.
+    """
+    max_seats = max((len(hand["players"]) for hand in hands), default=0)
+    stacks = np.full((len(hands), max_seats), np.nan)
+    hand_ids: List[int] = []
+    seats: List[int] = []
+    codes: List[int] = []
+    amounts: List[float] = []
+    for hand_id, hand in enumerate(hands):
+        seat_of = {}
+        for seat, player in enumerate(hand["players"]):
+            stacks[hand_id, seat] = player["stack"]
+            seat_of.setdefault(player["name"], seat)
+        for action in hand["actions"]:
+            hand_ids.append(hand_id)
+            seats.append(seat_of.get(action["player_name"], -1))
+            codes.append(ACTION_CODES.get(action["action_type"], -1))
+            amounts.append(action.get("amount", 0) or 0)
+    return {
+        "hand_ids": np.array(hand_ids, dtype=np.int64),
+        "seats": np.array(seats, dtype=np.int64),
+        "action_codes": np.array(codes, dtype=np.int8),
+        "amounts": np.array(amounts, dtype=np.float64),
+        "stacks": stacks,
+    }
+
+
+def validate_batch(
+    hand_ids: np.ndarray,
+    seats: np.ndarray,
+    action_codes: np.ndarray,
+    amounts: np.ndarray,
+    stacks: np.ndarray,
+    small_blind: float = 1.0,
+    big_blind: float = 2.0,
+) -> Dict[str, np.ndarray]:
+    """Validate every hand in a batch of columnar actions.
+
+    ``hand_ids`` is each action's row in ``stacks``, an (n_hands, max_seats)
+    array of starting stacks padded with NaN for empty seats. Actions of a
+    hand are applied in the order they appear in the columns.
+
+    Returns per-hand "error" (ERROR_* code), "error_row" (index of the
+    offending action, or -1) and "pot", and per-action "street" (index into
+    STREETS), "amount", "pot_size" and "remaining_stack" as process_hand_actions
+    would store them. Actions at or after a hand's error have street -1 and
+    NaN values.
+    """
+    hand_ids = np.asarray(hand_ids, dtype=np.int64)
+    seats = np.asarray(seats, dtype=np.int64)
+    action_codes = np.asarray(action_codes)
+    amounts = np.asarray(amounts, dtype=np.float64)
+    stacks = np.asarray(stacks, dtype=np.float64)
+    n_hands, max_seats = stacks.shape
+    n_actions = len(hand_ids)
+
+    # Betting state, one row per hand
+    seated = ~np.isnan(stacks)
+    heads = seated.sum(axis=1) >= 2
+    bets = np.zeros_like(stacks)
+    current_bet = np.zeros(n_hands)
+    pot = np.zeros(n_hands)
+    if max_seats >= 2:
+        bets[heads, 0] = small_blind
+        bets[heads, 1] = big_blind
+        current_bet[heads] = big_blind
+        pot[heads] = small_blind + big_blind
+    committed = np.zeros_like(stacks)  # Chips put in on earlier streets
+    all_in = (bets > 0) & (bets >= stacks)  # A blind can take the whole stack
+    active = seated.copy()
+    acted = np.zeros_like(seated)
+    street = np.zeros(n_hands, dtype=np.int8)
+    error = np.zeros(n_hands, dtype=np.int8)
+    error_row = np.full(n_hands, -1, dtype=np.int64)
+
+    out_street = np.full(n_actions, -1, dtype=np.int8)
+    out_amount = np.full(n_actions, np.nan)
+    out_pot = np.full(n_actions, np.nan)
+    out_remaining = np.full(n_actions, np.nan)
+
+    # Order rows by (depth within hand, hand) so each step is one contiguous slice
+    order = np.argsort(hand_ids, kind="stable")
+    counts = np.bincount(hand_ids, minlength=n_hands)
+    starts = np.cumsum(counts) - counts
+    depth = np.empty(n_actions, dtype=np.int64)
+    depth[order] = np.arange(n_actions) - starts[hand_ids[order]]
+    by_step = order[np.argsort(depth[order], kind="stable")]
+    step_bounds = np.concatenate(([0], np.cumsum(np.bincount(depth)))) if n_actions else [0]
+
+    last_street = len(STREETS) - 1
+    for lo, hi in zip(step_bounds[:-1], step_bounds[1:]):
+        rows = by_step[lo:hi]
+        rows = rows[error[hand_ids[rows]] == ERROR_NONE]
+        if not len(rows):
+            continue
+        h = hand_ids[rows]
+        s = seats[rows]
+        code = action_codes[rows]
+        amount = amounts[rows]
+
+        known = (s >= 0) & (s < max_seats)
+        s = np.where(known, s, 0)
+        known &= seated[h, s]
+        bet = bets[h, s]
+        stack = stacks[h, s]
+        left = stack - committed[h, s]  # Chips not put in on earlier streets
+        to_match = current_bet[h]
+        is_call = code == CALL
+        is_bet = (code == BET) | (code == RAISE)
+        additional = np.where(is_bet, amount - bet, 0.0)
+
+        err = np.zeros(len(rows), dtype=np.int8)
+        checks = [
+            (~known, ERROR_UNKNOWN_PLAYER),
+            (~active[h, s], ERROR_FOLDED),
+            (all_in[h, s] & (code != FOLD), ERROR_ALL_IN),
+            ((code < FOLD) | (code > RAISE), ERROR_UNKNOWN_ACTION),
+            ((code == CHECK) & (to_match > bet), ERROR_CHECK_FACING_BET),
+            (is_bet & (additional > left - bet), ERROR_OVER_BET),
+        ]
+        for failed, code_value in checks:
+            err[(err == ERROR_NONE) & failed] = code_value
+        bad = err != ERROR_NONE
+        if bad.any():
+            error[h[bad]] = err[bad]
+            error_row[h[bad]] = rows[bad]
+            ok = ~bad
+            rows, h, s, code, amount = rows[ok], h[ok], s[ok], code[ok], amount[ok]
+            bet, stack, left, to_match = bet[ok], stack[ok], left[ok], to_match[ok]
+            is_call, is_bet, additional = is_call[ok], is_bet[ok], additional[ok]
+
+        call_amount = np.minimum(np.maximum(0, to_match - bet), left - bet)
+        applied = np.where(is_call, call_amount, np.where(is_bet, amount, 0.0))
+        new_bet = np.where(is_bet, amount, np.where(is_call, bet + call_amount, bet))
+        pot[h] += np.where(is_call, call_amount, additional)
+        bets[h, s] = new_bet
+        current_bet[h] = np.where(is_bet & (amount > to_match), amount, to_match)
+        active[h, s] &= code != FOLD
+        acted[h, s] = True
+        all_in[h, s] |= (is_call | is_bet) & (new_bet >= left)
+
+        out_street[rows] = street[h]
+        out_amount[rows] = applied
+        out_pot[rows] = pot[h]
+        out_remaining[rows] = stack - new_bet
+
+        # Round over when at most one player is left or everyone active and
+        # not all-in has acted and matched
+        hand_active = active[h]
+        settled = ~hand_active | all_in[h] | (acted[h] & (bets[h] == current_bet[h][:, None]))
+        done = (hand_active.sum(axis=1) <= 1) | settled.all(axis=1)
+        advance = h[done & (street[h] < last_street)]
+        street[advance] += 1
+        committed[advance] += bets[advance]
+        current_bet[advance] = 0
+        bets[advance] = 0
+        acted[advance] = False
+
+    return {
+        "error": error,
+        "error_row": error_row,
+        "pot": pot,
+        "street": out_street,
+        "amount": out_amount,
+        "pot_size": out_pot,
+        "remaining_stack": out_remaining,
+    }
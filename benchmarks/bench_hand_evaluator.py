@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Showdown evaluator throughput.
+
+Deals random 7-card hands and times HandEvaluator.evaluate_batch over them,
+plus the scalar evaluate used for single saved hands. Table loading is timed
+separately: the first run builds the .npy file, later runs only map it.
+
+    python benchmarks/bench_hand_evaluator.py --hands 10000000
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from hand_evaluator import HandEvaluator  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--hands", type=int, default=10_000_000, help="Hands per batch run")
+    parser.add_argument("--single", type=int, default=200_000, help="Hands for the scalar run")
+    parser.add_argument("--chunk", type=int, default=32768, help="evaluate_batch chunk size")
+    parser.add_argument(
+        "--table",
+        default=os.path.join(tempfile.gettempdir(), "jamnesia_hand_ranks.npy"),
+        help="Table file to build or map",
+    )
+    parser.add_argument("--seed", type=int, default=17)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    evaluator = HandEvaluator.load(args.table)
+    print(f"tables ready in {time.perf_counter() - started:.2f}s ({args.table})")
+
+    # Seven distinct cards per row: the first seven of a random permutation
+    rng = np.random.default_rng(args.seed)
+    cards = np.empty((args.hands, 7), dtype=np.uint8)
+    for start in range(0, args.hands, 1_000_000):
+        rows = min(1_000_000, args.hands - start)
+        cards[start : start + rows] = np.argsort(rng.random((rows, 52)), axis=1)[:, :7]
+
+    started = time.perf_counter()
+    strengths = evaluator.evaluate_batch(cards, args.chunk)
+    elapsed = time.perf_counter() - started
+    print(
+        f"batch:  {args.hands / elapsed:>14,.0f} hands/s "
+        f"({elapsed:.2f}s, checksum {int(strengths.sum())})"
+    )
+
+    single = cards[: args.single].tolist()
+    started = time.perf_counter()
+    for hand in single:
+        evaluator.evaluate(hand)
+    elapsed = time.perf_counter() - started
+    print(f"single: {len(single) / elapsed:>14,.0f} hands/s ({elapsed:.2f}s)")
+
+
+if __name__ == "__main__":
+    main()
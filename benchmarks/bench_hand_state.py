@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Action-validation microbenchmark for process_hand_actions.
+
+Builds a pool of random, valid 9-handed hands (folds, calls, raises and checks
+across every street), then validates them over and over and reports hands and
+actions per second. Only the validation pass is timed, not the generation. With --batch the hands
+are converted to columns and validated by batch_validation.validate_batch
+(needs NumPy) in --chunk sized batches.
+
+    python benchmarks/bench_hand_state.py --hands 1000000
+    python benchmarks/bench_hand_state.py --hands 1000000 --batch
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import process_hand_actions  # noqa: E402
+
+SEATS = 9
+STACK = 200
+SMALL_BLIND = 1
+BIG_BLIND = 2
+STREET_COUNT = 4
+
+
+def random_hand(rng):
+    """A hand whose actions all pass validation, in table order.
+
+    Plays the same betting rules process_hand_actions enforces: blinds from
+    the first two seats, and a street ends once every active player has acted
+    and matched the bet.
+    """
+    names = [f"Seat{seat}" for seat in range(SEATS)]
+    bets = [SMALL_BLIND, BIG_BLIND] + [0] * (SEATS - 2)
+    current_bet = BIG_BLIND
+    active = set(range(SEATS))
+    acted = set()
+    street = 0
+    seat = 2
+    actions = []
+    while True:
+        if seat in active:
+            to_call = current_bet - bets[seat]
+            roll = rng.random()
+            raise_to = max(current_bet * 2, BIG_BLIND)
+            if to_call > 0 and roll < 0.35:
+                action = {"action_type": "fold"}
+                active.discard(seat)
+            elif roll < 0.85 or raise_to > STACK:
+                action = {"action_type": "call" if to_call > 0 else "check"}
+                bets[seat] = current_bet
+            else:
+                action = {"action_type": "raise" if to_call > 0 else "bet", "amount": raise_to}
+                bets[seat] = current_bet = raise_to
+            action["player_name"] = names[seat]
+            actions.append(action)
+            acted.add(seat)
+
+            if len(active) <= 1:
+                break
+            if active <= acted and all(bets[s] == current_bet for s in active):
+                street += 1
+                if street == STREET_COUNT:
+                    break
+                bets = [0] * SEATS
+                current_bet = 0
+                acted = set()
+                seat = 0
+                continue
+        seat = (seat + 1) % SEATS
+    return [{"name": name, "stack": STACK} for name in names], actions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--hands", type=int, default=1_000_000, help="Hands to validate")
+    parser.add_argument("--pool", type=int, default=1000, help="Distinct generated hands")
+    parser.add_argument("--seed", type=int, default=15)
+    parser.add_argument("--batch", action="store_true", help="Use the columnar NumPy validator")
+    parser.add_argument("--chunk", type=int, default=20_000, help="Hands per --batch call")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    pool = [random_hand(rng) for _ in range(args.pool)]
+    action_count = sum(len(actions) for _, actions in pool) * args.hands // args.pool
+
+    if args.batch:
+        elapsed = time_batch(pool, args.hands, args.chunk)
+    else:
+        elapsed = time_single(pool, args.hands)
+
+    print(f"{args.hands:,} hands, ~{action_count:,} actions in {elapsed:.2f}s")
+    print(f"{args.hands / elapsed:,.0f} hands/s, {action_count / elapsed:,.0f} actions/s")
+
+
+def time_single(pool, hands):
+    """Seconds to validate ``hands`` hands one process_hand_actions call at a time"""
+    started = time.perf_counter()
+    for i in range(hands):
+        players, actions = pool[i % len(pool)]
+        process_hand_actions(players, actions, SMALL_BLIND, BIG_BLIND)
+    return time.perf_counter() - started
+
+
+def time_batch(pool, hands, chunk):
+    """Seconds to validate ``hands`` hands through validate_batch, excluding conversion"""
+    import numpy as np
+
+    from batch_validation import hands_to_columns, validate_batch
+
+    columns = hands_to_columns([{"players": players, "actions": actions} for players, actions in pool])
+    repeats = -(-min(chunk, hands) // len(pool))
+    per_hand = len(columns["stacks"])
+    offsets = np.repeat(np.arange(repeats) * per_hand, len(columns["hand_ids"]))
+    batch = {
+        "hand_ids": np.tile(columns["hand_ids"], repeats) + offsets,
+        "seats": np.tile(columns["seats"], repeats),
+        "action_codes": np.tile(columns["action_codes"], repeats),
+        "amounts": np.tile(columns["amounts"], repeats),
+        "stacks": np.tile(columns["stacks"], (repeats, 1)),
+    }
+
+    elapsed = 0.0
+    done = 0
+    while done < hands:
+        started = time.perf_counter()
+        result = validate_batch(**batch, small_blind=SMALL_BLIND, big_blind=BIG_BLIND)
+        elapsed += time.perf_counter() - started
+        assert not result["error"].any()
+        done += len(batch["stacks"])
+    return elapsed * hands / done
+
+
+if __name__ == "__main__":
+    main()
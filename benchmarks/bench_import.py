@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Bulk import throughput at different IMPORT_WORKERS settings.
+
+Imports the same random 9-handed hands (with hole cards and a full board)
+through import_hands into a scratch SQLite database once per worker count
+and reports hands per second. Validation, PHH and replay generation fan out
+to the worker processes; the database writes stay in this process, so the
+speedup levels off once writing dominates.
+
+    python benchmarks/bench_import.py --hands 20000 --workers 1 2 4 8
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+fd, DB_PATH = tempfile.mkstemp(suffix=".db")
+os.close(fd)
+os.environ["DATABASE_URL"] = f"sqlite:///{DB_PATH}"
+
+from app import app, db, import_hands, shutdown_prepare_pool  # noqa: E402
+from bench_hand_state import BIG_BLIND, SMALL_BLIND, random_hand  # noqa: E402
+
+DECK = [rank + suit for rank in "23456789TJQKA" for suit in "shdc"]
+
+
+def random_import_hand(rng, number):
+    """A save-hand payload with dealt cards around a random valid action list"""
+    players, actions = random_hand(rng)
+    cards = rng.sample(DECK, 2 * len(players) + 5)
+    board = "".join(cards[-5:])
+    return {
+        "play_id": f"bench-{number}",
+        "players": players,
+        "actions": actions,
+        "small_blind": SMALL_BLIND,
+        "big_blind": BIG_BLIND,
+        "hole_cards": {
+            player["name"]: cards[2 * seat] + cards[2 * seat + 1]
+            for seat, player in enumerate(players)
+        },
+        "flop": board[:6],
+        "turn": board[6:8],
+        "river": board[8:],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--hands", type=int, default=20_000, help="Hands per run")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4], help="IMPORT_WORKERS values")
+    parser.add_argument("--chunk-size", type=int, default=500, help="Hands written per transaction")
+    parser.add_argument("--seed", type=int, default=17)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    hands = [random_import_hand(rng, number) for number in range(args.hands)]
+
+    try:
+        with app.app_context():
+            for workers in args.workers:
+                db.drop_all()
+                db.create_all()
+                app.config["IMPORT_WORKERS"] = workers
+                started = time.perf_counter()
+                results = import_hands(hands, args.chunk_size)
+                elapsed = time.perf_counter() - started
+                shutdown_prepare_pool()
+                failed = sum(1 for result in results if result["status"] == "error")
+                print(
+                    f"{workers:>3} workers: {len(hands) / elapsed:>9,.0f} hands/s "
+                    f"({elapsed:.2f}s, {failed} failed)"
+                )
+            db.session.remove()
+            db.engine.dispose()
+    finally:
+        os.unlink(DB_PATH)
+        for suffix in ("-wal", "-shm"):
+            if os.path.exists(DB_PATH + suffix):
+                os.unlink(DB_PATH + suffix)
+
+
+if __name__ == "__main__":
+    main()
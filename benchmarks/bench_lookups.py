@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Lookup latency benchmark for the hot query paths.
+
+Grows a scratch SQLite database in steps and, at each size, times the lookups
+every replay, detail view, hand list and autocomplete request makes. With the
+declared indexes the latency should stay flat as the tables grow; run with
+--no-indexes to see the full-table-scan baseline.
+
+    python benchmarks/bench_lookups.py --sizes 10000 100000 1000000
+    python benchmarks/bench_lookups.py --sizes 10000 100000 --no-indexes
+"""
+
+import argparse
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models import db  # noqa: E402
+
+PLAYERS_PER_HAND = 3
+ACTIONS_PER_HAND = 7
+NAME_POOL = 5000
+
+LOOKUPS = {
+    "actions by hand": (
+        "SELECT * FROM actions WHERE hand_id = ? ORDER BY action_order",
+        lambda size: (random.randint(1, size),),
+    ),
+    "players by hand": (
+        "SELECT * FROM players WHERE hand_id = ?",
+        lambda size: (random.randint(1, size),),
+    ),
+    "player name": (
+        "SELECT DISTINCT name FROM players WHERE name >= ? AND name < ? LIMIT 20",
+        lambda size: ("Player12", "Player13"),
+    ),
+    "newest hands page": (
+        "SELECT id, play_id, game_type, created_at FROM hands "
+        "ORDER BY created_at DESC, id DESC LIMIT 50",
+        lambda size: (),
+    ),
+}
+
+
+def create_schema(path, with_indexes):
+    """Create the app schema in a fresh database"""
+    engine = create_engine(f"sqlite:///{path}")
+    db.metadata.create_all(engine)
+    if not with_indexes:
+        with engine.begin() as conn:
+            for table in db.metadata.sorted_tables:
+                for index in table.indexes:
+                    conn.exec_driver_sql(f"DROP INDEX {index.name}")
+    engine.dispose()
+
+
+def grow(conn, start, stop):
+    """Insert hands start+1..stop with their players and actions"""
+    base = datetime(2024, 1, 1)
+    hands = []
+    players = []
+    actions = []
+    for hand_id in range(start + 1, stop + 1):
+        hands.append(
+            (hand_id, f"bench-{hand_id}", "No Limit Texas Holdem", "", 1.0, 2.0, "",
+             (base + timedelta(seconds=hand_id)).isoformat(" "))
+        )
+        for seat in range(PLAYERS_PER_HAND):
+            name = f"Player{random.randrange(NAME_POOL)}"
+            players.append((hand_id, name, 100.0, "", "SB"))
+        for order in range(ACTIONS_PER_HAND):
+            actions.append((hand_id, "preflop", "Player0", "call", 2.0, 6.0, 98.0, order))
+    conn.executemany(
+        "INSERT INTO hands (id, play_id, game_type, board, small_blind, big_blind, "
+        "phh_content, created_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+        hands,
+    )
+    conn.executemany(
+        "INSERT INTO players (hand_id, name, stack, hole_cards, position) VALUES (?, ?, ?, ?, ?)",
+        players,
+    )
+    conn.executemany(
+        "INSERT INTO actions (hand_id, street, player_name, action_type, amount, "
+        "pot_size, remaining_stack, action_order) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+        actions,
+    )
+    conn.commit()
+
+
+def time_lookups(conn, size, repeat):
+    """Return the mean latency in microseconds of each lookup"""
+    results = {}
+    for name, (sql, params) in LOOKUPS.items():
+        started = time.perf_counter()
+        for _ in range(repeat):
+            conn.execute(sql, params(size)).fetchall()
+        results[name] = (time.perf_counter() - started) / repeat * 1e6
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000],
+        help="Hand counts to measure at (each hand adds ~10 rows)",
+    )
+    parser.add_argument("--repeat", type=int, default=200, help="Lookups per measurement")
+    parser.add_argument("--no-indexes", action="store_true", help="Drop the declared indexes")
+    args = parser.parse_args()
+
+    fd, path = tempfile.mkstemp(suffix=".db")
+    os.close(fd)
+    try:
+        create_schema(path, with_indexes=not args.no_indexes)
+        conn = sqlite3.connect(path)
+        conn.execute("PRAGMA journal_mode = WAL")
+        conn.execute("PRAGMA synchronous = OFF")
+
+        print(f"{'hands':>12}  " + "  ".join(f"{name:>18}" for name in LOOKUPS))
+        size = 0
+        for target in sorted(args.sizes):
+            grow(conn, size, target)
+            size = target
+            latencies = time_lookups(conn, size, args.repeat)
+            print(f"{size:>12,}  " + "  ".join(f"{latencies[name]:>15.1f} us" for name in LOOKUPS))
+        conn.close()
+    finally:
+        os.unlink(path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+Load test for a running Jamnesia server (pip install -r requirements-dev.txt).
+
+Mixes the read-heavy browsing traffic (hand list, details, replays,
+autocomplete) with an occasional hand save, so it exercises SQLite readers
+and the single writer at the same time. Compare throughput across gunicorn
+configurations, e.g.:
+
+    gunicorn --config gunicorn.conf.py --workers 1 --worker-class sync app:app
+    gunicorn --config gunicorn.conf.py app:app
+
+    locust -f benchmarks/locustfile.py --host http://localhost:8000 \\
+        --headless --users 50 --spawn-rate 10 --run-time 1m
+"""
+
+import random
+import uuid
+
+from locust import HttpUser, between, task
+
+SEED_HANDS = 50
+PATTERNS = ["standard", "heads_up", "all_in", "bluff_fold", "multi_street"]
+
+
+class JamnesiaUser(HttpUser):
+    wait_time = between(0.1, 0.5)
+
+    def on_start(self):
+        """Make sure there are hands to browse, then remember their ids"""
+        hands = self.client.get("/api/hands", params={"limit": SEED_HANDS}).json()
+        for _ in range(max(0, 5 - len(hands))):
+            self.client.post("/api/create-sample", json={"pattern": random.choice(PATTERNS)})
+        if len(hands) < 5:
+            hands = self.client.get("/api/hands", params={"limit": SEED_HANDS}).json()
+        self.play_ids = [hand["play_id"] for hand in hands]
+
+    @task(5)
+    def list_hands(self):
+        self.client.get("/api/hands", params={"limit": 20})
+
+    @task(5)
+    def replay(self):
+        play_id = random.choice(self.play_ids)
+        self.client.get(f"/api/hands/{play_id}/replay", name="/api/hands/[id]/replay")
+
+    @task(3)
+    def details(self):
+        play_id = random.choice(self.play_ids)
+        self.client.get(f"/api/hands/{play_id}/details", name="/api/hands/[id]/details")
+
+    @task(3)
+    def autocomplete(self):
+        self.client.get(
+            "/api/players/names",
+            params={"prefix": random.choice("abcdefghijklmnopqrstuvwxyz"), "limit": 5},
+            name="/api/players/names",
+        )
+
+    @task(1)
+    def save_hand(self):
+        names = [f"Load{random.randrange(1000)}", f"Load{random.randrange(1000, 2000)}"]
+        self.client.post(
+            "/api/save-hand",
+            json={
+                "play_id": f"load-{uuid.uuid4()}",
+                "players": [{"name": name, "stack": 100} for name in names],
+                "small_blind": 1,
+                "big_blind": 2,
+                "actions": [
+                    {"player_name": names[0], "action_type": "call", "amount": 1},
+                    {"player_name": names[1], "action_type": "check"},
+                ],
+            },
+            name="/api/save-hand",
+        )
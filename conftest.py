@@ -0,0 +1,10 @@
+"""Settings shared by every test module, applied before app is imported"""
+
+import os
+import tempfile
+
+# Map the hand rank table from the temp directory rather than instance/, so
+# test runs never write the 16 MB file into the source tree. Later runs reuse it.
+os.environ.setdefault(
+    "HAND_RANK_TABLE", os.path.join(tempfile.gettempdir(), "jamnesia-test-hand_ranks.npy")
+)
@@ -0,0 +1,343 @@
+"""
+Win and tie equity of known hole cards from a partial board.
+
+EquityCalculator deals every possible runout of the missing board cards when
+there are at most ``exact_limit`` of them (any flop or turn spot), and
+otherwise a fixed number of random runouts drawn in NumPy batches from a
+seeded generator, so the same spot always gives the same answer. Each runout
+is scored with HandEvaluator.evaluate_batch, one (runouts, 7) array per
+player.
+
+Results are kept in an LRU keyed by the spot itself (the hands and board
+with card order normalised), so a matchup seen in many saved hands is only
+computed once per process.
+
+Heads-up preflop spots, the most common and the most expensive (1.7 million
+boards), come from PreflopEquityTable instead: the win and tie percentages of
+each of the 169 starting hands (AA, AKs, AKo, ...) against every other, dealt
+with no suit in common. Up to a change of suits that deal is the only one, so
+the table is exact for any two hands whose suits don't interact; hands that
+share a suit (AsKs against QsJs) block each other's flushes and are left to
+EquityCalculator. build_preflop_table samples the table once (a few minutes);
+it is a 114 KB uint16 .npy file that every process maps read-only.
+"""
+
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from itertools import combinations
+from math import comb
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from hand_evaluator import RANKS, parse_cards
+
+# Board cards known when each street begins
+STREET_BOARD_CARDS = {"preflop": 0, "flop": 3, "turn": 4, "river": 5}
+
+
+def _grid_name(row: int, col: int) -> str:
+    suffix = "s" if row < col else "o" if row > col else ""
+    return RANKS[12 - min(row, col)] + RANKS[12 - max(row, col)] + suffix
+
+
+# Starting hands on the usual 13x13 grid, aces first: pairs on the diagonal,
+# suited hands above it and offsuit hands below
+STARTING_HANDS = tuple(_grid_name(row, col) for row in range(13) for col in range(13))
+PREFLOP_TABLE_SHAPE = (2, len(STARTING_HANDS), len(STARTING_HANDS))
+# Percentages are stored in hundredths
+PREFLOP_TABLE_SCALE = 100
+
+Spot = Tuple[Tuple[Tuple[int, ...], ...], Tuple[int, ...]]
+
+
+class EquityCalculator:
+    """Equities of two or more hands, enumerated or sampled"""
+
+    def __init__(
+        self,
+        evaluator: Any,
+        samples: int = 20000,
+        exact_limit: int = 50000,
+        seed: int = 0,
+        cache_size: int = 4096,
+        batch_size: int = 16384,
+    ):
+        self.evaluator = evaluator
+        self.samples = samples
+        self.exact_limit = exact_limit
+        self.seed = seed
+        self.cache_size = cache_size
+        self.batch_size = batch_size
+        self.hits = 0
+        self.misses = 0
+        self._cache: "OrderedDict[Spot, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def calculate(self, hole_cards: Sequence[str], board: str = "") -> Dict[str, Any]:
+        """Equity of each hand in hole_cards ("AsKh", ...) given the board so far.
+
+        Returns "method" ("exact" or "monte_carlo"), "runouts" (boards dealt)
+        and "players": "win", "tie" and "equity" percentages in input order,
+        equity counting a tie as the player's share of the pot. Raises
+        ValueError for malformed, missing or repeated cards.
+        """
+        hands = [tuple(sorted(parse_cards(cards))) for cards in hole_cards]
+        if any(len(hand) != 2 for hand in hands):
+            raise ValueError("Each player needs exactly two hole cards")
+        board_cards = tuple(sorted(parse_cards(board)))
+        if len(board_cards) > 5:
+            raise ValueError(f"Board has {len(board_cards)} cards")
+        dealt = [card for hand in hands for card in hand] + list(board_cards)
+        if len(set(dealt)) != len(dealt):
+            raise ValueError("The same card is dealt twice")
+
+        # Hands in canonical order, so swapped seats share one cache entry
+        order = sorted(range(len(hands)), key=lambda index: hands[index])
+        spot = (tuple(hands[index] for index in order), board_cards)
+        result = self._cached(spot)
+        if result is None:
+            result = self._compute(*spot)
+            self._store(spot, result)
+
+        players: List[Dict[str, float]] = [{}] * len(hands)
+        for position, index in enumerate(order):
+            players[index] = dict(result["players"][position])
+        return {"method": result["method"], "runouts": result["runouts"], "players": players}
+
+    def _cached(self, spot: Spot):
+        with self._lock:
+            result = self._cache.get(spot)
+            if result is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+                self._cache.move_to_end(spot)
+            return result
+
+    def _store(self, spot: Spot, result: Dict[str, Any]) -> None:
+        with self._lock:
+            self._cache[spot] = result
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    def _compute(self, hands, board_cards) -> Dict[str, Any]:
+        missing = 5 - len(board_cards)
+        dealt = {card for hand in hands for card in hand} | set(board_cards)
+        deck = np.array([card for card in range(52) if card not in dealt], dtype=np.uint8)
+
+        wins = np.zeros(len(hands))
+        ties = np.zeros(len(hands))
+        shares = np.zeros(len(hands))
+        if len(hands) < 2:
+            method, runouts = "exact", 1
+            wins[:] = 1
+            shares[:] = 1
+        elif comb(len(deck), missing) <= self.exact_limit:
+            method = "exact"
+            boards = np.array(list(combinations(deck, missing)), dtype=np.uint8)
+            runouts = len(boards)
+            for start in range(0, runouts, self.batch_size):
+                batch = boards[start : start + self.batch_size]
+                self._score(hands, board_cards, batch, wins, ties, shares)
+        else:
+            method, runouts = "monte_carlo", self.samples
+            rng = np.random.default_rng(self.seed)
+            for start in range(0, runouts, self.batch_size):
+                rows = min(self.batch_size, runouts - start)
+                # The first cards of a random permutation of the deck, per row
+                picks = np.argsort(rng.random((rows, len(deck))), axis=1)[:, :missing]
+                self._score(hands, board_cards, deck[picks], wins, ties, shares)
+
+        return {
+            "method": method,
+            "runouts": runouts,
+            "players": [
+                {
+                    "win": round(100.0 * float(win) / runouts, 2),
+                    "tie": round(100.0 * float(tie) / runouts, 2),
+                    "equity": round(100.0 * float(share) / runouts, 2),
+                }
+                for win, tie, share in zip(wins, ties, shares)
+            ],
+        }
+
+    def _score(self, hands, board_cards, boards, wins, ties, shares) -> None:
+        """Add one batch of runouts (an (n, missing) card array) to the tallies"""
+        rows = len(boards)
+        cards = np.empty((rows, 7), dtype=np.uint8)
+        cards[:, 2 : 2 + len(board_cards)] = board_cards
+        cards[:, 2 + len(board_cards) :] = boards
+        strengths = np.empty((len(hands), rows), dtype=np.uint16)
+        for player, hand in enumerate(hands):
+            cards[:, :2] = hand
+            strengths[player] = self.evaluator.evaluate_batch(cards)
+
+        best = strengths == strengths.max(axis=0)
+        winners = best.sum(axis=0)
+        wins += (best & (winners == 1)).sum(axis=1)
+        ties += (best & (winners > 1)).sum(axis=1)
+        shares += (best / winners).sum(axis=1)
+
+
+def _grid_index(first: int, second: int) -> int:
+    row, col = 12 - max(first >> 2, second >> 2), 12 - min(first >> 2, second >> 2)
+    if first & 3 != second & 3:
+        row, col = col, row
+    return row * 13 + col
+
+
+def starting_hand_index(cards: str) -> int:
+    """Index in STARTING_HANDS of two hole cards such as "KhAh" (AKs)"""
+    parsed = parse_cards(cards)
+    if len(parsed) != 2 or parsed[0] == parsed[1]:
+        raise ValueError(f"Invalid hole cards: {cards}")
+    return _grid_index(*parsed)
+
+
+def _starting_hand_combos() -> Tuple[np.ndarray, np.ndarray]:
+    """Card pairs of each starting hand, padded to 12, and how many there are"""
+    combos = np.zeros((len(STARTING_HANDS), 12, 2), dtype=np.uint8)
+    counts = np.zeros(len(STARTING_HANDS), dtype=np.int64)
+    for first, second in combinations(range(52), 2):
+        index = _grid_index(first, second)
+        combos[index, counts[index]] = first, second
+        counts[index] += 1
+    return combos, counts
+
+
+def suits_interact(hole_cards: str, opponent: str) -> bool:
+    """Whether two hands have a suit in common, so the preflop table can't price them"""
+    first, second = parse_cards(hole_cards), parse_cards(opponent)
+    return bool({card & 3 for card in first} & {card & 3 for card in second})
+
+
+def _deal_hole_cards(rng, first: np.ndarray, second: np.ndarray) -> np.ndarray:
+    """(n, 4) hole cards: a random combo of each starting hand, sharing no suit"""
+    combos, counts = STARTING_HAND_COMBOS
+    hole = np.empty((len(first), 4), dtype=np.uint8)
+    pending = np.arange(len(first))
+    while len(pending):
+        for column, hands in ((0, first[pending]), (2, second[pending])):
+            picks = (rng.random(len(pending)) * counts[hands]).astype(np.int64)
+            hole[pending, column : column + 2] = combos[hands, picks]
+        suits = hole[pending] & 3
+        clash = (suits[:, :2, None] == suits[:, None, 2:]).any(axis=(1, 2))
+        # Redeal both hands so every non-clashing pair stays equally likely
+        pending = pending[clash]
+    return hole
+
+
+def _deal_boards(rng, hole: np.ndarray) -> np.ndarray:
+    """(n, 5) random boards avoiding each row's hole cards"""
+    dealt = (np.int64(1) << hole.astype(np.int64)).sum(axis=1)
+    boards = np.empty((len(hole), 5), dtype=np.uint8)
+    pending = np.arange(len(hole))
+    while len(pending):
+        cards = rng.integers(0, 52, (len(pending), 5), dtype=np.uint8)
+        bits = np.int64(1) << cards.astype(np.int64)
+        mask = np.bitwise_or.reduce(bits, axis=1)
+        # Distinct cards set distinct bits, so the OR equals the sum
+        valid = (mask == bits.sum(axis=1)) & (mask & dealt[pending] == 0)
+        boards[pending[valid]] = cards[valid]
+        pending = pending[~valid]
+    return boards
+
+
+def build_preflop_table(
+    evaluator: Any,
+    samples: int = 20000,
+    seed: int = 0,
+    batch_rows: int = 1 << 20,
+    progress: Optional[Callable[[int, int], None]] = None,
+) -> np.ndarray:
+    """Sample the heads-up (win, tie) percentages of every starting-hand matchup.
+
+    Each of the 14,365 matchups is played out ``samples`` times with random
+    boards and suits, the two hands never sharing a suit (see
+    suits_interact), scored with evaluate_batch. table[0, i, j]
+    is how often hand i beats hand j and table[1, i, j] how often they tie,
+    in hundredths of a percent; the lower triangle mirrors the upper one so
+    the two sides always add up to 100%. ``progress`` is called with
+    (matchups done, total) after each batch.
+    """
+    rng = np.random.default_rng(seed)
+    size = len(STARTING_HANDS)
+    matchups = np.array([(i, j) for i in range(size) for j in range(i, size)])
+    full = 100 * PREFLOP_TABLE_SCALE
+    table = np.zeros(PREFLOP_TABLE_SHAPE, dtype=np.uint16)
+    per_batch = max(1, batch_rows // samples)
+    for start in range(0, len(matchups), per_batch):
+        batch = matchups[start : start + per_batch]
+        hole = _deal_hole_cards(
+            rng, np.repeat(batch[:, 0], samples), np.repeat(batch[:, 1], samples)
+        )
+        cards = np.empty((len(hole), 7), dtype=np.uint8)
+        cards[:, 2:] = _deal_boards(rng, hole)
+        cards[:, :2] = hole[:, :2]
+        first = evaluator.evaluate_batch(cards)
+        cards[:, :2] = hole[:, 2:]
+        second = evaluator.evaluate_batch(cards)
+
+        wins = np.rint((first > second).reshape(-1, samples).mean(axis=1) * full)
+        ties = np.rint((first == second).reshape(-1, samples).mean(axis=1) * full)
+        for (i, j), win, tie in zip(batch, wins, ties):
+            if i == j:
+                # Both sides hold the same hand: split what isn't a tie evenly
+                tie -= tie % 2
+                win = (full - tie) // 2
+            table[:, i, j] = win, tie
+            table[:, j, i] = full - win - tie, tie
+        if progress:
+            progress(start + len(batch), len(matchups))
+    return table
+
+
+class PreflopEquityTable:
+    """Heads-up preflop percentages of every starting hand against every other"""
+
+    def __init__(self, table: np.ndarray):
+        self.table = table
+        # Names the table's contents, e.g. in cache keys of responses built from it
+        contents = np.ascontiguousarray(table).tobytes()
+        self.digest = hashlib.blake2b(contents, digest_size=8).hexdigest()
+
+    @classmethod
+    def load(cls, path: str) -> "PreflopEquityTable":
+        """Map a table written by save read-only"""
+        table = np.load(path, mmap_mode="r")
+        if table.dtype != np.uint16 or table.shape != PREFLOP_TABLE_SHAPE:
+            raise ValueError(f"{path} is not a preflop equity table")
+        return cls(table)
+
+    def save(self, path: str) -> None:
+        """Write the table to path, replacing any older file in one rename"""
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        temporary = f"{path}.{os.getpid()}.tmp"
+        with open(temporary, "wb") as fileobj:
+            np.save(fileobj, np.asarray(self.table, dtype=np.uint16))
+        os.replace(temporary, path)
+
+    def lookup(self, hole_cards: str, opponent: str) -> Dict[str, float]:
+        """"win", "tie" and "equity" percentages of hole_cards against opponent.
+
+        Raises ValueError when the hands share a card or a suit.
+        """
+        if len(set(parse_cards(hole_cards + opponent))) != 4:
+            raise ValueError("The same card is dealt twice")
+        if suits_interact(hole_cards, opponent):
+            raise ValueError(f"Suits of {hole_cards} and {opponent} interact")
+        row, col = starting_hand_index(hole_cards), starting_hand_index(opponent)
+        win, tie = (int(value) for value in self.table[:, row, col])
+        return {
+            "win": win / PREFLOP_TABLE_SCALE,
+            "tie": tie / PREFLOP_TABLE_SCALE,
+            "equity": round((win + tie / 2) / PREFLOP_TABLE_SCALE, 2),
+        }
+
+
+STARTING_HAND_COMBOS = _starting_hand_combos()
@@ -1,3 +1,4 @@
+import multiprocessing
 import os
 
 # Render provides PORT environment variable
@@ -5,8 +6,12 @@ port = int(os.environ.get("PORT", 8000))
 
 # Gunicorn configuration for Render deployment
 bind = f"0.0.0.0:{port}"
-workers = 1  # Single worker for SQLite compatibility
-worker_class = "sync"
+# SQLite runs in WAL mode with a busy timeout (see SQLITE_PRAGMAS in app.py), so
+# several workers can share the database file: reads run concurrently and
+# writes queue briefly for the lock.
+workers = int(os.environ.get("WEB_CONCURRENCY", min(multiprocessing.cpu_count() * 2 + 1, 8)))
+worker_class = "gthread"
+threads = int(os.environ.get("GUNICORN_THREADS", 4))
 timeout = 120
 keepalive = 2
 max_requests = 1000
@@ -28,4 +33,26 @@ worker_tmp_dir = "/dev/shm"
 # Security
 limit_request_line = 8190
 limit_request_fields = 100
-limit_request_field_size = 8190
\ No newline at end of file
+limit_request_field_size = 8190
+
+
+def when_ready(server):
+    """Migrate the schema and recover interrupted imports once in the master.
+
+    Runs before any worker is forked, so import jobs left behind by workers
+    that were recycled, redeployed or crashed are marked failed here.
+    """
+    from app import app, db, migrate_database, recover_import_jobs
+
+    migrate_database()
+    recover_import_jobs()
+    with app.app_context():
+        db.engine.dispose()
+
+
+def post_fork(server, worker):
+    """Give each worker its own connections instead of the master's"""
+    from app import app, db
+
+    with app.app_context():
+        db.engine.dispose(close=False)
@@ -0,0 +1,272 @@
+"""
+Lookup-table evaluator for 7-card Texas Hold'em hands.
+
+Cards are integers 0-51, ``rank * 4 + suit`` with ranks 2..A as 0..12 and
+suits c, d, h, s as 0..3 (see card_index). A hand's strength is its
+equivalence class among all 5-card poker hands, from 1 (7-5-4-3-2 offsuit)
+to 7462 (royal flush): higher wins and equal strengths split the pot.
+
+Two tables give the strength of seven cards directly:
+
+- Without a flush the best hand depends only on the multiset of ranks. Each
+  rank has a key chosen so that the sums of seven keys (at most four of a
+  rank) are all distinct, so the key sum is a perfect hash into a table of
+  about 7.8 million entries.
+- With five or more cards of one suit no full house or quads is possible,
+  so the strength is a function of that suit's 13-bit rank mask.
+
+A second key sum, one base-8 digit per suit, finds the flush suit with one
+more lookup. Building the tables takes about a second; HandEvaluator.load
+saves them as one uint16 .npy file (16 MB) and maps it read-only, so every
+process on a host shares the same pages. evaluate_batch runs at roughly
+20 million hands per second per core.
+"""
+
+import os
+from itertools import accumulate, combinations_with_replacement
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+RANKS = "23456789TJQKA"
+SUITS = "cdhs"
+
+# Hand categories, weakest first
+HIGH_CARD = 0
+PAIR = 1
+TWO_PAIR = 2
+THREE_OF_A_KIND = 3
+STRAIGHT = 4
+FLUSH = 5
+FULL_HOUSE = 6
+FOUR_OF_A_KIND = 7
+STRAIGHT_FLUSH = 8
+CATEGORY_NAMES = (
+    "High Card",
+    "Pair",
+    "Two Pair",
+    "Three of a Kind",
+    "Straight",
+    "Flush",
+    "Full House",
+    "Four of a Kind",
+    "Straight Flush",
+)
+# Equivalence classes per category; strengths are numbered weakest first
+CATEGORY_SIZES = (1277, 2860, 858, 858, 10, 1277, 156, 156, 10)
+CATEGORY_STARTS = tuple(accumulate((1,) + CATEGORY_SIZES[:-1]))
+HAND_CLASSES = sum(CATEGORY_SIZES)
+
+# Seven keys (at most four of a rank) never sum to the same value twice
+RANK_KEYS = (0, 1, 5, 22, 98, 453, 2031, 8698, 22854, 83661, 262349, 636345, 1479181)
+SUIT_KEYS = (1, 8, 64, 512)
+RANK_TABLE_SIZE = 4 * RANK_KEYS[12] + 3 * RANK_KEYS[11] + 1
+FLUSH_TABLE_SIZE = 1 << 13
+SUIT_TABLE_SIZE = 8 * SUIT_KEYS[3]
+
+CARD_INDEX = {
+    rank + suit: rank_index * 4 + suit_index
+    for rank_index, rank in enumerate(RANKS)
+    for suit_index, suit in enumerate(SUITS)
+}
+# Rank key and suit key of each card in one integer; seven suit keys stay below 1 << 12
+CARD_KEYS = np.array(
+    [RANK_KEYS[card >> 2] << 12 | SUIT_KEYS[card & 3] for card in range(52)], dtype=np.int64
+)
+CARD_SUITS = np.array([card & 3 for card in range(52)], dtype=np.int8)
+CARD_BITS = np.array([1 << (card >> 2) for card in range(52)], dtype=np.int64)
+
+# Rank masks of the ten straights, highest first, with the high card's rank
+STRAIGHTS = [(0b11111 << (high - 4), high) for high in range(12, 3, -1)] + [(0b1000000001111, 3)]
+
+
+def card_index(card: str) -> int:
+    """Integer encoding of a card such as "As" or "td" """
+    index = CARD_INDEX.get(card[:1].upper() + card[1:].lower())
+    if index is None:
+        raise ValueError(f"Invalid card: {card}")
+    return index
+
+
+def parse_cards(cards: str) -> List[int]:
+    """Integer encodings of concatenated cards such as "AsKh7d" """
+    if len(cards) % 2:
+        raise ValueError(f"Invalid cards: {cards}")
+    return [card_index(cards[i : i + 2]) for i in range(0, len(cards), 2)]
+
+
+def hand_category(strength: int) -> int:
+    """Category (HIGH_CARD .. STRAIGHT_FLUSH) of a strength"""
+    for category in range(len(CATEGORY_STARTS) - 1, -1, -1):
+        if strength >= CATEGORY_STARTS[category]:
+            return category
+    raise ValueError(f"Invalid hand strength: {strength}")
+
+
+def describe_strength(strength: int) -> str:
+    """Category name of a strength, such as "Full House" """
+    return CATEGORY_NAMES[hand_category(strength)]
+
+
+def _pack(category: int, *ranks: int) -> int:
+    """Sortable value of a category and its deciding ranks, highest first"""
+    value = category
+    for slot in range(5):
+        value = value * 16 + (ranks[slot] + 1 if slot < len(ranks) else 0)
+    return value
+
+
+def _straight_high(mask: int) -> Optional[int]:
+    for straight, high in STRAIGHTS:
+        if mask & straight == straight:
+            return high
+    return None
+
+
+def _rank_value(counts: Sequence[int]) -> int:
+    """Value of the best non-flush hand in a rank multiset of 5 to 7 cards"""
+    present = [rank for rank in range(12, -1, -1) if counts[rank]]
+    quads = [rank for rank in present if counts[rank] == 4]
+    trips = [rank for rank in present if counts[rank] == 3]
+    pairs = [rank for rank in present if counts[rank] == 2]
+    if quads:
+        return _pack(FOUR_OF_A_KIND, quads[0], next(r for r in present if r != quads[0]))
+    if trips and (len(trips) > 1 or pairs):
+        return _pack(FULL_HOUSE, trips[0], max(trips[1:] + pairs))
+    mask = sum(1 << rank for rank in present)
+    high = _straight_high(mask)
+    if high is not None:
+        return _pack(STRAIGHT, high)
+    if trips:
+        return _pack(THREE_OF_A_KIND, trips[0], *[r for r in present if r != trips[0]][:2])
+    if len(pairs) >= 2:
+        kicker = [r for r in present if r not in pairs[:2]][:1]
+        return _pack(TWO_PAIR, pairs[0], pairs[1], *kicker)
+    if pairs:
+        return _pack(PAIR, pairs[0], *[r for r in present if r != pairs[0]][:3])
+    return _pack(HIGH_CARD, *present[:5])
+
+
+def _flush_value(mask: int) -> int:
+    """Value of the best hand in one suit's rank mask of 5 to 7 cards"""
+    high = _straight_high(mask)
+    if high is not None:
+        return _pack(STRAIGHT_FLUSH, high)
+    return _pack(FLUSH, *[rank for rank in range(12, -1, -1) if mask >> rank & 1][:5])
+
+
+def _rank_multisets(size: int):
+    for ranks in combinations_with_replacement(range(13), size):
+        counts = [0] * 13
+        for rank in ranks:
+            counts[rank] += 1
+        if max(counts) <= 4:
+            yield ranks, counts
+
+
+def build_tables() -> Tuple[np.ndarray, np.ndarray]:
+    """Build the (flush_table, rank_table) strength arrays"""
+    # Number every distinct 5-card hand value, weakest first
+    values = {_rank_value(counts) for _, counts in _rank_multisets(5)}
+    values.update(_flush_value(mask) for mask in range(FLUSH_TABLE_SIZE) if bin(mask).count("1") == 5)
+    strength_of = {value: strength for strength, value in enumerate(sorted(values), 1)}
+    assert len(strength_of) == HAND_CLASSES
+
+    flush_table = np.zeros(FLUSH_TABLE_SIZE, dtype=np.uint16)
+    for mask in range(FLUSH_TABLE_SIZE):
+        if bin(mask).count("1") >= 5:
+            flush_table[mask] = strength_of[_flush_value(mask)]
+
+    rank_table = np.zeros(RANK_TABLE_SIZE, dtype=np.uint16)
+    for ranks, counts in _rank_multisets(7):
+        rank_table[sum(RANK_KEYS[rank] for rank in ranks)] = strength_of[_rank_value(counts)]
+    return flush_table, rank_table
+
+
+def _build_suit_table() -> np.ndarray:
+    """Flush suit (or -1) for each sum of seven SUIT_KEYS"""
+    table = np.full(SUIT_TABLE_SIZE, -1, dtype=np.int8)
+    for key in range(SUIT_TABLE_SIZE):
+        for suit in range(4):
+            if key // SUIT_KEYS[suit] % 8 >= 5:
+                table[key] = suit
+    return table
+
+
+SUIT_TABLE = _build_suit_table()
+
+
+class HandEvaluator:
+    """Strengths of 7-card hands from the flush and rank tables"""
+
+    def __init__(self, flush_table: np.ndarray, rank_table: np.ndarray):
+        self.flush_table = flush_table
+        self.rank_table = rank_table
+
+    @classmethod
+    def load(cls, path: Optional[str] = None) -> "HandEvaluator":
+        """Map the tables from the .npy file at path, building it if missing.
+
+        Without a path the tables are built in memory. The file is written
+        to a temporary name and renamed, so processes starting together
+        never see a partial table.
+        """
+        if path is None:
+            return cls(*build_tables())
+        if not os.path.exists(path):
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            temporary = f"{path}.{os.getpid()}.tmp"
+            with open(temporary, "wb") as fileobj:
+                np.save(fileobj, np.concatenate(build_tables()))
+            os.replace(temporary, path)
+        table = np.load(path, mmap_mode="r")
+        if table.dtype != np.uint16 or table.shape != (FLUSH_TABLE_SIZE + RANK_TABLE_SIZE,):
+            raise ValueError(f"{path} is not a hand rank table")
+        return cls(table[:FLUSH_TABLE_SIZE], table[FLUSH_TABLE_SIZE:])
+
+    def evaluate(self, cards: Sequence[int]) -> int:
+        """Strength of exactly seven card indexes"""
+        if len(set(cards)) != 7 or len(cards) != 7:
+            raise ValueError(f"Expected 7 distinct cards, got {len(cards)}")
+        suit = SUIT_TABLE[sum(SUIT_KEYS[card & 3] for card in cards)]
+        if suit >= 0:
+            mask = sum(1 << (card >> 2) for card in cards if card & 3 == suit)
+            return int(self.flush_table[mask])
+        return int(self.rank_table[sum(RANK_KEYS[card >> 2] for card in cards)])
+
+    def describe(self, strength: int) -> str:
+        """Category name of a strength, such as "Full House" """
+        return describe_strength(strength)
+
+    def evaluate_string(self, cards: str) -> int:
+        """Strength of seven concatenated cards such as "AsKhQdJcTs2h3h" """
+        return self.evaluate(parse_cards(cards))
+
+    def evaluate_batch(self, cards: np.ndarray, chunk_size: int = 32768) -> np.ndarray:
+        """Strengths of an (n, 7) array of card indexes, as uint16.
+
+        Hands are summed one card column at a time over chunks small enough
+        to stay in cache: one key gather per card, then one table read per
+        hand. Only hands holding a flush take the extra rank-mask pass.
+        """
+        cards = np.asarray(cards)
+        if cards.ndim != 2 or cards.shape[1] != 7:
+            raise ValueError(f"Expected an (n, 7) array of cards, got shape {cards.shape}")
+        strengths = np.empty(len(cards), dtype=np.uint16)
+        for start in range(0, len(cards), chunk_size):
+            columns = cards[start : start + chunk_size].T
+            keys = CARD_KEYS[columns[0]]
+            for column in columns[1:]:
+                keys += CARD_KEYS[column]
+            chunk = self.rank_table[keys >> 12]
+            flush_suits = SUIT_TABLE[keys & 0xFFF]
+            flush_rows = np.flatnonzero(flush_suits >= 0)
+            if len(flush_rows):
+                flush_cards = columns[:, flush_rows].T
+                in_suit = CARD_SUITS[flush_cards] == flush_suits[flush_rows, None]
+                masks = (CARD_BITS[flush_cards] * in_suit).sum(axis=1)
+                chunk[flush_rows] = self.flush_table[masks]
+            strengths[start : start + len(chunk)] = chunk
+        return strengths
@@ -0,0 +1,258 @@
+"""
+Versioned schema migrations.
+
+Each migration runs once per database, in version order, and is recorded in
+the schema_migrations table. They run at process start (gunicorn's master,
+``python app.py``) or explicitly with ``flask --app app migrate`` so no
+request ever pays for DDL checks.
+
+Migration 1 creates tables from the current models, so later migrations may
+run against tables that already have their change; write them to check the
+existing schema first (see create_missing_indexes).
+"""
+
+from collections import defaultdict
+from datetime import datetime
+
+from sqlalchemy import (
+    Column,
+    DateTime,
+    Integer,
+    MetaData,
+    String,
+    Table,
+    delete,
+    insert,
+    inspect,
+    select,
+    text,
+)
+
+from hand_evaluator import HandEvaluator
+from models import (
+    Action,
+    Hand,
+    HandResult,
+    ImportJob,
+    Player,
+    PlayerName,
+    PlayerStats,
+    create_missing_indexes,
+    db,
+)
+from poker_engine import add_player_stats, count_player_stats, replay_stored_hand
+
+# Kept outside db.metadata so db.create_all()/drop_all() leave it alone
+migration_metadata = MetaData()
+schema_migrations = Table(
+    "schema_migrations",
+    migration_metadata,
+    Column("version", Integer, primary_key=True),
+    Column("description", String(200), nullable=False),
+    Column("applied_at", DateTime, nullable=False),
+)
+
+
+def create_base_tables(conn):
+    db.metadata.create_all(conn)
+
+
+def add_lookup_indexes(conn):
+    create_missing_indexes(conn)
+
+
+def backfill_player_names(conn, batch_size=1000):
+    known = set(conn.scalars(select(PlayerName.name)))
+    batch = []
+    for name in conn.scalars(select(Player.name).distinct()):
+        if not name or name in known:
+            continue
+        batch.append({"name": name, "name_key": PlayerName.key_for(name)})
+        if len(batch) >= batch_size:
+            conn.execute(insert(PlayerName), batch)
+            batch = []
+    if batch:
+        conn.execute(insert(PlayerName), batch)
+
+
+def rebuild_player_stats(conn, batch_size=1000):
+    """Recount player_stats from the stored players and actions of every hand.
+
+    Hands are read in hand_id ranges of batch_size. Actions flagged
+    auto_folded (absent before migration 7) get no 3-bet opportunity, as on
+    insert. Returns the number of players written.
+    """
+    conn.execute(delete(PlayerStats))
+    columns = [Action.hand_id, Action.street, Action.player_name, Action.action_type, Action.amount]
+    if "auto_folded" in {column["name"] for column in inspect(conn).get_columns("actions")}:
+        columns.append(Action.auto_folded)
+    totals = {}
+    last_id = 0
+    while True:
+        hand_ids = list(
+            conn.scalars(
+                select(Player.hand_id)
+                .where(Player.hand_id > last_id)
+                .distinct()
+                .order_by(Player.hand_id)
+                .limit(batch_size)
+            )
+        )
+        if not hand_ids:
+            break
+        in_range = (last_id, hand_ids[-1])
+        last_id = hand_ids[-1]
+
+        names = defaultdict(list)
+        for hand_id, name in conn.execute(
+            select(Player.hand_id, Player.name)
+            .where(Player.hand_id > in_range[0], Player.hand_id <= in_range[1])
+            .order_by(Player.hand_id, Player.id)
+        ):
+            names[hand_id].append(name)
+        actions = defaultdict(list)
+        auto_folded = defaultdict(list)
+        for row in conn.execute(
+            select(*columns)
+            .where(Action.hand_id > in_range[0], Action.hand_id <= in_range[1])
+            .order_by(Action.hand_id, Action.action_order)
+        ):
+            actions[row.hand_id].append(row._mapping)
+            if row._mapping.get("auto_folded"):
+                auto_folded[row.hand_id].append(row.player_name)
+        for hand_id in hand_ids:
+            add_player_stats(
+                totals, count_player_stats(names[hand_id], actions[hand_id], auto_folded[hand_id])
+            )
+
+    rows = [dict(totals[name], name=name) for name in sorted(totals)]
+    for start in range(0, len(rows), batch_size):
+        conn.execute(insert(PlayerStats), rows[start : start + batch_size])
+    return len(rows)
+
+
+def create_player_stats(conn):
+    PlayerStats.__table__.create(conn, checkfirst=True)
+    rebuild_player_stats(conn)
+
+
+def rebuild_hand_results(conn, evaluator=None, batch_size=500):
+    """Award the pots of every stored hand again and rewrite hand_results.
+
+    Replays each hand's stored actions and runs its showdown with
+    ``evaluator`` (tables built in memory when None). Returns the number of
+    hands whose pots could be awarded.
+    """
+    conn.execute(delete(HandResult))
+    awarded = 0
+    last_id = 0
+    while True:
+        hands = conn.execute(
+            select(Hand.id, Hand.small_blind, Hand.big_blind, Hand.board)
+            .where(Hand.id > last_id)
+            .order_by(Hand.id)
+            .limit(batch_size)
+        ).all()
+        if not hands:
+            break
+        players = defaultdict(list)
+        for row in conn.execute(
+            select(Player.hand_id, Player.name, Player.stack, Player.hole_cards, Player.position)
+            .where(Player.hand_id > last_id, Player.hand_id <= hands[-1].id)
+            .order_by(Player.hand_id, Player.id)
+        ):
+            players[row.hand_id].append(row)
+        actions = defaultdict(list)
+        for row in conn.execute(
+            select(Action.hand_id, Action.street, Action.player_name, Action.action_type, Action.amount)
+            .where(Action.hand_id > last_id, Action.hand_id <= hands[-1].id)
+            .order_by(Action.hand_id, Action.action_order)
+        ):
+            actions[row.hand_id].append(row)
+        last_id = hands[-1].id
+        evaluator = evaluator or HandEvaluator.load()
+
+        rows = []
+        for hand in hands:
+            state = replay_stored_hand(hand, players[hand.id], actions[hand.id])
+            state.record = False
+            results = state.showdown(evaluator)["results"]
+            if results:
+                awarded += 1
+                rows.extend(
+                    dict(result, hand_id=hand.id, player_name=name)
+                    for name, result in results.items()
+                )
+        if rows:
+            conn.execute(insert(HandResult), rows)
+    return awarded
+
+
+def create_hand_results(conn):
+    HandResult.__table__.create(conn, checkfirst=True)
+    rebuild_hand_results(conn)
+
+
+def add_missing_columns(conn, model, names):
+    """ALTER TABLE ADD COLUMN for each of names the model's table lacks"""
+    table = model.__table__
+    existing = {column["name"] for column in inspect(conn).get_columns(table.name)}
+    for name in names:
+        if name in existing:
+            continue
+        column = table.c[name]
+        ddl = f"ALTER TABLE {table.name} ADD COLUMN {name} {column.type.compile(conn.dialect)}"
+        if column.server_default is not None:
+            default = column.server_default.arg.compile(dialect=conn.dialect)
+            ddl += f"{'' if column.nullable else ' NOT NULL'} DEFAULT {default}"
+        conn.execute(text(ddl))
+
+
+def add_import_job_owner(conn):
+    add_missing_columns(conn, ImportJob, ("owner", "heartbeat_at", "spool_path"))
+
+
+def add_action_auto_folded(conn):
+    # Earlier rows can't be told from folds their players chose, so stay False
+    add_missing_columns(conn, Action, ("auto_folded",))
+
+
+# (version, description, function taking a Connection); append only
+MIGRATIONS = [
+    (1, "Create base tables", create_base_tables),
+    (2, "Add hand/player/action lookup indexes", add_lookup_indexes),
+    (3, "Backfill player_names from players", backfill_player_names),
+    (4, "Add player_stats counted from stored hands", create_player_stats),
+    (5, "Add hand_results awarded from stored hands", create_hand_results),
+    (6, "Add owner and heartbeat to import_jobs", add_import_job_owner),
+    (7, "Flag auto-folded actions", add_action_auto_folded),
+]
+
+
+def applied_versions(conn):
+    """Versions already recorded in schema_migrations"""
+    migration_metadata.create_all(conn)
+    return set(conn.scalars(select(schema_migrations.c.version)))
+
+
+def run_migrations(engine):
+    """Apply pending migrations, each in its own transaction.
+
+    Returns the (version, description) pairs that were applied.
+    """
+    with engine.begin() as conn:
+        done = applied_versions(conn)
+
+    applied = []
+    for version, description, migrate in MIGRATIONS:
+        if version in done:
+            continue
+        with engine.begin() as conn:
+            migrate(conn)
+            conn.execute(
+                insert(schema_migrations).values(
+                    version=version, description=description, applied_at=datetime.utcnow()
+                )
+            )
+        applied.append((version, description))
+    return applied
@@ -2,6 +2,10 @@ from datetime import datetime
 from enum import IntEnum
 
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import inspect
+from sqlalchemy.orm import joinedload, selectinload
+
+from poker_engine import PLAYER_STAT_COUNTERS
 
 db = SQLAlchemy()
 
@@ -28,10 +32,34 @@ class Position(IntEnum):
             return f"P{position_value}"
 
 
+def create_missing_indexes(bind):
+    """Create any declared index that an existing database is missing.
+
+    db.create_all() skips tables that already exist, including their indexes,
+    so databases created before an index was declared need this to catch up.
+    Returns the names of the indexes that were created.
+    """
+    inspector = inspect(bind)
+    created = []
+    for table in db.metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            continue
+        existing = {index["name"] for index in inspector.get_indexes(table.name)}
+        for index in table.indexes:
+            if index.name not in existing:
+                index.create(bind=bind)
+                created.append(index.name)
+    return created
+
+
 class Hand(db.Model):
     """Main poker hand information"""
 
     __tablename__ = "hands"
+    __table_args__ = (
+        # Keyset pagination for the hand list walks (created_at, id) newest first
+        db.Index("ix_hands_created_at_id", "created_at", "id"),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     play_id = db.Column(db.String(100), unique=True, nullable=False)
@@ -46,20 +74,52 @@ class Hand(db.Model):
 
     # Relationships
     players = db.relationship(
-        "Player", backref="hand", lazy=True, cascade="all, delete-orphan"
+        "Player",
+        backref="hand",
+        lazy=True,
+        cascade="all, delete-orphan",
+        order_by="Player.id",
     )
     actions = db.relationship(
-        "Action", backref="hand", lazy=True, cascade="all, delete-orphan"
+        "Action",
+        backref="hand",
+        lazy=True,
+        cascade="all, delete-orphan",
+        order_by="Action.action_order",
+    )
+    replays = db.relationship(
+        "HandReplay", backref="hand", lazy=True, cascade="all, delete-orphan"
+    )
+    results = db.relationship(
+        "HandResult", backref="hand", lazy=True, cascade="all, delete-orphan"
     )
 
     def __repr__(self):
         return f"<Hand {self.play_id}>"
 
+    @classmethod
+    def get_with_details(cls, play_id):
+        """Load a hand with its players and ordered actions already populated.
+
+        Players are joined into the hand query and actions are fetched with a
+        single IN query, so the whole hand costs two round trips and later
+        access to hand.players / hand.actions never queries again.
+        """
+        return (
+            cls.query.options(joinedload(cls.players), selectinload(cls.actions))
+            .filter_by(play_id=play_id)
+            .first()
+        )
+
 
 class Player(db.Model):
     """Player information for each hand"""
 
     __tablename__ = "players"
+    __table_args__ = (
+        db.Index("ix_players_hand_id", "hand_id"),
+        db.Index("ix_players_name", "name"),  # Player-name autocomplete
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     hand_id = db.Column(db.Integer, db.ForeignKey("hands.id"), nullable=False)
@@ -72,10 +132,123 @@ class Player(db.Model):
         return f"<Player {self.name}>"
 
 
+class HandResult(db.Model):
+    """Chips each player put in and won, stored once the hand's pots are awarded.
+
+    Hands whose pots could not be awarded (a contested showdown without the
+    full board or the remaining hole cards) have no rows.
+    """
+
+    __tablename__ = "hand_results"
+    __table_args__ = (
+        db.Index("ix_hand_results_hand_id", "hand_id"),
+        # A player's results in hand order, for winnings graphs
+        db.Index("ix_hand_results_player_name_hand_id", "player_name", "hand_id"),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    hand_id = db.Column(db.Integer, db.ForeignKey("hands.id"), nullable=False)
+    player_name = db.Column(db.String(50), nullable=False)
+    invested = db.Column(db.Float, nullable=False)  # Blinds, bets and calls
+    won = db.Column(db.Float, nullable=False)  # Share of the pots awarded
+    net = db.Column(db.Float, nullable=False)  # won - invested
+
+    def __repr__(self):
+        return f"<HandResult {self.player_name} {self.net}>"
+
+
+class PlayerName(db.Model):
+    """Distinct player names, maintained on insert for autocomplete.
+
+    ``name_key`` is the lowercased name, so a case-insensitive prefix search
+    is a range scan on its index instead of a DISTINCT over every player row.
+    """
+
+    __tablename__ = "player_names"
+    __table_args__ = (db.Index("ix_player_names_name_key", "name_key", "name"),)
+
+    name = db.Column(db.String(50), primary_key=True)
+    name_key = db.Column(db.String(50), nullable=False)
+
+    @staticmethod
+    def key_for(name):
+        """Normalized form that prefix searches compare against"""
+        return name.lower()
+
+    @classmethod
+    def search(cls, prefix="", limit=None):
+        """Names starting with prefix (case-insensitive), alphabetical"""
+        query = cls.query.with_entities(cls.name)
+        if prefix:
+            key = cls.key_for(prefix)
+            # Every key starting with the prefix sorts before prefix + U+10FFFF
+            query = query.filter(cls.name_key >= key, cls.name_key < key + "\U0010ffff")
+        query = query.order_by(cls.name_key, cls.name)
+        if limit is not None:
+            query = query.limit(limit)
+        return [row.name for row in query]
+
+    def __repr__(self):
+        return f"<PlayerName {self.name}>"
+
+
+class PlayerStats(db.Model):
+    """Running per-player totals behind VPIP, PFR, 3-bet, AF and WTSD.
+
+    Every hand insert adds its counts (see count_player_stats) in the same
+    transaction, so reading a player's stats is a primary-key lookup however
+    many hands are stored. ``flask --app app rebuild-player-stats`` recounts
+    everything from the actions table.
+    """
+
+    __tablename__ = "player_stats"
+
+    name = db.Column(db.String(50), primary_key=True)
+    hands = db.Column(db.Integer, nullable=False, default=0)
+    vpip_hands = db.Column(db.Integer, nullable=False, default=0)
+    pfr_hands = db.Column(db.Integer, nullable=False, default=0)
+    three_bet_hands = db.Column(db.Integer, nullable=False, default=0)
+    three_bet_opportunities = db.Column(db.Integer, nullable=False, default=0)
+    postflop_aggressive = db.Column(db.Integer, nullable=False, default=0)
+    postflop_calls = db.Column(db.Integer, nullable=False, default=0)
+    saw_flop_hands = db.Column(db.Integer, nullable=False, default=0)
+    showdown_hands = db.Column(db.Integer, nullable=False, default=0)
+
+    @staticmethod
+    def percentage(count, total):
+        return round(100.0 * count / total, 1) if total else None
+
+    def to_dict(self):
+        """Counters plus the derived rates (None when undefined)"""
+        data = {"name": self.name}
+        data.update((counter, getattr(self, counter)) for counter in PLAYER_STAT_COUNTERS)
+        data.update(
+            {
+                "vpip": self.percentage(self.vpip_hands, self.hands),
+                "pfr": self.percentage(self.pfr_hands, self.hands),
+                "three_bet": self.percentage(self.three_bet_hands, self.three_bet_opportunities),
+                "af": (
+                    round(self.postflop_aggressive / self.postflop_calls, 2)
+                    if self.postflop_calls
+                    else None
+                ),
+                "wtsd": self.percentage(self.showdown_hands, self.saw_flop_hands),
+            }
+        )
+        return data
+
+    def __repr__(self):
+        return f"<PlayerStats {self.name}>"
+
+
 class Action(db.Model):
     """Action details for each hand"""
 
     __tablename__ = "actions"
+    __table_args__ = (
+        # Serves both "actions of a hand" and "in action order" lookups
+        db.Index("ix_actions_hand_id_action_order", "hand_id", "action_order"),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     hand_id = db.Column(db.Integer, db.ForeignKey("hands.id"), nullable=False)
@@ -92,6 +265,55 @@ class Action(db.Model):
         db.Float, default=0.0
     )  # Player's remaining stack after this action
     action_order = db.Column(db.Integer, nullable=False)  # Action sequence order
+    # Fold added by HandState.finish for a player who never acted
+    auto_folded = db.Column(db.Boolean, nullable=False, default=False, server_default=db.false())
 
     def __repr__(self):
         return f"<Action {self.player_name} {self.action_type}>"
+
+
+class HandReplay(db.Model):
+    """Precomputed replay timeline for a hand.
+
+    Hands are immutable once saved, so the step list is built once and stored
+    as gzip-compressed JSON. ``version`` records the replay algorithm that
+    produced the payload; rows from an older algorithm are rebuilt on read.
+    """
+
+    __tablename__ = "hand_replays"
+    __table_args__ = (
+        db.UniqueConstraint("hand_id", "format", name="uq_hand_replays_hand_format"),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    hand_id = db.Column(db.Integer, db.ForeignKey("hands.id"), nullable=False)
+    format = db.Column(db.String(20), nullable=False, default="full")
+    version = db.Column(db.Integer, nullable=False)
+    payload = db.Column(db.LargeBinary, nullable=False)  # gzip-compressed JSON
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<HandReplay {self.hand_id} {self.format} v{self.version}>"
+
+
+class ImportJob(db.Model):
+    """Progress of a streaming NDJSON hand import"""
+
+    __tablename__ = "import_jobs"
+
+    id = db.Column(db.String(36), primary_key=True)  # UUID job id
+    status = db.Column(
+        db.String(20), nullable=False, default="queued"
+    )  # 'queued', 'running', 'completed', 'failed'
+    processed = db.Column(db.Integer, nullable=False, default=0)
+    succeeded = db.Column(db.Integer, nullable=False, default=0)
+    failed = db.Column(db.Integer, nullable=False, default=0)
+    errors = db.Column(db.Text)  # JSON list of the first failed hands
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    finished_at = db.Column(db.DateTime)
+    owner = db.Column(db.String(100))  # "host:pid" of the process running the job
+    heartbeat_at = db.Column(db.DateTime)  # Refreshed after every stored batch
+    spool_path = db.Column(db.String(500))  # Uploaded NDJSON, removed when the job ends
+
+    def __repr__(self):
+        return f"<ImportJob {self.id} {self.status}>"
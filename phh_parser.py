@@ -0,0 +1,215 @@
+import os
+import re
+import sys
+import uuid
+from typing import Any, Dict, Iterator, List
+
+if sys.version_info >= (3, 11):
+    import tomllib
+else:  # tomllib joined the standard library in 3.11; tomli is the same parser
+    import tomli as tomllib
+
+# Lines written as bare actions (the layout generate_phh emits after "# Actions")
+ACTION_LINE = re.compile(r"^\s*(d\s+d[hb]|p\d+\s)")
+# TOML table headers used by .phhs files to hold one hand each: [1], [2], ...
+TABLE_HEADER = re.compile(r"^\s*\[([^\[\]]+)\]\s*$")
+PLAYER_TOKEN = re.compile(r"^p(\d+)$")
+
+PHH_EXTENSIONS = (".phh", ".phhs")
+
+
+def split_phhs(text: str) -> List[str]:
+    """Split a .phhs document into the PHH text of each hand.
+
+    A plain .phh document (no table headers) is returned as a single hand.
+    """
+    sections: List[List[str]] = []
+    current: List[str] = []
+    for line in text.splitlines():
+        if TABLE_HEADER.match(line):
+            if any(l.strip() and not l.lstrip().startswith("#") for l in current):
+                sections.append(current)
+            current = []
+            continue
+        current.append(line)
+    if any(l.strip() and not l.lstrip().startswith("#") for l in current):
+        sections.append(current)
+    return ["\n".join(section) for section in sections]
+
+
+def parse_phh(text: str) -> Dict[str, Any]:
+    """Parse a single PHH hand into its header fields and action list.
+
+    Accepts both standard PHH (``actions = [...]`` TOML array) and the layout
+    written by PokerHandBuilder.generate_phh (bare action lines after the
+    header). The returned dict holds the TOML header keys plus ``actions``.
+    """
+    header_lines = []
+    action_lines = []
+    for line in text.splitlines():
+        if ACTION_LINE.match(line):
+            action_lines.append(line.strip())
+        else:
+            header_lines.append(line)
+
+    try:
+        fields = tomllib.loads("\n".join(header_lines))
+    except tomllib.TOMLDecodeError as e:
+        raise ValueError(f"Invalid PHH header: {e}")
+
+    fields["actions"] = list(fields.get("actions", [])) + action_lines
+    return fields
+
+
+class _BetTracker:
+    """Minimal betting state used to tell checks from calls and bets from raises.
+
+    Streets advance with the same rule process_hand_actions applies, so the
+    translated actions land on the streets the app will assign them.
+    """
+
+    def __init__(self, player_count: int, blinds: List[float]):
+        self.bets = [0.0] * player_count
+        for seat, blind in enumerate(blinds[:player_count]):
+            self.bets[seat] = blind
+        self.current_bet = max(self.bets, default=0.0)
+        self.active = set(range(player_count))
+        self.acted = set()
+
+    def apply(self, seat: int, code: str, amount: float) -> Dict[str, Any]:
+        if code == "f":
+            self.active.discard(seat)
+            action = {"action_type": "fold"}
+        elif code == "cc":
+            if self.current_bet > self.bets[seat]:
+                action = {"action_type": "call"}
+                self.bets[seat] = self.current_bet
+            else:
+                action = {"action_type": "check"}
+        else:  # cbr
+            action_type = "raise" if self.current_bet > 0 else "bet"
+            action = {"action_type": action_type, "amount": amount}
+            self.bets[seat] = amount
+            self.current_bet = max(self.current_bet, amount)
+        self.acted.add(seat)
+        self._maybe_advance_street()
+        return action
+
+    def _maybe_advance_street(self) -> None:
+        if len(self.active) > 1:
+            if not self.active.issubset(self.acted):
+                return
+            if any(self.bets[seat] != self.current_bet for seat in self.active):
+                return
+        self.bets = [0.0] * len(self.bets)
+        self.current_bet = 0.0
+        self.acted = set()
+
+
+def _number(value: Any) -> float:
+    return float(value) if value is not None else 0.0
+
+
+def phh_to_hand_data(parsed: Dict[str, Any], play_id: str = None) -> Dict[str, Any]:
+    """Convert a parsed PHH hand into the payload accepted by /api/save-hand.
+
+    ``cc`` becomes check or call and ``cbr`` becomes bet or raise depending on
+    the betting state. Player tokens are zero-based when the hand refers to
+    ``p0`` (generate_phh output) and one-based otherwise (standard PHH).
+    """
+    stacks = [_number(stack) for stack in parsed.get("starting_stacks", [])]
+    if not stacks:
+        raise ValueError("PHH hand has no starting_stacks")
+    player_count = len(stacks)
+
+    names = parsed.get("players") or [f"p{i + 1}" for i in range(player_count)]
+    if len(names) != player_count:
+        raise ValueError("PHH players and starting_stacks lengths differ")
+
+    blinds = [_number(blind) for blind in parsed.get("blinds_or_straddles", [])]
+    posted = sorted(blind for blind in blinds if blind > 0)
+    small_blind = posted[0] if posted else 0.0
+    big_blind = posted[1] if len(posted) > 1 else small_blind
+
+    tokens = [action.split() for action in parsed.get("actions", [])]
+    zero_based = any(token == "p0" for parts in tokens for token in parts[:3])
+    offset = 0 if zero_based else 1
+
+    def seat_of(token: str) -> int:
+        match = PLAYER_TOKEN.match(token)
+        seat = int(match.group(1)) - offset if match else -1
+        if not 0 <= seat < player_count:
+            raise ValueError(f"Unknown PHH player: {token}")
+        return seat
+
+    tracker = _BetTracker(player_count, blinds)
+    hole_cards = {}
+    board_cards = []
+    actions = []
+    for parts in tokens:
+        if parts[0] == "d":
+            if parts[1] == "dh" and len(parts) >= 4 and "?" not in parts[3]:
+                hole_cards[names[seat_of(parts[2])]] = parts[3]
+            elif parts[1] == "db" and len(parts) >= 3:
+                board_cards.append(parts[2])
+            continue
+
+        seat = seat_of(parts[0])
+        code = parts[1] if len(parts) > 1 else ""
+        if code not in ("f", "cc", "cbr"):
+            continue  # showdown and other non-betting actions
+        amount = _number(parts[2]) if code == "cbr" and len(parts) > 2 else 0.0
+        action = tracker.apply(seat, code, amount)
+        action["player_name"] = names[seat]
+        actions.append(action)
+
+    hand_data = {
+        "players": [{"name": name, "stack": stack} for name, stack in zip(names, stacks)],
+        "actions": actions,
+        "small_blind": small_blind,
+        "big_blind": big_blind,
+    }
+    if play_id:
+        hand_data["play_id"] = play_id
+    if hole_cards:
+        hand_data["hole_cards"] = hole_cards
+    for street, cards in zip(("flop", "turn", "river"), board_cards):
+        hand_data[street] = cards
+    return hand_data
+
+
+def load_phh_file(path: str) -> List[Dict[str, Any]]:
+    """Parse every hand in a .phh/.phhs file into save-hand payloads.
+
+    Each hand gets a play_id derived from the file path and its position in
+    the file, so re-importing the same archive is reported as duplicates
+    rather than stored twice. Hands that fail to parse are returned as the
+    ValueError describing them, and a file that cannot be read as one
+    ValueError.
+    """
+    try:
+        with open(path, encoding="utf-8") as phh_file:
+            text = phh_file.read()
+    except (OSError, UnicodeDecodeError) as e:
+        return [ValueError(f"{path}: {e}")]
+
+    hands = []
+    for index, section in enumerate(split_phhs(text)):
+        play_id = str(uuid.uuid5(uuid.NAMESPACE_URL, f"{os.path.abspath(path)}#{index}"))
+        try:
+            hands.append(phh_to_hand_data(parse_phh(section), play_id))
+        except (ValueError, KeyError, TypeError, IndexError) as e:
+            hands.append(ValueError(f"{path} hand {index}: {e}"))
+    return hands
+
+
+def iter_phh_paths(paths: List[str]) -> Iterator[str]:
+    """Expand files and directories into the PHH files they contain, sorted"""
+    for path in paths:
+        if os.path.isdir(path):
+            for root, _, files in sorted(os.walk(path)):
+                for name in sorted(files):
+                    if name.endswith(PHH_EXTENSIONS):
+                        yield os.path.join(root, name)
+        else:
+            yield path
@@ -1,6 +1,61 @@
 import uuid
 from datetime import datetime
-from typing import Any, Dict, List
+from typing import Any, Dict, Iterable, List, Optional
+
+STREETS = ("preflop", "flop", "turn", "river")
+
+
+def phh_header_lines(stacks: List[float], small_blind: float, big_blind: float) -> List[str]:
+    """PHH header for a hand with the given starting stacks, seat order"""
+    player_count = len(stacks)
+    lines = ['variant = "NLHE"', "ante_trimming_status = true"]
+    lines.append(f"antes = [{', '.join(['0'] * player_count)}]")
+
+    # Handle blinds based on player count
+    if player_count == 0:
+        blinds_list = []
+    elif player_count == 1:
+        blinds_list = [str(int(small_blind))]
+    else:
+        blinds_list = [str(int(small_blind)), str(int(big_blind))]
+        blinds_list.extend(["0"] * (player_count - 2))
+
+    lines.append(f"blinds_or_straddles = [{', '.join(blinds_list)}]")
+    lines.append(f"min_bet = {int(big_blind)}")
+    lines.append(f"starting_stacks = [{', '.join(str(int(stack)) for stack in stacks)}]")
+    return lines
+
+
+def phh_deal_lines(
+    names: List[str], hole_cards: Dict[str, str], board: Dict[str, str]
+) -> List[str]:
+    """PHH dealing lines: hole cards by seat, then each dealt board street"""
+    lines = []
+    if hole_cards:
+        for seat, name in enumerate(names):
+            if name in hole_cards:
+                lines.append(f"d dh p{seat} {hole_cards[name]}")
+    for street in ("flop", "turn", "river"):
+        if street in board:
+            lines.append(f"d db {board[street]}")
+    return lines
+
+
+def phh_action_line(seat: int, action_type: str, amount: float = 0) -> Optional[str]:
+    """PHH line for a player action, or None for types PHH does not record"""
+    if action_type == "fold":
+        return f"p{seat} f"
+    if action_type in ("check", "call"):
+        return f"p{seat} cc"
+    if action_type in ("bet", "raise"):
+        return f"p{seat} cbr {int(amount)}"
+    return None
+
+
+def parse_board(board: str) -> List[str]:
+    """Split a board string into cards: "AhKd5c" -> ["Ah", "Kd", "5c"]"""
+    board_str = board.replace(" ", "")
+    return [board_str[i : i + 2] for i in range(0, len(board_str) - 1, 2)]
 
 
 class PokerHandBuilder:
@@ -8,6 +63,7 @@ class PokerHandBuilder:
 
     def __init__(self):
         self.hand_data = {}
+        self.player_seats: Dict[str, int] = {}
 
     def create_game(
         self,
@@ -17,6 +73,10 @@ class PokerHandBuilder:
     ) -> None:
         """Create a new game"""
 
+        # Seat of each name, built once so actions are not matched by scanning
+        self.player_seats = {}
+        for seat, player in enumerate(players):
+            self.player_seats.setdefault(player["name"], seat)
         self.hand_data = {
             "players": players,
             "small_blind": small_blind,
@@ -57,79 +117,33 @@ class PokerHandBuilder:
 
     def generate_phh(self) -> str:
         """Generate PHH format string"""
-        phh_lines = []
-
         # Handle case where game wasn't created
         if not self.hand_data:
             return 'variant = "NLHE"'
 
-        # Get player count and blinds
+        # Header, then the actions section with hole cards and board cards
         players = self.hand_data.get("players", [])
-        player_count = len(players)
-        small_blind = self.hand_data.get("small_blind", 1.0)
-        big_blind = self.hand_data.get("big_blind", 2.0)
-
-        # Header
-        phh_lines.append('variant = "NLHE"')
-        phh_lines.append(f"ante_trimming_status = true")
-        phh_lines.append(f"antes = [{', '.join(['0'] * player_count)}]")
-
-        # Handle blinds based on player count
-        if player_count == 0:
-            blinds_list = []
-        elif player_count == 1:
-            blinds_list = [str(int(small_blind))]
-        else:
-            blinds_list = [str(int(small_blind)), str(int(big_blind))]
-            blinds_list.extend(["0"] * (player_count - 2))
-
-        phh_lines.append(f"blinds_or_straddles = [{', '.join(blinds_list)}]")
-        phh_lines.append(f"min_bet = {int(big_blind)}")
-
-        # Starting stacks
-        stacks = [str(int(p["stack"])) for p in players]
-        phh_lines.append(f"starting_stacks = [{', '.join(stacks)}]")
-
-        # Actions section
-        phh_lines.append("")
-        phh_lines.append("# Actions")
-
-        # Hole cards
-        hole_cards = self.hand_data.get("hole_cards", {})
-        if hole_cards:
-            for i, player in enumerate(players):
-                if player["name"] in hole_cards:
-                    cards = hole_cards[player["name"]]
-                    phh_lines.append(f"d dh p{i} {cards}")
-
-        # Board cards
-        if "flop" in self.hand_data:
-            flop = self.hand_data["flop"]
-            phh_lines.append(f"d db {flop}")
-        if "turn" in self.hand_data:
-            turn = self.hand_data["turn"]
-            phh_lines.append(f"d db {turn}")
-        if "river" in self.hand_data:
-            river = self.hand_data["river"]
-            phh_lines.append(f"d db {river}")
+        phh_lines = phh_header_lines(
+            [p["stack"] for p in players],
+            self.hand_data.get("small_blind", 1.0),
+            self.hand_data.get("big_blind", 2.0),
+        )
+        phh_lines += ["", "# Actions"]
+        phh_lines += phh_deal_lines(
+            [p["name"] for p in players],
+            self.hand_data.get("hole_cards", {}),
+            {street: self.hand_data[street] for street in STREETS if street in self.hand_data},
+        )
 
         # Player actions
-        actions = self.hand_data.get("actions", [])
-        for action in actions:
-            player_idx = self._get_player_index(action["player_name"])
-            action_type = action["action_type"]
-            amount = action.get("amount", 0)
-
-            if action_type == "fold":
-                phh_lines.append(f"p{player_idx} f")
-            elif action_type == "check":
-                phh_lines.append(f"p{player_idx} cc")
-            elif action_type == "call":
-                phh_lines.append(f"p{player_idx} cc")
-            elif action_type == "bet":
-                phh_lines.append(f"p{player_idx} cbr {int(amount)}")
-            elif action_type == "raise":
-                phh_lines.append(f"p{player_idx} cbr {int(amount)}")
+        for action in self.hand_data.get("actions", []):
+            line = phh_action_line(
+                self._get_player_index(action["player_name"]),
+                action["action_type"],
+                action.get("amount", 0),
+            )
+            if line:
+                phh_lines.append(line)
 
         return "\n".join(phh_lines)
 
@@ -146,11 +160,660 @@ class PokerHandBuilder:
 
     def _get_player_index(self, player_name: str) -> int:
         """Get player index from player name"""
-        players = self.hand_data.get("players", [])
-        for i, player in enumerate(players):
-            if player["name"] == player_name:
-                return i
-        raise ValueError(f"Player {player_name} not found")
+        seat = self.player_seats.get(player_name)
+        if seat is None:
+            raise ValueError(f"Player {player_name} not found")
+        return seat
+
+
+# Per-player counters summed across hands; the rates are ratios of these
+PLAYER_STAT_COUNTERS = (
+    "hands",
+    "vpip_hands",  # Put money in voluntarily preflop
+    "pfr_hands",  # Bet or raised preflop
+    "three_bet_hands",  # Re-raised a single preflop raise
+    "three_bet_opportunities",  # Acted preflop facing a single raise
+    "postflop_aggressive",  # Flop/turn/river bets and raises
+    "postflop_calls",  # Flop/turn/river calls
+    "saw_flop_hands",
+    "showdown_hands",  # Still in when the river betting ended
+)
+
+
+def count_player_stats(
+    names: List[str], actions: List[Dict[str, Any]], auto_folded: Iterable[str] = ()
+) -> Dict[str, Dict[str, int]]:
+    """PLAYER_STAT_COUNTERS for each player of one hand.
+
+    ``actions`` are the stored actions of the hand (street, player_name,
+    action_type, amount), including the trailing preflop auto-folds. The big
+    blind counts as the opening bet, so the first preflop raise is the 2-bet
+    and a raise over it is a 3-bet. Zero-amount calls are checks.
+    ``auto_folded`` names the players HandState.finish folded for never
+    acting; they made no decision, so their fold is no 3-bet opportunity.
+    """
+    stats = {name: dict.fromkeys(PLAYER_STAT_COUNTERS, 0) for name in names}
+    for counts in stats.values():
+        counts["hands"] = 1
+
+    raises = 0
+    faced_single_raise = set(auto_folded)
+    folded_preflop = set()
+    folded = set()
+    streets = set()
+    for action in actions:
+        counts = stats.get(action["player_name"])
+        if counts is None:
+            continue
+        street = action["street"]
+        action_type = action["action_type"]
+        aggressive = action_type in ("bet", "raise")
+        paid = aggressive or (action_type == "call" and (action.get("amount") or 0) > 0)
+        streets.add(street)
+        if action_type == "fold":
+            folded.add(action["player_name"])
+        if street == "preflop":
+            if action_type == "fold":
+                folded_preflop.add(action["player_name"])
+            if paid:
+                counts["vpip_hands"] = 1
+            if aggressive:
+                counts["pfr_hands"] = 1
+            if raises == 1 and action["player_name"] not in faced_single_raise:
+                faced_single_raise.add(action["player_name"])
+                counts["three_bet_opportunities"] = 1
+                if aggressive:
+                    counts["three_bet_hands"] = 1
+            if aggressive:
+                raises += 1
+        elif aggressive:
+            counts["postflop_aggressive"] += 1
+        elif paid:
+            counts["postflop_calls"] += 1
+
+    reached_flop = bool(streets - {"preflop"})
+    remaining = [name for name in stats if name not in folded]
+    for name, counts in stats.items():
+        if reached_flop and name not in folded_preflop:
+            counts["saw_flop_hands"] = 1
+        if "river" in streets and len(remaining) > 1 and name not in folded:
+            counts["showdown_hands"] = 1
+    return stats
+
+
+def add_player_stats(
+    totals: Dict[str, Dict[str, int]], stats: Dict[str, Dict[str, int]]
+) -> Dict[str, Dict[str, int]]:
+    """Add one hand's count_player_stats output into running totals"""
+    for name, counts in stats.items():
+        total = totals.setdefault(name, dict.fromkeys(PLAYER_STAT_COUNTERS, 0))
+        for counter, value in counts.items():
+            total[counter] += value
+    return totals
+
+
+def split_pots(contributions: List[float], eligible: List[bool]) -> List[Dict[str, Any]]:
+    """Main pot and side pots from what each player put in over the hand.
+
+    ``eligible`` marks the players who have not folded. Each distinct amount
+    put in by an eligible player caps one pot, contested by the eligible
+    players who put in at least that much; folded players' chips above the
+    top cap join the last pot (or make one for every eligible player when
+    none of them put anything in). A bet nobody called becomes a pot of its own
+    with the bettor as the only eligible player. Returns [{"amount",
+    "eligible": [index]}], main pot first, skipping empty pots.
+    """
+    pots = []
+    previous = 0.0
+    for level in sorted({paid for paid, live in zip(contributions, eligible) if live}):
+        amount = sum(min(paid, level) - min(paid, previous) for paid in contributions)
+        if amount > 0:
+            pots.append(
+                {
+                    "amount": round(amount, 2),
+                    "eligible": [
+                        index
+                        for index, (paid, live) in enumerate(zip(contributions, eligible))
+                        if live and paid >= level
+                    ],
+                }
+            )
+        previous = level
+    dead = sum(paid - min(paid, previous) for paid in contributions)
+    if dead > 0 and pots:
+        pots[-1]["amount"] = round(pots[-1]["amount"] + dead, 2)
+    elif dead > 0 and any(eligible):
+        # Everyone folded to players who put nothing in
+        pots.append(
+            {"amount": round(dead, 2), "eligible": [i for i, live in enumerate(eligible) if live]}
+        )
+    return pots
+
+
+def replay_stored_hand(hand: Any, players: List[Any], actions: List[Any]) -> "HandState":
+    """HandState with a stored hand's actions replayed onto its display state.
+
+    Takes rows with the Hand, Player and Action column names as attributes
+    (model instances or query result rows), actions in action_order.
+    """
+    state = HandState(
+        [
+            {
+                "name": player.name,
+                "stack": player.stack,
+                "hole_cards": player.hole_cards,
+                "position": player.position,
+            }
+            for player in players
+        ],
+        hand.small_blind,
+        hand.big_blind,
+        hand.board or "",
+    )
+    for action in actions:
+        state.replay_action(action.player_name, action.action_type, action.amount, action.street)
+    return state
+
+
+class HandState:
+    """Single walk over a hand's action stream.
+
+    Each action is validated against the betting state and turned into its
+    stored form (street, amount, pot_size, remaining_stack) once, and the same
+    step emits its PHH line and replay frame. Streets advance automatically
+    when every active player who is not all-in has acted and matched the
+    current bet.
+
+    Players are dicts with "name" and "stack" and, for replay frames,
+    "position" and "hole_cards". State is kept per slot, one slot per distinct
+    name in first-seen order: a repeated name takes the later player's stack
+    and position and the earlier seat number. Per-slot values live in
+    fixed-size lists, and active/acted/matched-the-bet flags are bitmasks, so
+    checking whether the betting round is over costs O(1) per action.
+
+    The validation state posts blinds from the first two seats, while replay
+    frames post them from the players in the "SB" and "BB" positions, matching
+    how stored hands have always been replayed. ``remaining_stack`` is the
+    stack minus this street's bet.
+    """
+
+    __slots__ = (
+        "slot_of",
+        "names",
+        "phh_seats",
+        "seat_slots",
+        "starting_stacks",
+        "small_blind",
+        "big_blind",
+        "board_cards",
+        # Betting state
+        "stacks",
+        "bets",
+        "pot",
+        "current_bet",
+        "street_index",
+        "active",  # Bit per slot: not folded
+        "acted",  # Bit per slot: acted this street
+        "matched",  # Bit per slot: bet equals current_bet
+        "has_actions",  # Bit per slot: submitted any action
+        "all_in",  # Bit per slot: no chips left to bet
+        "committed",  # Chips put in on earlier streets
+        "auto_folded",  # Names folded by finish() for never acting
+        # Outputs
+        "record",
+        "phh_actions",
+        "steps",
+        # Replay display state
+        "hole_cards",
+        "positions",
+        "shown_stacks",
+        "shown_bets",
+        "shown_active",
+        "shown_pot",
+        "shown_street",
+        "shown_board",
+    )
+
+    def __init__(
+        self,
+        players: List[Dict[str, Any]],
+        small_blind: float = 1.0,
+        big_blind: float = 2.0,
+        board: str = "",
+        record: bool = True,
+    ):
+        self.slot_of: Dict[str, int] = {}
+        self.names: List[str] = []
+        self.phh_seats: List[int] = []  # First seat with each name, as PHH refers to it
+        self.stacks: List[float] = []
+        self.hole_cards: List[Optional[str]] = []
+        self.positions: List[Optional[str]] = []
+        self.seat_slots: List[int] = []
+        for seat, player in enumerate(players):
+            name = player["name"]
+            slot = self.slot_of.get(name)
+            if slot is None:
+                slot = self.slot_of[name] = len(self.names)
+                self.names.append(name)
+                self.phh_seats.append(seat)
+                self.stacks.append(player["stack"])
+                self.hole_cards.append(player.get("hole_cards"))
+                self.positions.append(player.get("position"))
+            else:
+                self.stacks[slot] = player["stack"]
+                self.hole_cards[slot] = player.get("hole_cards")
+                self.positions[slot] = player.get("position")
+            self.seat_slots.append(slot)
+        self.starting_stacks = [p["stack"] for p in players]
+
+        slot_count = len(self.names)
+        everyone = (1 << slot_count) - 1
+        self.small_blind = small_blind
+        self.big_blind = big_blind
+        self.board_cards = parse_board(board) if board else []
+        self.street_index = 0
+        self.bets: List[float] = [0] * slot_count
+        self.pot = 0.0
+        self.current_bet = 0
+        if len(players) >= 2:
+            self.bets[self.seat_slots[0]] = small_blind
+            self.bets[self.seat_slots[1]] = big_blind
+            self.pot = small_blind + big_blind
+            self.current_bet = big_blind
+        self.active = everyone
+        self.acted = 0
+        self.has_actions = 0
+        self.auto_folded: List[str] = []
+        self.committed: List[float] = [0] * slot_count
+        self.matched = 0
+        self.all_in = 0
+        for slot, bet in enumerate(self.bets):
+            if bet == self.current_bet:
+                self.matched |= 1 << slot
+            if bet and bet >= self.stacks[slot]:  # Blind took the whole stack
+                self.all_in |= 1 << slot
+
+        self.record = record
+        self.phh_actions: List[str] = []
+        self.steps: List[Dict[str, Any]] = []
+        self.shown_stacks = [float(stack) for stack in self.stacks]
+        self.shown_bets: List[float] = [0] * slot_count
+        self.shown_active = everyone
+        self.shown_pot = 0
+        self.shown_street = "preflop"
+        self.shown_board: List[str] = []
+        if record:
+            self._record_start(players)
+
+    @property
+    def street(self) -> str:
+        return STREETS[self.street_index]
+
+    def process(self, actions: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Apply every action, then auto-fold players who never acted"""
+        processed = []
+        for action in actions:
+            result = self.apply(action["player_name"], action["action_type"], action.get("amount", 0))
+            if result:
+                processed.append(result)
+        processed.extend(self.finish())
+        return processed
+
+    def apply(self, player_name: str, action_type: str, amount: float = 0) -> Optional[Dict[str, Any]]:
+        """Validate one action and return its stored form.
+
+        Raises ValueError for unknown or folded players, all-in players doing
+        anything but fold, checking into a bet and betting more than is left
+        of the stack after earlier streets. Unknown action types count as having acted but produce no
+        stored action.
+        """
+        slot = self.slot_of.get(player_name)
+        if slot is None:
+            raise ValueError(f"Player {player_name} not found")
+        bit = 1 << slot
+        self.has_actions |= bit
+        if not self.active & bit:
+            raise ValueError(f"Player {player_name} has already folded")
+        if self.all_in & bit and action_type != "fold":  # Conceding is still allowed
+            raise ValueError(f"Player {player_name} is already all-in")
+
+        bets = self.bets
+        if action_type == "fold":
+            self.active &= ~bit
+            amount = 0
+        elif action_type == "check":
+            if self.current_bet > bets[slot]:
+                raise ValueError(f"{player_name} cannot check when there's a bet to call")
+            amount = 0
+        elif action_type == "call":
+            call_amount = max(0, self.current_bet - bets[slot])
+            amount = min(call_amount, self.stacks[slot] - self.committed[slot] - bets[slot])
+            bets[slot] += amount
+            self.pot += amount
+            self._update_matched(slot, bit)
+        elif action_type in ("bet", "raise"):
+            additional_amount = amount - bets[slot]
+            available_chips = self.stacks[slot] - self.committed[slot] - bets[slot]
+            if additional_amount > available_chips:
+                raise ValueError(
+                    f"{player_name} cannot bet ${amount} (only ${available_chips} additional available)"
+                )
+            bets[slot] = amount
+            self.pot += additional_amount
+            if amount > self.current_bet:
+                # Nobody else can have put in more than the old current bet
+                self.current_bet = amount
+                self.matched = bit
+            else:
+                self._update_matched(slot, bit)
+
+        paid = action_type in ("call", "bet", "raise")
+        if paid and self.committed[slot] + bets[slot] >= self.stacks[slot]:
+            self.all_in |= bit
+
+        result = None
+        if action_type in ("fold", "check", "call", "bet", "raise"):
+            result = self._emit(slot, action_type, amount, self.street)
+
+        self.acted |= bit
+        if self._betting_round_complete() and self.street_index < len(STREETS) - 1:
+            self.street_index += 1
+            for other, bet in enumerate(bets):
+                self.committed[other] += bet
+            self.current_bet = 0
+            self.bets = [0] * len(bets)
+            self.acted = 0
+            self.matched = (1 << len(bets)) - 1
+        return result
+
+    def finish(self) -> List[Dict[str, Any]]:
+        """Fold, in seat order, every player with no recorded action.
+
+        Their names are kept in ``auto_folded``.
+        """
+        folds = []
+        for slot in self.seat_slots:
+            if not self.has_actions & (1 << slot):
+                folds.append(self._emit(slot, "fold", 0, "preflop"))
+                self.auto_folded.append(self.names[slot])
+        return folds
+
+    def _update_matched(self, slot: int, bit: int) -> None:
+        if self.bets[slot] == self.current_bet:
+            self.matched |= bit
+        else:
+            self.matched &= ~bit
+
+    def _betting_round_complete(self) -> bool:
+        active = self.active
+        if active & (active - 1) == 0:  # At most one player left
+            return True
+        # All-in players have no decisions left, whatever they put in
+        pending = active & ~self.all_in
+        return pending & ~self.acted == 0 and pending & ~self.matched == 0
+
+    def _emit(self, slot: int, action_type: str, amount: float, street: str) -> Dict[str, Any]:
+        action = {
+            "player_name": self.names[slot],
+            "action_type": action_type,
+            "amount": amount,
+            "street": street,
+            "pot_size": self.pot,
+            "remaining_stack": self.stacks[slot] - self.bets[slot],
+        }
+        self.phh_actions.append(phh_action_line(self.phh_seats[slot], action_type, amount))
+        if self.record:
+            self.replay_action(self.names[slot], action_type, amount, street)
+        return action
+
+    def phh(self, hole_cards: Dict[str, str], board: Dict[str, str]) -> str:
+        """PHH text for the hand: header, dealt cards, then the applied actions.
+
+        ``board`` maps "flop"/"turn"/"river" to the cards dealt on each.
+        """
+        lines = phh_header_lines(self.starting_stacks, self.small_blind, self.big_blind)
+        lines += ["", "# Actions"]
+        lines += phh_deal_lines([self.names[slot] for slot in self.seat_slots], hole_cards, board)
+        lines += self.phh_actions
+        return "\n".join(lines)
+
+    # Replay frames
+
+    def _frame(self, step_fields: Dict[str, Any]) -> Dict[str, Any]:
+        frame = {
+            "step": len(self.steps),
+            "description": step_fields["description"],
+            "street": step_fields["street"],
+            "players": [
+                {
+                    "name": self.names[slot],
+                    "stack": self.shown_stacks[slot],
+                    "hole_cards": self.hole_cards[slot],
+                    "position": self.positions[slot],
+                    "current_bet": self.shown_bets[slot],
+                    "is_active": bool(self.shown_active & (1 << slot)),
+                }
+                for slot in range(len(self.names))
+            ],
+            "pot_size": self.shown_pot,
+            "board": self.shown_board.copy(),
+            "current_bet": step_fields["current_bet"],
+            "action": step_fields["action"],
+        }
+        self.steps.append(frame)
+        return frame
+
+    def _record_start(self, players: List[Dict[str, Any]]) -> None:
+        self._frame(
+            {"description": "Hand begins", "street": "preflop", "current_bet": 0, "action": None}
+        )
+        if len(players) < 2:
+            return
+
+        sb_name = next((p["name"] for p in players if p.get("position") == "SB"), None)
+        bb_name = next((p["name"] for p in players if p.get("position") == "BB"), None)
+        small_blind = float(self.small_blind)
+        big_blind = float(self.big_blind)
+        for name, blind in ((sb_name, small_blind), (bb_name, big_blind)):
+            if name is not None:
+                slot = self.slot_of[name]
+                self.shown_stacks[slot] -= blind
+                self.shown_bets[slot] = blind
+                self.shown_pot += blind
+
+        self._frame(
+            {
+                "description": f"Blinds posted: {sb_name or 'SB'} (${small_blind}), {bb_name or 'BB'} (${big_blind})",
+                "street": "preflop",
+                "current_bet": big_blind,
+                "action": {"type": "blinds", "description": "Blinds posted"},
+            }
+        )
+
+    def replay_action(self, player_name: str, action_type: str, amount: float, street: str) -> None:
+        """Add the replay frame(s) for an already-validated action"""
+        amount = float(amount)
+        if street != self.shown_street:
+            self.shown_street = street
+            cards_on_street = {"flop": 3, "turn": 4, "river": 5}.get(street)
+            if cards_on_street and len(self.board_cards) >= cards_on_street:
+                self.shown_board = self.board_cards[:cards_on_street]
+            self.shown_bets = [0] * len(self.names)
+            self._frame(
+                {
+                    "description": f"{street.capitalize()} - waiting for action",
+                    "street": street,
+                    "current_bet": 0,
+                    "action": None,
+                }
+            )
+
+        slot = self.slot_of.get(player_name)
+        if slot is not None:
+            if action_type == "fold":
+                self.shown_active &= ~(1 << slot)
+                self.shown_bets[slot] = 0
+            elif action_type in ("bet", "raise"):
+                additional_bet = amount - self.shown_bets[slot]
+                self.shown_stacks[slot] -= additional_bet
+                self.shown_bets[slot] = amount
+                self.shown_pot += additional_bet
+            elif action_type == "call":
+                self.shown_stacks[slot] -= amount
+                self.shown_bets[slot] += amount
+                self.shown_pot += amount
+
+        active_bets = [
+            bet for slot, bet in enumerate(self.shown_bets) if self.shown_active & (1 << slot)
+        ]
+        self._frame(
+            {
+                "description": f"{player_name} {action_type}" + (f" ${amount}" if amount > 0 else ""),
+                "street": street,
+                "current_bet": max(active_bets) if active_bets else 0,
+                "action": {
+                    "player": player_name,
+                    "type": action_type,
+                    "amount": amount,
+                    "street": street,
+                },
+            }
+        )
+
+    def contested_showdown(self) -> bool:
+        """Whether showdown has hands to rank: a complete board and at least
+        two remaining players, all with known hole cards"""
+        remaining = [
+            self.hole_cards[slot]
+            for slot in range(len(self.names))
+            if self.shown_active & (1 << slot)
+        ]
+        return (
+            len(remaining) > 1
+            and len(self.board_cards) == 5
+            and all(cards and len(cards) == 4 and "?" not in cards for cards in remaining)
+        )
+
+    def showdown(self, evaluator: Any) -> Dict[str, Any]:
+        """Award the main and side pots and record the result as the last replay frame.
+
+        Works from the replay display state, so call it after process() or
+        after replaying stored actions. Pots come from split_pots over what
+        each player put in. A pot with one eligible player goes to them;
+        contested pots need a complete board and every remaining player's
+        hole cards, which ``evaluator`` (a hand_evaluator.HandEvaluator)
+        ranks, the strongest hands splitting the pot. The evaluator is only
+        used when contested_showdown() is true; otherwise it may be None.
+
+        Returns "winners" (empty when the pots cannot be awarded), "pot",
+        "pots" (amount, eligible and winning names, main pot first), "hands"
+        (strength and category of each shown hand) and "results" (invested,
+        won and net chips per player, empty when unawarded).
+        """
+        slots = range(len(self.names))
+        remaining = [slot for slot in slots if self.shown_active & (1 << slot)]
+        contributions = [self.stacks[slot] - self.shown_stacks[slot] for slot in slots]
+        pots = split_pots(contributions, [slot in remaining for slot in slots])
+
+        strengths: Dict[int, int] = {}
+        if self.contested_showdown():
+            board = "".join(self.board_cards)
+            try:
+                strengths = {
+                    slot: evaluator.evaluate_string((self.hole_cards[slot] or "") + board)
+                    for slot in remaining
+                }
+            except ValueError:  # Hole cards missing, unknown ("????") or duplicated
+                strengths = {}
+        awarded = bool(pots) and (bool(strengths) or len(remaining) == 1)
+
+        won = [0.0] * len(self.names)
+        for pot in pots:
+            eligible = pot["eligible"]
+            if awarded:
+                if len(eligible) > 1:
+                    best = max(strengths[slot] for slot in eligible)
+                    eligible = [slot for slot in eligible if strengths[slot] == best]
+                share = round(pot["amount"] / len(eligible), 2)
+                for slot in eligible:
+                    won[slot] += share
+                # Odd cents go to the first winner in seat order
+                won[eligible[0]] += round(pot["amount"] - share * len(eligible), 2)
+            pot["winners"] = eligible if awarded else []
+
+        names = self.names
+        hands = {
+            names[slot]: {"strength": strength, "category": evaluator.describe(strength)}
+            for slot, strength in strengths.items()
+        }
+        result = {
+            "winners": [names[slot] for slot in slots if won[slot]] if awarded else [],
+            "pot": self.shown_pot,
+            "pots": [
+                {
+                    "amount": pot["amount"],
+                    "eligible": [names[slot] for slot in pot["eligible"]],
+                    "winners": [names[slot] for slot in pot["winners"]],
+                }
+                for pot in pots
+            ],
+            "hands": hands,
+            "results": {},
+        }
+        if not awarded:
+            return result
+        result["results"] = {
+            names[slot]: {
+                "invested": round(contributions[slot], 2),
+                "won": round(won[slot], 2),
+                "net": round(won[slot] - contributions[slot], 2),
+            }
+            for slot in slots
+        }
+
+        if self.record and len(self.names) > 1:
+            for slot in slots:
+                self.shown_stacks[slot] += won[slot]
+            self.shown_bets = [0] * len(self.names)
+            self.shown_pot = 0
+            descriptions = []
+            for pot in result["pots"]:
+                winners = pot["winners"]
+                description = (
+                    f"{winners[0]} wins ${pot['amount']}"
+                    if len(winners) == 1
+                    else f"{', '.join(winners[:-1])} and {winners[-1]} split ${pot['amount']}"
+                )
+                if len(pot["eligible"]) > 1:
+                    description += f" with {hands[winners[0]]['category']}"
+                descriptions.append(description)
+            self._frame(
+                {
+                    "description": "; ".join(descriptions),
+                    "street": "showdown" if hands else self.shown_street,
+                    "current_bet": 0,
+                    "action": {
+                        "type": "showdown",
+                        "winners": result["winners"],
+                        "amount": result["pot"],
+                        "pots": [
+                            {"amount": pot["amount"], "winners": pot["winners"]}
+                            for pot in result["pots"]
+                        ],
+                        "hands": {player: hand["category"] for player, hand in hands.items()},
+                    },
+                }
+            )
+        return result
+
+    def replay(self, hand_id: str, meta: Dict[str, Any]) -> Dict[str, Any]:
+        """The replay timeline recorded so far"""
+        return {
+            "hand_id": hand_id,
+            "total_steps": len(self.steps),
+            "steps": self.steps,
+            "meta": meta,
+        }
 
 
 def create_sample_hand() -> Dict[str, Any]:
@@ -0,0 +1,319 @@
+"""
+Caches for responses of the immutable hand endpoints.
+
+Saved hands are never modified, so a rendered hand page, detail fragment or
+stored replay can be served again without touching the database. Three
+backends share one interface, picked by create_response_cache from a URL:
+
+- ``memory``: an LRU dict in each worker process.
+- ``sqlite:///path/to/cache.db``: one file on local disk that every worker
+  (and the next worker after a ``max_requests`` recycle) reads and fills.
+- ``redis://host:6379/0``: a Redis-protocol server; needs the optional
+  ``redis`` package, and the server's maxmemory policy does the evicting.
+
+Entries are dicts with "body" (bytes), "mimetype" and "etag". Keys are
+tuples of strings.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+Entry = Dict[str, Any]
+
+
+class ResponseCache:
+    """Counts hits, misses and evictions around a backend's storage.
+
+    Subclasses implement _get, _set (returning how many entries it evicted),
+    _usage and clear. Entries bigger than ``max_bytes`` are not stored. The
+    counters are per process.
+    """
+
+    backend = ""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._counter_lock = threading.Lock()
+
+    def get(self, key: Tuple[str, ...]) -> Optional[Entry]:
+        """The entry for key, or None"""
+        entry = self._get(key)
+        with self._counter_lock:
+            if entry is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return entry
+
+    def set(self, key: Tuple[str, ...], entry: Entry) -> None:
+        """Store entry under key, evicting others to stay within max_bytes"""
+        if len(entry["body"]) > self.max_bytes:
+            return
+        evicted = self._set(key, entry)
+        if evicted:
+            with self._counter_lock:
+                self.evictions += evicted
+
+    def stats(self) -> Dict[str, Any]:
+        """Counters for this process plus the backend's current contents"""
+        entries, size = self._usage()
+        return {
+            "backend": self.backend,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "entries": entries,
+            "bytes": size,
+            "max_bytes": self.max_bytes,
+        }
+
+    def clear(self) -> None:
+        raise NotImplementedError
+
+    def _get(self, key: Tuple[str, ...]) -> Optional[Entry]:
+        raise NotImplementedError
+
+    def _set(self, key: Tuple[str, ...], entry: Entry) -> int:
+        raise NotImplementedError
+
+    def _usage(self) -> Tuple[Optional[int], Optional[int]]:
+        raise NotImplementedError
+
+
+class MemoryCache(ResponseCache):
+    """LRU dict bounded by the total size of the cached bodies.
+
+    Private to the worker process, and empty again after every restart.
+    """
+
+    backend = "memory"
+
+    def __init__(self, max_bytes: int):
+        super().__init__(max_bytes)
+        self.size = 0
+        self._entries: "OrderedDict[Tuple[str, ...], Entry]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def _set(self, key, entry):
+        entry_size = len(entry["body"])
+        evicted = 0
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.size -= len(previous["body"])
+            while self._entries and self.size + entry_size > self.max_bytes:
+                _, oldest = self._entries.popitem(last=False)
+                self.size -= len(oldest["body"])
+                evicted += 1
+            self._entries[key] = entry
+            self.size += entry_size
+        return evicted
+
+    def _usage(self):
+        return len(self._entries), self.size
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
+
+
+class SQLiteCache(ResponseCache):
+    """Cache table in a local SQLite file shared by every worker process.
+
+    Reads go through SQLite's memory map, so a warm cache is served from the
+    page cache. Recency is tracked in ``used_at``, refreshed at most once per
+    ``touch_interval`` seconds per entry so hits rarely write. Eviction drops
+    the least recently used rows once the stored bodies exceed max_bytes;
+    triggers keep their total in a one-row table, so a write never sums the
+    whole cache.
+    """
+
+    backend = "sqlite"
+
+    def __init__(self, path: str, max_bytes: int, touch_interval: float = 60.0):
+        super().__init__(max_bytes)
+        self.path = path
+        self.touch_interval = touch_interval
+        self._local = threading.local()
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS response_cache ("
+                "key TEXT PRIMARY KEY, etag TEXT NOT NULL, mimetype TEXT NOT NULL, "
+                "body BLOB NOT NULL, size INTEGER NOT NULL, used_at REAL NOT NULL)"
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS ix_response_cache_used_at "
+                "ON response_cache (used_at)"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS response_cache_usage ("
+                "id INTEGER PRIMARY KEY CHECK (id = 0), total INTEGER NOT NULL)"
+            )
+            # Seeded from the rows of a cache file written before the table existed
+            conn.execute(
+                "INSERT OR IGNORE INTO response_cache_usage (id, total) "
+                "SELECT 0, COALESCE(SUM(size), 0) FROM response_cache"
+            )
+            for name, event, change in [
+                ("insert", "INSERT", "NEW.size"),
+                ("delete", "DELETE", "-OLD.size"),
+                ("update", "UPDATE OF size", "NEW.size - OLD.size"),
+            ]:
+                conn.execute(
+                    f"CREATE TRIGGER IF NOT EXISTS response_cache_usage_{name} "
+                    f"AFTER {event} ON response_cache BEGIN "
+                    f"UPDATE response_cache_usage SET total = total + {change}; END"
+                )
+
+    def _connect(self) -> sqlite3.Connection:
+        """This thread's connection, reopened in a forked child"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=5.0)
+            conn.execute("PRAGMA journal_mode = WAL")
+            conn.execute("PRAGMA synchronous = NORMAL")
+            conn.execute(f"PRAGMA mmap_size = {256 * 1024 * 1024}")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    @staticmethod
+    def _key(key):
+        return json.dumps(list(key))
+
+    def _get(self, key):
+        conn = self._connect()
+        row = conn.execute(
+            "SELECT etag, mimetype, body, used_at FROM response_cache WHERE key = ?",
+            (self._key(key),),
+        ).fetchone()
+        if row is None:
+            return None
+        now = time.time()
+        if now - row[3] >= self.touch_interval:
+            with conn:
+                conn.execute(
+                    "UPDATE response_cache SET used_at = ? WHERE key = ?", (now, self._key(key))
+                )
+        return {"etag": row[0], "mimetype": row[1], "body": row[2]}
+
+    def _set(self, key, entry):
+        conn = self._connect()
+        evicted = 0
+        with conn:
+            # An upsert, because REPLACE's implicit delete skips the delete trigger
+            conn.execute(
+                "INSERT INTO response_cache "
+                "(key, etag, mimetype, body, size, used_at) VALUES (?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (key) DO UPDATE SET etag = excluded.etag, "
+                "mimetype = excluded.mimetype, body = excluded.body, "
+                "size = excluded.size, used_at = excluded.used_at",
+                (
+                    self._key(key),
+                    entry["etag"],
+                    entry["mimetype"],
+                    entry["body"],
+                    len(entry["body"]),
+                    time.time(),
+                ),
+            )
+            (total,) = conn.execute("SELECT total FROM response_cache_usage").fetchone()
+            if total > self.max_bytes:
+                doomed = []
+                for row_key, size in conn.execute(
+                    "SELECT key, size FROM response_cache ORDER BY used_at, rowid"
+                ):
+                    if total <= self.max_bytes:
+                        break
+                    doomed.append((row_key,))
+                    total -= size
+                conn.executemany("DELETE FROM response_cache WHERE key = ?", doomed)
+                evicted = len(doomed)
+        return evicted
+
+    def _usage(self):
+        return self._connect().execute(
+            "SELECT COUNT(*), (SELECT total FROM response_cache_usage) FROM response_cache"
+        ).fetchone()
+
+    def clear(self):
+        with self._connect() as conn:
+            conn.execute("DELETE FROM response_cache")
+
+
+class RedisCache(ResponseCache):
+    """Entries as Redis hashes, shared by every worker and host using the server.
+
+    Run the server with a maxmemory limit and ``maxmemory-policy allkeys-lru``
+    so it evicts; ``evictions`` reports the server's evicted_keys count and
+    max_bytes only skips bodies too large to be worth storing.
+    """
+
+    backend = "redis"
+
+    def __init__(self, url: str, max_bytes: int, prefix: str = "jamnesia:response:"):
+        super().__init__(max_bytes)
+        import redis  # Optional dependency, only needed for this backend
+
+        self.client = redis.Redis.from_url(url)
+        self.prefix = prefix
+
+    def _key(self, key):
+        return self.prefix + json.dumps(list(key))
+
+    def _get(self, key):
+        etag, mimetype, body = self.client.hmget(self._key(key), "etag", "mimetype", "body")
+        if body is None:
+            return None
+        return {"etag": etag.decode(), "mimetype": mimetype.decode(), "body": body}
+
+    def _set(self, key, entry):
+        self.client.hset(
+            self._key(key),
+            mapping={"etag": entry["etag"], "mimetype": entry["mimetype"], "body": entry["body"]},
+        )
+        return 0
+
+    def _usage(self):
+        entries = sum(1 for _ in self.client.scan_iter(match=self.prefix + "*", count=1000))
+        return entries, None
+
+    def stats(self):
+        stats = super().stats()
+        stats["evictions"] = self.client.info("stats").get("evicted_keys", 0)
+        return stats
+
+    def clear(self):
+        keys = list(self.client.scan_iter(match=self.prefix + "*", count=1000))
+        if keys:
+            self.client.delete(*keys)
+
+
+def create_response_cache(url: str, max_bytes: int) -> ResponseCache:
+    """Build the cache backend named by url ("memory", "sqlite:///...", "redis://...")"""
+    if not url or url == "memory":
+        return MemoryCache(max_bytes)
+    if url.startswith("sqlite:///"):
+        return SQLiteCache(url[len("sqlite:///"):], max_bytes)
+    if url.startswith(("redis://", "rediss://", "unix://")):
+        return RedisCache(url, max_bytes)
+    raise ValueError(f"Unsupported response cache URL: {url}")
@@ -10,6 +10,8 @@ import sys
 import unittest
 from io import StringIO
 
+import conftest  # noqa: F401  Test settings such as HAND_RANK_TABLE, set before app loads
+
 
 def run_test_suite(test_module_name, description):
     """Run a specific test suite and return results"""
@@ -77,6 +79,13 @@ def main():
         ("test_position", "Position Enum Tests"),
         ("test_template_position", "Position Template Tests"),
         ("test_replay", "Hand Replay Tests"),
+        ("test_phh_parser", "PHH Import Tests"),
+        ("test_postgres", "PostgreSQL Backend Tests"),
+        ("test_migrations", "Schema Migration Tests"),
+        ("test_batch_validation", "Batch Validation Tests"),
+        ("test_response_cache", "Response Cache Tests"),
+        ("test_hand_evaluator", "Hand Evaluator Tests"),
+        ("test_equity", "Equity Calculator Tests"),
     ]
 
     total_tests = 0
@@ -1,12 +1,38 @@
 import json
 import os
+import socket
+import subprocess
+import sys
 import tempfile
+import time
 import unittest
+from datetime import datetime, timedelta
+from unittest.mock import patch
 
 from flask import Flask
-
-from app import app, db
-from models import Action, Hand, Player
+from sqlalchemy import event
+
+from app import (
+    app,
+    db,
+    get_hand_evaluator,
+    import_job_owner,
+    load_preflop_equity,
+    recover_import_jobs,
+    response_cache,
+    shutdown_prepare_pool,
+)
+from models import (
+    Action,
+    Hand,
+    HandReplay,
+    HandResult,
+    ImportJob,
+    Player,
+    PlayerName,
+    PlayerStats,
+)
+from phh_parser import parse_phh, split_phhs
 
 
 class TestApp(unittest.TestCase):
@@ -25,6 +51,8 @@ class TestApp(unittest.TestCase):
 
         # Create test client
         self.client = app.test_client()
+        # Tests reuse play_ids across fresh databases, so drop cached responses
+        response_cache.clear()
 
         # Create application context and database
         with app.app_context():
@@ -411,6 +439,955 @@ class TestApp(unittest.TestCase):
         created_times = [hand["created_at"] for hand in data]
         self.assertEqual(created_times, sorted(created_times, reverse=True))
 
+    def test_list_hands_keyset_pagination(self):
+        """Test that cursor pages cover every hand exactly once, newest first"""
+        for i in range(5):
+            test_data = {
+                "play_id": f"page-hand-{i}",
+                "players": [{"name": f"Player{i}", "stack": 100.0}],
+                "actions": [{"player_name": f"Player{i}", "action_type": "fold"}],
+            }
+            self.client.post(
+                "/api/save-hand",
+                data=json.dumps(test_data),
+                content_type="application/json",
+            )
+
+        seen = []
+        cursor = None
+        while True:
+            url = "/api/hands?limit=2" + (f"&cursor={cursor}" if cursor else "")
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            page = json.loads(response.data)
+            self.assertLessEqual(len(page), 2)
+            seen.extend(hand["play_id"] for hand in page)
+            cursor = response.headers.get("X-Next-Cursor")
+            if not cursor:
+                break
+
+        self.assertEqual(seen, [f"page-hand-{i}" for i in reversed(range(5))])
+
+    def test_list_hands_htmx_infinite_scroll(self):
+        """Test that HTMX pages chain through a revealed-triggered loader"""
+        for _ in range(3):
+            self.client.post("/api/create-sample")
+
+        first = self.client.get("/api/hands?limit=2", headers={"HX-Request": "true"})
+        self.assertEqual(first.status_code, 200)
+        self.assertIn(b'hx-trigger="revealed"', first.data)
+        self.assertIn(b'class="space-y-4"', first.data)
+
+        cursor = first.headers["X-Next-Cursor"]
+        second = self.client.get(
+            f"/api/hands?limit=2&cursor={cursor}", headers={"HX-Request": "true"}
+        )
+        self.assertEqual(second.status_code, 200)
+        self.assertNotIn(b'hx-trigger="revealed"', second.data)
+        self.assertNotIn(b'class="space-y-4"', second.data)
+        self.assertIsNone(second.headers.get("X-Next-Cursor"))
+
+    def test_list_hands_invalid_cursor(self):
+        """Test that a malformed cursor is rejected"""
+        response = self.client.get("/api/hands?cursor=not-a-cursor")
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("error", json.loads(response.data))
+
+
+class TestBulkImport(unittest.TestCase):
+    """Test cases for the bulk hand import endpoint"""
+
+    def setUp(self):
+        """Set up test fixtures before each test method"""
+        self.db_fd, self.db_path = tempfile.mkstemp()
+        app.config["SQLALCHEMY_DATABASE_URI"] = f"sqlite:///{self.db_path}"
+        app.config["TESTING"] = True
+        self.client = app.test_client()
+        # Tests reuse play_ids across fresh databases, so drop cached responses
+        response_cache.clear()
+
+        with app.app_context():
+            db.create_all()
+
+    def tearDown(self):
+        """Clean up after each test method"""
+        with app.app_context():
+            db.session.remove()
+            db.drop_all()
+        os.close(self.db_fd)
+        os.unlink(self.db_path)
+
+    def make_hand(self, play_id):
+        """Build a valid heads-up hand payload"""
+        return {
+            "play_id": play_id,
+            "players": [
+                {"name": "Alice", "stack": 100.0},
+                {"name": "Bob", "stack": 100.0},
+            ],
+            "actions": [
+                {"player_name": "Alice", "action_type": "raise", "amount": 6.0},
+                {"player_name": "Bob", "action_type": "call"},
+                {"player_name": "Bob", "action_type": "check"},
+                {"player_name": "Alice", "action_type": "bet", "amount": 8.0},
+                {"player_name": "Bob", "action_type": "fold"},
+            ],
+            "hole_cards": {"Alice": "AsKh", "Bob": "QdQc"},
+            "flop": "AhKd5c",
+        }
+
+    def test_bulk_import_json_array(self):
+        """Test that a JSON array is imported in chunks with per-hand results"""
+        hands = [self.make_hand(f"bulk-{i}") for i in range(5)]
+        hands[2]["actions"] = [{"player_name": "Nobody", "action_type": "fold"}]
+
+        response = self.client.post("/api/hands/bulk?chunk_size=2", json=hands)
+
+        self.assertEqual(response.status_code, 200)
+        data = response.get_json()
+        self.assertEqual(data["status"], "partial")
+        self.assertEqual(data["total"], 5)
+        self.assertEqual(data["succeeded"], 4)
+        self.assertEqual(data["failed"], 1)
+        self.assertEqual([r["index"] for r in data["results"]], list(range(5)))
+        self.assertEqual(data["results"][2]["status"], "error")
+        self.assertIn("Player Nobody not found", data["results"][2]["error"])
+
+        with app.app_context():
+            self.assertEqual(Hand.query.count(), 4)
+            self.assertEqual(Player.query.count(), 8)
+            self.assertEqual(Action.query.count(), 20)
+            hand = Hand.query.filter_by(play_id="bulk-0").one()
+            self.assertEqual(data["results"][0]["hand_id"], hand.id)
+            self.assertIn("p0 cbr 6", hand.phh_content)
+            orders = [a.action_order for a in hand.actions]
+            self.assertEqual(sorted(orders), list(range(5)))
+
+        # Imported hands are served like any saved hand
+        detail = self.client.get("/api/hands/bulk-3")
+        self.assertEqual(detail.status_code, 200)
+        self.assertEqual(len(detail.get_json()["actions"]), 5)
+
+    def test_bulk_import_ndjson(self):
+        """Test that NDJSON bodies are accepted"""
+        body = "\n".join(json.dumps(self.make_hand(f"nd-{i}")) for i in range(3))
+
+        response = self.client.post(
+            "/api/hands/bulk", data=body, content_type="application/x-ndjson"
+        )
+
+        self.assertEqual(response.status_code, 200)
+        data = response.get_json()
+        self.assertEqual(data["status"], "success")
+        self.assertEqual(data["succeeded"], 3)
+
+    def test_bulk_import_duplicate_play_ids(self):
+        """Test that existing and repeated play_ids are reported, not fatal"""
+        self.client.post("/api/hands/bulk", json=[self.make_hand("dup-a")])
+
+        response = self.client.post(
+            "/api/hands/bulk",
+            json={"hands": [self.make_hand("dup-a"), self.make_hand("dup-b"), self.make_hand("dup-b")]},
+        )
+
+        statuses = [r["status"] for r in response.get_json()["results"]]
+        self.assertEqual(statuses, ["error", "success", "error"])
+        with app.app_context():
+            self.assertEqual(Hand.query.count(), 2)
+
+    def wait_for_job(self, status_url):
+        """Poll an import job until it finishes"""
+        for _ in range(200):
+            job = self.client.get(status_url).get_json()
+            if job["status"] in ("completed", "failed"):
+                return job
+            time.sleep(0.05)
+        self.fail("Import job did not finish")
+
+    def test_streaming_import_job(self):
+        """Test that an NDJSON upload is imported by a pollable job"""
+        lines = [json.dumps(self.make_hand(f"stream-{i}")) for i in range(5)]
+        lines.insert(2, "{not json")
+        lines.append(json.dumps({"players": []}))
+
+        response = self.client.post(
+            "/api/hands/import?chunk_size=2",
+            data="\n".join(lines) + "\n",
+            content_type="application/x-ndjson",
+        )
+
+        self.assertEqual(response.status_code, 202)
+        data = response.get_json()
+        self.assertIn("job_id", data)
+
+        job = self.wait_for_job(data["status_url"])
+        self.assertEqual(job["status"], "completed")
+        self.assertEqual(job["processed"], 7)
+        self.assertEqual(job["succeeded"], 5)
+        self.assertEqual(job["failed"], 2)
+        self.assertEqual([e["index"] for e in job["errors"]], [2, 6])
+        self.assertIn("invalid JSON", job["errors"][0]["error"])
+        self.assertIn("Missing required field: actions", job["errors"][1]["error"])
+        self.assertIsNotNone(job["finished_at"])
+
+        with app.app_context():
+            self.assertEqual(Hand.query.count(), 5)
+
+    def test_import_job_not_found(self):
+        """Test polling an unknown import job"""
+        response = self.client.get("/api/import-jobs/missing")
+
+        self.assertEqual(response.status_code, 404)
+
+    def add_running_job(self, job_id, owner, heartbeat_at, spool_path=None):
+        with app.app_context():
+            db.session.add(
+                ImportJob(
+                    id=job_id,
+                    status="running",
+                    owner=owner,
+                    heartbeat_at=heartbeat_at,
+                    spool_path=spool_path,
+                )
+            )
+            db.session.commit()
+
+    def test_import_job_with_dead_worker_fails(self):
+        """Test that polling a job whose worker exited reports it failed and drops its spool"""
+        worker = subprocess.Popen([sys.executable, "-c", ""])
+        worker.wait()
+        spool_fd, spool_path = tempfile.mkstemp()
+        os.close(spool_fd)
+        self.add_running_job(
+            "orphan", f"{socket.gethostname()}:{worker.pid}", datetime.utcnow(), spool_path
+        )
+
+        job = self.client.get("/api/import-jobs/orphan").get_json()
+
+        self.assertEqual(job["status"], "failed")
+        self.assertIn("Import worker stopped", job["errors"][-1]["error"])
+        self.assertIsNotNone(job["finished_at"])
+        self.assertFalse(os.path.exists(spool_path))
+
+    def test_import_job_without_heartbeat_fails(self):
+        """Test that a job on another host fails once its heartbeat is too old"""
+        now = datetime.utcnow()
+        self.add_running_job("silent", "other-host:1", now - timedelta(hours=1))
+        self.add_running_job("busy", "other-host:2", now)
+
+        self.assertEqual(self.client.get("/api/import-jobs/silent").get_json()["status"], "failed")
+        self.assertEqual(self.client.get("/api/import-jobs/busy").get_json()["status"], "running")
+
+    def test_recover_import_jobs(self):
+        """Test that startup recovery fails dead jobs and removes orphaned spool files"""
+        original_spool_dir = app.config["IMPORT_SPOOL_DIR"]
+        with tempfile.TemporaryDirectory() as spool_dir:
+            app.config["IMPORT_SPOOL_DIR"] = spool_dir
+            try:
+                paths = {}
+                for name in ("orphan", "live", "other"):
+                    prefix = "unrelated-" if name == "other" else "jamnesia-import-"
+                    paths[name] = os.path.join(spool_dir, f"{prefix}{name}.ndjson")
+                    open(paths[name], "w").close()
+                self.add_running_job("live", import_job_owner(), datetime.utcnow(), paths["live"])
+                self.add_running_job("dead", "other-host:1", datetime(2020, 1, 1))
+
+                self.assertEqual(recover_import_jobs(), (1, 1))
+
+                self.assertEqual(
+                    sorted(os.listdir(spool_dir)),
+                    ["jamnesia-import-live.ndjson", "unrelated-other.ndjson"],
+                )
+            finally:
+                app.config["IMPORT_SPOOL_DIR"] = original_spool_dir
+        with app.app_context():
+            self.assertEqual(db.session.get(ImportJob, "dead").status, "failed")
+            self.assertEqual(db.session.get(ImportJob, "live").status, "running")
+
+    def test_bulk_import_with_worker_processes(self):
+        """Test that pooled validation keeps results and writes in input order"""
+        hands = [self.make_hand(f"pool-{i}") for i in range(7)]
+        hands[4]["actions"] = [{"player_name": "Nobody", "action_type": "fold"}]
+        app.config["IMPORT_WORKERS"] = 2
+        app.config["IMPORT_WORK_UNIT"] = 2
+        try:
+            response = self.client.post("/api/hands/bulk?chunk_size=3", json=hands)
+        finally:
+            app.config["IMPORT_WORKERS"] = 1
+            app.config["IMPORT_WORK_UNIT"] = 50
+            shutdown_prepare_pool()
+
+        results = response.get_json()["results"]
+        self.assertEqual([r["index"] for r in results], list(range(7)))
+        self.assertEqual([r["status"] for r in results].count("error"), 1)
+        self.assertIn("Player Nobody not found", results[4]["error"])
+        with app.app_context():
+            stored = [h.play_id for h in Hand.query.order_by(Hand.id)]
+        self.assertEqual(stored, [f"pool-{i}" for i in range(7) if i != 4])
+
+    def test_bulk_import_rejects_non_list(self):
+        """Test that a body without a list of hands is rejected"""
+        response = self.client.post("/api/hands/bulk", json={"players": []})
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("error", response.get_json())
+
+
+class TestExport(unittest.TestCase):
+    """Test cases for PHHS export"""
+
+    def setUp(self):
+        """Set up test fixtures before each test method"""
+        app.config["TESTING"] = True
+        self.client = app.test_client()
+
+        with app.app_context():
+            db.create_all()
+
+        for i, (names, stakes) in enumerate(
+            [(["Alice", "Bob"], (1.0, 2.0)), (["Carol", "Dave"], (1.0, 2.0)), (["Alice", "Dave"], (5.0, 10.0))]
+        ):
+            self.client.post(
+                "/api/save-hand",
+                json={
+                    "play_id": f"export-{i}",
+                    "players": [{"name": name, "stack": 500.0} for name in names],
+                    "actions": [{"player_name": names[0], "action_type": "fold"}],
+                    "small_blind": stakes[0],
+                    "big_blind": stakes[1],
+                },
+            )
+
+    def tearDown(self):
+        """Clean up after each test method"""
+        with app.app_context():
+            db.session.remove()
+            db.drop_all()
+
+    def export(self, query=""):
+        """Fetch an export and split it back into hands"""
+        response = self.client.get(f"/api/export.phhs{query}")
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.is_streamed)
+        return response, split_phhs(response.get_data(as_text=True))
+
+    def test_export_all_hands(self):
+        """Test that every hand is exported as a numbered PHHS table"""
+        response, sections = self.export()
+
+        self.assertIn("attachment; filename=hands.phhs", response.headers["Content-Disposition"])
+        self.assertEqual(len(sections), 3)
+        self.assertTrue(response.get_data(as_text=True).startswith("[1]\n"))
+        stacks = [parse_phh(section)["starting_stacks"] for section in sections]
+        self.assertEqual(stacks, [[500, 500]] * 3)
+
+    def test_export_filters(self):
+        """Test player, stakes and date filters"""
+        self.assertEqual(len(self.export("?player=Alice")[1]), 2)
+        self.assertEqual(len(self.export("?stakes=1/2")[1]), 2)
+        self.assertEqual(len(self.export("?player=Alice&stakes=5/10")[1]), 1)
+        self.assertEqual(len(self.export("?from=2000-01-01&to=2999-12-31")[1]), 3)
+        self.assertEqual(len(self.export("?to=2000-01-01")[1]), 0)
+
+    def test_export_invalid_filter(self):
+        """Test that malformed filters are rejected"""
+        self.assertEqual(self.client.get("/api/export.phhs?stakes=big").status_code, 400)
+        self.assertEqual(self.client.get("/api/export.phhs?from=yesterday").status_code, 400)
+
+    def test_export_command(self):
+        """Test the export-phhs CLI command writes the same document"""
+        _, expected = self.export("?player=Dave")
+        fd, path = tempfile.mkstemp(suffix=".phhs")
+        os.close(fd)
+        try:
+            result = app.test_cli_runner().invoke(
+                args=["export-phhs", path, "--player", "Dave"]
+            )
+            self.assertEqual(result.exit_code, 0, result.output)
+            with open(path) as f:
+                self.assertEqual(split_phhs(f.read()), expected)
+        finally:
+            os.unlink(path)
+
+
+class TestQueryCounts(unittest.TestCase):
+    """Pin the number of SQL statements each hand endpoint issues"""
+
+    def setUp(self):
+        """Create a hand and start counting statements"""
+        app.config["TESTING"] = True
+        self.client = app.test_client()
+        # Tests reuse play_ids across fresh databases, so drop cached responses
+        response_cache.clear()
+
+        with app.app_context():
+            db.create_all()
+            self.engine = db.engine
+
+        response = self.client.post("/api/create-sample", json={"pattern": "multi_street"})
+        self.play_id = response.get_json()["play_id"]
+
+        self.statements = []
+        event.listen(self.engine, "before_cursor_execute", self.count_statement)
+
+    def tearDown(self):
+        """Clean up"""
+        event.remove(self.engine, "before_cursor_execute", self.count_statement)
+        with app.app_context():
+            db.session.remove()
+            db.drop_all()
+
+    def count_statement(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append(statement)
+
+    def get(self, url):
+        """Issue a request and return how many statements it ran"""
+        self.statements.clear()
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(self.statements)
+
+    def test_get_hand_query_count(self):
+        """Hand JSON loads the hand, players and actions in two statements"""
+        self.assertEqual(self.get(f"/api/hands/{self.play_id}"), 2)
+
+    def test_hand_details_query_count(self):
+        """Rendering the details template must not lazy-load relationships"""
+        self.assertEqual(self.get(f"/api/hands/{self.play_id}/details"), 2)
+
+    def test_replay_query_count(self):
+        """Replays are recorded at save time, so even the first one is a single read"""
+        self.assertEqual(self.get(f"/api/hands/{self.play_id}/replay"), 1)
+        self.assertEqual(self.get(f"/api/hands/{self.play_id}/replay?format=delta"), 1)
+
+    def test_stale_replay_query_count(self):
+        """A missing timeline is rebuilt with lookup + two loads + insert, then cached"""
+        with app.app_context():
+            db.session.execute(db.delete(HandReplay))
+            db.session.commit()
+
+        self.assertEqual(self.get(f"/api/hands/{self.play_id}/replay"), 4)
+        self.assertEqual(self.get(f"/api/hands/{self.play_id}/replay"), 0)
+
+    def test_cached_responses_skip_the_database(self):
+        """Repeat requests for a hand are served from the response cache"""
+        for url in ["", "/details", "/replay-ui", "/replay", "/replay?format=delta"]:
+            with self.subTest(url=url):
+                self.get(f"/api/hands/{self.play_id}{url}")
+                self.assertEqual(self.get(f"/api/hands/{self.play_id}{url}"), 0)
+
+
+class TestPlayerNames(unittest.TestCase):
+    """Test cases for player-name autocomplete"""
+
+    def setUp(self):
+        """Set up a clean database and save hands for a few players"""
+        app.config["TESTING"] = True
+        self.client = app.test_client()
+        with app.app_context():
+            db.create_all()
+
+        for index, names in enumerate([("Alice", "Bob"), ("alfred", "Bob"), ("Carol", "Alicia")]):
+            response = self.client.post(
+                "/api/save-hand",
+                json={
+                    "play_id": f"names-{index}",
+                    "players": [{"name": name, "stack": 100} for name in names],
+                    "actions": [{"player_name": names[0], "action_type": "fold"}],
+                },
+            )
+            self.assertEqual(response.status_code, 200)
+
+    def tearDown(self):
+        """Clean up"""
+        with app.app_context():
+            db.session.remove()
+            db.drop_all()
+
+    def test_names_recorded_once_on_save(self):
+        """Test that each distinct name is stored once in player_names"""
+        with app.app_context():
+            self.assertEqual(
+                sorted(row.name for row in PlayerName.query.all()),
+                ["Alice", "Alicia", "Bob", "Carol", "alfred"],
+            )
+
+    def test_all_names_without_prefix(self):
+        """Test that the unfiltered list is every name, alphabetical"""
+        response = self.client.get("/api/players/names")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_json(), ["alfred", "Alice", "Alicia", "Bob", "Carol"])
+
+    def test_prefix_is_case_insensitive_and_limited(self):
+        """Test prefix filtering and the result limit"""
+        response = self.client.get("/api/players/names?prefix=AL")
+        self.assertEqual(response.get_json(), ["alfred", "Alice", "Alicia"])
+
+        response = self.client.get("/api/players/names?prefix=ali&limit=1")
+        self.assertEqual(response.get_json(), ["Alice"])
+
+        response = self.client.get("/api/players/names?prefix=zz")
+        self.assertEqual(response.get_json(), [])
+
+    def test_invalid_limit(self):
+        """Test that a non-numeric or non-positive limit is rejected"""
+        self.assertEqual(self.client.get("/api/players/names?limit=abc").status_code, 400)
+        self.assertEqual(self.client.get("/api/players/names?limit=0").status_code, 400)
+
+    def test_etag_revalidation(self):
+        """Test that an unchanged list answers If-None-Match with 304"""
+        response = self.client.get("/api/players/names?prefix=b")
+        etag = response.headers["ETag"]
+        self.assertIn("no-cache", response.headers["Cache-Control"])
+
+        response = self.client.get(
+            "/api/players/names?prefix=b", headers={"If-None-Match": etag}
+        )
+        self.assertEqual(response.status_code, 304)
+
+        self.client.post(
+            "/api/save-hand",
+            json={
+                "play_id": "names-new",
+                "players": [{"name": "Bea", "stack": 100}, {"name": "Bob", "stack": 100}],
+                "actions": [{"player_name": "Bea", "action_type": "fold"}],
+            },
+        )
+        response = self.client.get(
+            "/api/players/names?prefix=b", headers={"If-None-Match": etag}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_json(), ["Bea", "Bob"])
+
+
+class TestPlayerStats(unittest.TestCase):
+    """Test cases for the incrementally maintained player_stats table"""
+
+    def setUp(self):
+        """Set up a clean database with one hand saved and one bulk imported"""
+        app.config["TESTING"] = True
+        self.client = app.test_client()
+        with app.app_context():
+            db.create_all()
+
+        players = [{"name": name, "stack": 100} for name in ("Alice", "Bob", "Carol")]
+        response = self.client.post(
+            "/api/save-hand",
+            json={
+                "play_id": "stats-0",
+                "players": players,
+                "actions": [
+                    {"player_name": "Carol", "action_type": "raise", "amount": 6},
+                    {"player_name": "Alice", "action_type": "fold"},
+                    {"player_name": "Bob", "action_type": "call"},
+                    {"player_name": "Bob", "action_type": "bet", "amount": 10},
+                    {"player_name": "Carol", "action_type": "call"},
+                    {"player_name": "Bob", "action_type": "check"},
+                    {"player_name": "Carol", "action_type": "check"},
+                    {"player_name": "Bob", "action_type": "check"},
+                    {"player_name": "Carol", "action_type": "bet", "amount": 20},
+                    {"player_name": "Bob", "action_type": "fold"},
+                ],
+            },
+        )
+        self.assertEqual(response.status_code, 200)
+        response = self.client.post(
+            "/api/hands/bulk",
+            json=[
+                {
+                    "play_id": "stats-1",
+                    "players": players,
+                    "actions": [
+                        {"player_name": "Carol", "action_type": "fold"},
+                        {"player_name": "Alice", "action_type": "raise", "amount": 6},
+                        {"player_name": "Bob", "action_type": "fold"},
+                    ],
+                }
+            ],
+        )
+        self.assertEqual(response.status_code, 200)
+
+    def tearDown(self):
+        """Clean up"""
+        with app.app_context():
+            db.session.remove()
+            db.drop_all()
+
+    def test_stats_endpoint(self):
+        """Test counts and percentages accumulated over saved and imported hands"""
+        response = self.client.get("/api/players/Bob/stats")
+
+        self.assertEqual(response.status_code, 200)
+        stats = response.get_json()
+        self.assertEqual(stats["name"], "Bob")
+        self.assertEqual(stats["hands"], 2)
+        self.assertEqual(stats["vpip"], 50.0)
+        self.assertEqual(stats["pfr"], 0.0)
+        self.assertEqual((stats["postflop_aggressive"], stats["postflop_calls"]), (1, 0))
+        self.assertIsNone(stats["af"])
+        self.assertEqual((stats["saw_flop_hands"], stats["showdown_hands"]), (1, 0))
+
+        carol = self.client.get("/api/players/Carol/stats").get_json()
+        self.assertEqual((carol["pfr"], carol["af"], carol["wtsd"]), (50.0, 1.0, 0.0))
+
+    def test_unknown_player(self):
+        """Test that a player with no hands is a 404"""
+        response = self.client.get("/api/players/Nobody/stats")
+
+        self.assertEqual(response.status_code, 404)
+
+    def test_rebuild_command_matches_incremental_counts(self):
+        """Test that a full recount from stored actions gives the same rows"""
+        # Dave never acts, so his stored fold is an auto-fold and no 3-bet opportunity
+        response = self.client.post(
+            "/api/save-hand",
+            json={
+                "play_id": "stats-2",
+                "players": [
+                    {"name": name, "stack": 100} for name in ("Alice", "Bob", "Carol", "Dave")
+                ],
+                "actions": [
+                    {"player_name": "Carol", "action_type": "raise", "amount": 6},
+                    {"player_name": "Alice", "action_type": "fold"},
+                    {"player_name": "Bob", "action_type": "fold"},
+                ],
+            },
+        )
+        self.assertEqual(response.status_code, 200)
+        with app.app_context():
+            before = {row.name: row.to_dict() for row in PlayerStats.query.all()}
+            PlayerStats.query.delete()
+            db.session.commit()
+
+        result = app.test_cli_runner().invoke(args=["rebuild-player-stats"])
+
+        self.assertEqual(result.exit_code, 0, result.output)
+        self.assertIn("Rebuilt stats for 4 players", result.output)
+        with app.app_context():
+            after = {row.name: row.to_dict() for row in PlayerStats.query.all()}
+        self.assertEqual(after, before)
+        self.assertEqual(after["Dave"]["three_bet_opportunities"], 0)
+
+
+class TestHandResults(unittest.TestCase):
+    """Test cases for pots awarded on save and the stored hand_results rows"""
+
+    def setUp(self):
+        """Save a side-pot showdown and bulk import a hand won uncontested"""
+        app.config["TESTING"] = True
+        self.client = app.test_client()
+        with app.app_context():
+            db.create_all()
+
+        players = [
+            {"name": "Alice", "stack": 100},
+            {"name": "Bob", "stack": 100},
+            {"name": "Carol", "stack": 30},
+        ]
+        response = self.client.post(
+            "/api/save-hand",
+            json={
+                "play_id": "results-0",
+                "players": players,
+                "actions": [
+                    {"player_name": "Carol", "action_type": "raise", "amount": 30},
+                    {"player_name": "Alice", "action_type": "call"},
+                    {"player_name": "Bob", "action_type": "call"},
+                    {"player_name": "Alice", "action_type": "bet", "amount": 20},
+                    {"player_name": "Bob", "action_type": "call"},
+                    {"player_name": "Alice", "action_type": "check"},
+                    {"player_name": "Bob", "action_type": "check"},
+                    {"player_name": "Alice", "action_type": "check"},
+                    {"player_name": "Bob", "action_type": "check"},
+                ],
+                "hole_cards": {"Alice": "KsKd", "Bob": "QsQd", "Carol": "AhAc"},
+                "board": "2c7d9hTs3c",
+            },
+        )
+        self.assertEqual(response.status_code, 200)
+        response = self.client.post(
+            "/api/hands/bulk",
+            json=[
+                {
+                    "play_id": "results-1",
+                    "players": players,
+                    "actions": [
+                        {"player_name": "Carol", "action_type": "fold"},
+                        {"player_name": "Alice", "action_type": "raise", "amount": 6},
+                        {"player_name": "Bob", "action_type": "fold"},
+                    ],
+                }
+            ],
+        )
+        self.assertEqual(response.status_code, 200)
+
+    def tearDown(self):
+        """Clean up"""
+        with app.app_context():
+            db.session.remove()
+            db.drop_all()
+
+    def stored_results(self):
+        with app.app_context():
+            return sorted(
+                (row.hand.play_id, row.player_name, row.invested, row.won, row.net)
+                for row in HandResult.query.all()
+            )
+
+    def test_results_stored_on_save(self):
+        """Test that the main pot goes to the all-in player and the side pot past them"""
+        self.assertEqual(
+            self.stored_results(),
+            [
+                ("results-0", "Alice", 50.0, 40.0, -10.0),
+                ("results-0", "Bob", 50.0, 0.0, -50.0),
+                ("results-0", "Carol", 30.0, 90.0, 60.0),
+                ("results-1", "Alice", 6.0, 8.0, 2.0),
+                ("results-1", "Bob", 2.0, 0.0, -2.0),
+                ("results-1", "Carol", 0.0, 0.0, 0.0),
+            ],
+        )
+
+    def test_rank_table_loaded_only_for_showdowns(self):
+        """Test that hands with nothing to rank never map the evaluator"""
+        players = [{"name": "Alice", "stack": 100}, {"name": "Bob", "stack": 100}]
+        checked_down = [{"player_name": "Alice", "action_type": "call"}] + [
+            {"player_name": name, "action_type": "check"} for name in ["Bob"] + ["Bob", "Alice"] * 3
+        ]
+        hands = [
+            ("results-2", [{"player_name": "Alice", "action_type": "fold"}], {}, False),
+            ("results-3", checked_down, {"Alice": "AsKs"}, False),
+            ("results-4", checked_down, {"Alice": "AsKs", "Bob": "QsQd"}, True),
+        ]
+        for play_id, actions, hole_cards, loaded in hands:
+            with self.subTest(play_id=play_id):
+                with patch("app.get_hand_evaluator", wraps=get_hand_evaluator) as loader:
+                    response = self.client.post(
+                        "/api/save-hand",
+                        json={
+                            "play_id": play_id,
+                            "players": players,
+                            "actions": actions,
+                            "hole_cards": hole_cards,
+                            "board": "2c7d9hTs3c",
+                        },
+                    )
+
+                self.assertEqual(response.status_code, 200, response.get_json())
+                self.assertEqual(loader.called, loaded)
+
+    def test_results_endpoint(self):
+        """Test per-hand results in hand order with a running total"""
+        response = self.client.get("/api/players/Alice/results")
+
+        self.assertEqual(response.status_code, 200)
+        data = response.get_json()
+        self.assertEqual((data["name"], data["hands"], data["net"]), ("Alice", 2, -8.0))
+        self.assertEqual(
+            [(row["play_id"], row["net"], row["total"]) for row in data["results"]],
+            [("results-0", -10.0, -10.0), ("results-1", 2.0, -8.0)],
+        )
+        self.assertEqual(self.client.get("/api/players/Nobody/results").status_code, 404)
+
+    def test_replay_ends_with_pots(self):
+        """Test that the replay's last frame lists each pot and its winners"""
+        replay = self.client.get("/api/hands/results-0/replay").get_json()
+
+        action = replay["steps"][-1]["action"]
+        self.assertEqual(action["type"], "showdown")
+        self.assertEqual(
+            action["pots"],
+            [{"amount": 90.0, "winners": ["Carol"]}, {"amount": 40.0, "winners": ["Alice"]}],
+        )
+
+    def test_rebuild_command_matches_stored_results(self):
+        """Test that awarding every stored hand again gives the same rows"""
+        before = self.stored_results()
+        with app.app_context():
+            HandResult.query.delete()
+            db.session.commit()
+
+        result = app.test_cli_runner().invoke(args=["rebuild-hand-results"])
+
+        self.assertEqual(result.exit_code, 0, result.output)
+        self.assertIn("Stored results for 2 hands", result.output)
+        self.assertEqual(self.stored_results(), before)
+
+
+class TestHandEquity(unittest.TestCase):
+    """Test cases for the per-street equity endpoint"""
+
+    def setUp(self):
+        """Save a hand where the button folds preflop and the others see the turn"""
+        app.config["TESTING"] = True
+        self.client = app.test_client()
+        response_cache.clear()
+        with app.app_context():
+            db.create_all()
+
+        response = self.client.post(
+            "/api/save-hand",
+            json={
+                "play_id": "equity-0",
+                "players": [{"name": name, "stack": 100} for name in ("Alice", "Bob", "Carol")],
+                "actions": [
+                    {"player_name": "Carol", "action_type": "fold"},
+                    {"player_name": "Alice", "action_type": "call"},
+                    {"player_name": "Bob", "action_type": "check"},
+                    {"player_name": "Alice", "action_type": "check"},
+                    {"player_name": "Bob", "action_type": "check"},
+                    {"player_name": "Alice", "action_type": "bet", "amount": 4},
+                    {"player_name": "Bob", "action_type": "fold"},
+                ],
+                "hole_cards": {"Alice": "AhAd", "Bob": "KhKd"},
+                "board": "AcKc2s7d",
+            },
+        )
+        self.assertEqual(response.status_code, 200)
+
+    def tearDown(self):
+        """Clean up"""
+        with app.app_context():
+            db.session.remove()
+            db.drop_all()
+
+    def test_turn_equity(self):
+        """Test exact equities of the players still in when the turn is dealt"""
+        response = self.client.get("/api/hands/equity-0/equity?street=turn")
+
+        self.assertEqual(response.status_code, 200)
+        data = response.get_json()
+        self.assertEqual(
+            (data["board"], data["method"], data["runouts"]), ("AcKc2s7d", "exact", 44)
+        )
+        self.assertEqual(
+            [(p["name"], p["hole_cards"], p["equity"]) for p in data["players"]],
+            [("Alice", "AhAd", 97.73), ("Bob", "KhKd", 2.27)],
+        )
+        self.assertTrue(response.cache_control.no_cache)
+
+    def test_folded_players_left_out(self):
+        """Test that a player who folded preflop is not dealt in on the flop"""
+        data = self.client.get("/api/hands/equity-0/equity?street=flop").get_json()
+
+        self.assertEqual([p["name"] for p in data["players"]], ["Alice", "Bob"])
+        self.assertEqual(data["runouts"], 990)
+
+    def test_preflop_table(self):
+        """Test that heads-up preflop spots are looked up once the table is built"""
+        players = [{"name": "Alice", "stack": 100}, {"name": "Bob", "stack": 100}]
+        for play_id, hole_cards in [
+            ("equity-1", {"Alice": "AhAd", "Bob": "7c2s"}),
+            ("equity-2", {"Alice": "AsKs", "Bob": "QsJs"}),
+        ]:
+            self.client.post(
+                "/api/save-hand",
+                json={
+                    "play_id": play_id,
+                    "players": players,
+                    "actions": [
+                        {"player_name": "Alice", "action_type": "raise", "amount": 6},
+                        {"player_name": "Bob", "action_type": "fold"},
+                    ],
+                    "hole_cards": hole_cards,
+                },
+            )
+        before = self.client.get("/api/hands/equity-1/equity")
+        sampled = before.get_json()
+        self.assertEqual(sampled["method"], "monte_carlo")
+        suited = self.client.get("/api/hands/equity-2/equity").get_json()
+
+        original_path = app.config["PREFLOP_EQUITY_TABLE"]
+        with tempfile.TemporaryDirectory() as directory:
+            app.config["PREFLOP_EQUITY_TABLE"] = os.path.join(directory, "preflop_equity.npy")
+            try:
+                result = app.test_cli_runner().invoke(
+                    args=["build-preflop-equity", "--samples", "200"]
+                )
+                self.assertEqual(result.exit_code, 0, result.output)
+                self.assertIn("Wrote preflop equities", result.output)
+
+                response = self.client.get("/api/hands/equity-1/equity")
+                # Hands sharing a suit block each other's flushes, so they are not looked up
+                self.assertEqual(self.client.get("/api/hands/equity-2/equity").get_json(), suited)
+            finally:
+                app.config["PREFLOP_EQUITY_TABLE"] = original_path
+                load_preflop_equity()
+
+        data = response.get_json()
+        self.assertEqual((data["method"], data["runouts"]), ("preflop_table", None))
+        self.assertNotEqual(response.get_etag(), before.get_etag())
+        alice, bob = data["players"]
+        self.assertAlmostEqual(alice["equity"], sampled["players"][0]["equity"], delta=7)
+        self.assertAlmostEqual(alice["equity"] + bob["equity"], 100.0, delta=0.01)
+
+    def test_errors(self):
+        """Test unknown hole cards, streets the hand never reached and bad requests"""
+        cases = [
+            ("/api/hands/equity-0/equity", 400, "Hole cards unknown for: Carol"),
+            ("/api/hands/equity-0/equity?street=river", 400, "Hand has no river cards"),
+            ("/api/hands/equity-0/equity?street=showdown", 400, "Invalid street: showdown"),
+            ("/api/hands/missing/equity?street=flop", 404, "Hand not found"),
+        ]
+        for url, status, error in cases:
+            with self.subTest(url=url):
+                response = self.client.get(url)
+
+                self.assertEqual(response.status_code, status)
+                self.assertEqual(response.get_json()["error"], error)
+
+
+class TestSQLiteConfiguration(unittest.TestCase):
+    """Test cases for the SQLite connection pragmas"""
+
+    def setUp(self):
+        """Set up a clean database"""
+        app.config["TESTING"] = True
+        with app.app_context():
+            self.engine = db.engine
+            if self.engine.dialect.name != "sqlite":
+                self.skipTest("SQLite-only configuration")
+            db.create_all()
+
+    def tearDown(self):
+        """Clean up"""
+        with app.app_context():
+            db.session.remove()
+            db.drop_all()
+
+    def test_connections_use_wal_and_busy_timeout(self):
+        """Test that new connections get the configured pragmas"""
+        pragmas = app.config["SQLITE_PRAGMAS"]
+        with self.engine.connect() as conn:
+            values = {
+                name: conn.exec_driver_sql(f"PRAGMA {name}").scalar()
+                for name in ("journal_mode", "busy_timeout", "synchronous", "cache_size")
+            }
+
+        self.assertEqual(values["journal_mode"], "wal")
+        self.assertEqual(values["busy_timeout"], pragmas["busy_timeout"])
+        self.assertEqual(values["synchronous"], 1)  # NORMAL
+        self.assertEqual(values["cache_size"], pragmas["cache_size"])
+
+    def test_reader_does_not_block_writer(self):
+        """Test that an open read transaction does not block a commit"""
+        client = app.test_client()
+        client.post("/api/create-sample", json={"pattern": "heads_up"})
+
+        with self.engine.connect() as reader:
+            reader.exec_driver_sql("BEGIN")
+            self.assertEqual(reader.exec_driver_sql("SELECT COUNT(*) FROM hands").scalar(), 1)
+
+            response = client.post("/api/create-sample", json={"pattern": "standard"})
+            self.assertEqual(response.status_code, 200)
+
+            # The reader keeps its snapshot until its transaction ends
+            self.assertEqual(reader.exec_driver_sql("SELECT COUNT(*) FROM hands").scalar(), 1)
+            reader.exec_driver_sql("COMMIT")
+            self.assertEqual(reader.exec_driver_sql("SELECT COUNT(*) FROM hands").scalar(), 2)
+
 
 class TestAppIntegration(unittest.TestCase):
     """Integration tests for complete workflows"""
@@ -421,6 +1398,8 @@ class TestAppIntegration(unittest.TestCase):
         app.config["SQLALCHEMY_DATABASE_URI"] = f"sqlite:///{self.db_path}"
         app.config["TESTING"] = True
         self.client = app.test_client()
+        # Tests reuse play_ids across fresh databases, so drop cached responses
+        response_cache.clear()
 
         with app.app_context():
             db.create_all()
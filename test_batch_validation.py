@@ -0,0 +1,131 @@
+import unittest
+
+from app import get_sample_hand_patterns, process_hand_actions
+from poker_engine import STREETS
+
+try:
+    import numpy as np
+
+    from batch_validation import (
+        CALL,
+        CHECK,
+        ERROR_ALL_IN,
+        ERROR_CHECK_FACING_BET,
+        ERROR_FOLDED,
+        ERROR_NONE,
+        ERROR_OVER_BET,
+        ERROR_UNKNOWN_ACTION,
+        ERROR_UNKNOWN_PLAYER,
+        RAISE,
+        hands_to_columns,
+        validate_batch,
+    )
+except ImportError:  # NumPy is optional outside simulation workloads
+    np = None
+
+
+@unittest.skipIf(np is None, "NumPy is not installed")
+class TestBatchValidation(unittest.TestCase):
+    """Test cases for the columnar NumPy validator"""
+
+    def setUp(self):
+        """Set up a three-handed table"""
+        self.players = [
+            {"name": "Alice", "stack": 100.0},
+            {"name": "Bob", "stack": 100.0},
+            {"name": "Charlie", "stack": 150.0},
+        ]
+
+    def hand(self, *actions):
+        return {
+            "players": self.players,
+            "actions": [
+                dict(zip(("player_name", "action_type", "amount"), action)) for action in actions
+            ],
+        }
+
+    def test_matches_process_hand_actions(self):
+        """Test that sample hands validate to the same stored columns"""
+        hands = [dict(pattern) for pattern in get_sample_hand_patterns().values()]
+
+        result = validate_batch(**hands_to_columns(hands))
+
+        self.assertFalse(result["error"].any())
+        row = 0
+        for hand_id, hand in enumerate(hands):
+            expected = process_hand_actions(
+                hand["players"], hand["actions"], hand.get("small_blind", 1.0), hand.get("big_blind", 2.0)
+            )
+            for action in expected[: len(hand["actions"])]:
+                with self.subTest(hand=hand["name"], row=row):
+                    self.assertEqual(STREETS[result["street"][row]], action["street"])
+                    self.assertEqual(result["amount"][row], action["amount"])
+                    self.assertEqual(result["pot_size"][row], action["pot_size"])
+                    self.assertEqual(result["remaining_stack"][row], action["remaining_stack"])
+                row += 1
+            self.assertEqual(result["pot"][hand_id], expected[len(hand["actions"]) - 1]["pot_size"])
+
+    def test_error_codes(self):
+        """Test that each hand stops at its first error"""
+        hands = [
+            self.hand(("Charlie", "raise", 6.0), ("Alice", "call", 0)),
+            self.hand(("Dave", "fold", 0)),
+            self.hand(("Charlie", "fold", 0), ("Charlie", "call", 0)),
+            self.hand(("Charlie", "check", 0)),
+            self.hand(("Charlie", "raise", 500.0), ("Alice", "check", 0)),
+            self.hand(("Charlie", "muck", 0)),
+        ]
+
+        result = validate_batch(**hands_to_columns(hands))
+
+        self.assertEqual(
+            result["error"].tolist(),
+            [
+                ERROR_NONE,
+                ERROR_UNKNOWN_PLAYER,
+                ERROR_FOLDED,
+                ERROR_CHECK_FACING_BET,
+                ERROR_OVER_BET,
+                ERROR_UNKNOWN_ACTION,
+            ],
+        )
+        self.assertEqual(result["error_row"].tolist(), [-1, 2, 4, 5, 6, 8])
+        # Rows after an error are left unset
+        self.assertEqual(result["street"][7], -1)
+        self.assertTrue(np.isnan(result["pot_size"][7]))
+
+    def test_bets_are_capped_by_chips_from_earlier_streets(self):
+        """Test the multi-street stack cap and actions from all-in players"""
+        hands = [
+            self.hand(("Charlie", "fold", 0), ("Alice", "raise", 60.0), ("Bob", "call", 0),
+                      ("Bob", "bet", 80.0)),
+            self.hand(("Charlie", "fold", 0), ("Alice", "raise", 60.0), ("Bob", "call", 0),
+                      ("Bob", "bet", 40.0), ("Alice", "call", 0), ("Alice", "check", 0)),
+        ]
+
+        result = validate_batch(**hands_to_columns(hands))
+
+        self.assertEqual(result["error"].tolist(), [ERROR_OVER_BET, ERROR_ALL_IN])
+        self.assertEqual(result["error_row"].tolist(), [3, 9])
+        self.assertEqual(result["street"][8], 1)
+        self.assertEqual(result["amount"][8], 40.0)
+        self.assertEqual(result["pot"][1], 200.0)
+
+    def test_interleaved_hands(self):
+        """Test that columns need not be grouped by hand"""
+        stacks = np.array([[100.0, 100.0, np.nan], [50.0, 50.0, 50.0]])
+        hand_ids = np.array([1, 0, 1, 0, 1])
+        seats = np.array([2, 0, 0, 1, 1])
+        codes = np.array([RAISE, CALL, CALL, CHECK, CALL])
+        amounts = np.array([6.0, 0, 0, 0, 0])
+
+        result = validate_batch(hand_ids, seats, codes, amounts, stacks)
+
+        self.assertFalse(result["error"].any())
+        self.assertEqual(result["street"].tolist(), [0, 0, 0, 0, 0])
+        self.assertEqual(result["pot"].tolist(), [4.0, 18.0])
+        self.assertEqual(result["amount"].tolist(), [6.0, 1.0, 5.0, 0.0, 4.0])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,155 @@
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from equity import (
+    STARTING_HANDS,
+    EquityCalculator,
+    PreflopEquityTable,
+    build_preflop_table,
+    starting_hand_index,
+    suits_interact,
+)
+from hand_evaluator import HandEvaluator
+
+
+class TestEquityCalculator(unittest.TestCase):
+    """Test cases for enumerated and sampled equities"""
+
+    @classmethod
+    def setUpClass(cls):
+        """Build the hand rank tables once for every test"""
+        cls.evaluator = HandEvaluator.load()
+
+    def setUp(self):
+        """Start each test with an empty spot cache"""
+        self.calculator = EquityCalculator(self.evaluator, samples=20000, seed=3)
+
+    def test_exact_turn(self):
+        """Test a set of kings drawing to the one remaining king"""
+        result = self.calculator.calculate(["AhAd", "KhKd"], "AcKc2s7d")
+
+        self.assertEqual((result["method"], result["runouts"]), ("exact", 44))
+        self.assertEqual(
+            result["players"],
+            [
+                {"win": 97.73, "tie": 0.0, "equity": 97.73},
+                {"win": 2.27, "tie": 0.0, "equity": 2.27},
+            ],
+        )
+
+    def test_board_plays_on_the_river(self):
+        """Test that a complete board is one runout and ties share the pot"""
+        result = self.calculator.calculate(["2c3d", "4h5h", "6c6d"], "AsKsQsJsTs")
+
+        self.assertEqual((result["method"], result["runouts"]), ("exact", 1))
+        self.assertEqual(
+            [player["equity"] for player in result["players"]], [33.33, 33.33, 33.33]
+        )
+        self.assertEqual({player["tie"] for player in result["players"]}, {100.0})
+
+    def test_monte_carlo_preflop(self):
+        """Test that preflop is sampled, close to the known odds and repeatable"""
+        result = self.calculator.calculate(["AsKs", "QdQc"])
+
+        self.assertEqual((result["method"], result["runouts"]), ("monte_carlo", 20000))
+        # Suited AK against queens is about 46% to 54%
+        self.assertAlmostEqual(result["players"][0]["equity"], 46.0, delta=1.5)
+        self.assertAlmostEqual(
+            sum(player["equity"] for player in result["players"]), 100.0, delta=0.02
+        )
+        again = EquityCalculator(self.evaluator, samples=20000, seed=3).calculate(["AsKs", "QdQc"])
+        self.assertEqual(again, result)
+
+    def test_spots_cached_across_seat_orders(self):
+        """Test that swapped seats and reordered cards reuse one cached spot"""
+        first = self.calculator.calculate(["AsKh", "QdQc"], "AhKd5c")
+        second = self.calculator.calculate(["QcQd", "KhAs"], "5cKdAh")
+
+        self.assertEqual((self.calculator.hits, self.calculator.misses), (1, 1))
+        self.assertEqual(second["players"], first["players"][::-1])
+
+    def test_rejects_invalid_cards(self):
+        """Test missing, repeated and malformed cards"""
+        for hole_cards, board in [
+            (["AsKh", "As2c"], ""),
+            (["AsKh", "QdQc"], "Qd7c2h"),
+            (["AsKh", "Qd"], ""),
+            (["AsKh", "????"], ""),
+        ]:
+            with self.subTest(hole_cards=hole_cards, board=board):
+                with self.assertRaises(ValueError):
+                    self.calculator.calculate(hole_cards, board)
+
+
+class TestPreflopEquityTable(unittest.TestCase):
+    """Test cases for the sampled 169x169 starting-hand table"""
+
+    @classmethod
+    def setUpClass(cls):
+        """Sample a small table once for every test"""
+        cls.table = build_preflop_table(HandEvaluator.load(), samples=200, seed=5)
+
+    def test_starting_hands(self):
+        """Test the grid names and the index of concrete hole cards"""
+        self.assertEqual(len(STARTING_HANDS), 169)
+        self.assertEqual(STARTING_HANDS[:2] + STARTING_HANDS[-1:], ("AA", "AKs", "22"))
+        self.assertEqual(STARTING_HANDS[starting_hand_index("KhAh")], "AKs")
+        self.assertEqual(STARTING_HANDS[starting_hand_index("Ah7d")], "A7o")
+        self.assertEqual(STARTING_HANDS[starting_hand_index("9c9s")], "99")
+        for bad in ("Ah", "AhAh", "AhKdQc"):
+            with self.subTest(cards=bad):
+                with self.assertRaises(ValueError):
+                    starting_hand_index(bad)
+
+    def test_matchups_add_up(self):
+        """Test that both sides of every matchup share 100% and mirrors are even"""
+        wins, ties = self.table.astype(np.int64)
+        self.assertTrue((wins + ties + wins.T == 10000).all())
+        self.assertTrue((ties == ties.T).all())
+
+    def test_lookup(self):
+        """Test equities against known odds, whatever the suits and seat order"""
+        table = PreflopEquityTable(self.table)
+
+        aces = table.lookup("AhAd", "7c2s")
+        self.assertAlmostEqual(aces["equity"], 87.5, delta=7)
+        self.assertEqual(table.lookup("AsAc", "7h2d"), aces)
+        trash = table.lookup("7c2s", "AhAd")
+        self.assertAlmostEqual(aces["equity"] + trash["equity"], 100.0, delta=0.01)
+        self.assertEqual(trash["tie"], aces["tie"])
+        self.assertEqual(table.lookup("AhKh", "AsKs")["equity"], 50.0)
+        for hole_cards, opponent in [("AhAd", "Ah2s"), ("AsKs", "QsJs"), ("AhAd", "7c2h")]:
+            with self.subTest(hole_cards=hole_cards, opponent=opponent):
+                with self.assertRaises(ValueError):
+                    table.lookup(hole_cards, opponent)
+
+    def test_suits_interact(self):
+        """Test that only hands with a suit in common interact"""
+        self.assertTrue(suits_interact("AsKs", "QsJs"))
+        self.assertTrue(suits_interact("AhAd", "7c2d"))
+        self.assertFalse(suits_interact("AsKs", "QhJh"))
+        self.assertFalse(suits_interact("AhAd", "7c2s"))
+
+    def test_saved_table_memory_mapped(self):
+        """Test that a saved table maps back read-only and bad files are refused"""
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "tables", "preflop_equity.npy")
+            PreflopEquityTable(self.table).save(path)
+
+            mapped = PreflopEquityTable.load(path)
+
+            self.assertIsInstance(mapped.table, np.memmap)
+            self.assertEqual(os.path.getsize(path), 128 + self.table.nbytes)
+            self.assertTrue((mapped.table == self.table).all())
+
+            with open(path, "wb") as fileobj:
+                np.save(fileobj, np.zeros((169, 169), dtype=np.uint16))
+            with self.assertRaises(ValueError):
+                PreflopEquityTable.load(path)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,114 @@
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from hand_evaluator import (
+    CATEGORY_NAMES,
+    FLUSH,
+    FULL_HOUSE,
+    HAND_CLASSES,
+    HIGH_CARD,
+    STRAIGHT,
+    STRAIGHT_FLUSH,
+    TWO_PAIR,
+    HandEvaluator,
+    card_index,
+    hand_category,
+    parse_cards,
+)
+
+
+class TestHandEvaluator(unittest.TestCase):
+    """Test cases for the lookup-table 7-card evaluator"""
+
+    @classmethod
+    def setUpClass(cls):
+        """Build the tables once for every test"""
+        cls.evaluator = HandEvaluator.load()
+
+    def strength(self, cards):
+        return self.evaluator.evaluate_string(cards)
+
+    def test_card_encoding(self):
+        """Test rank * 4 + suit encoding and rejected cards"""
+        self.assertEqual(card_index("2c"), 0)
+        self.assertEqual(card_index("As"), 51)
+        self.assertEqual(card_index("td"), card_index("Td"))
+        self.assertEqual(parse_cards("AsKh"), [51, 46])
+        for bad in ("1s", "Ax", "??", "As7"):
+            with self.subTest(cards=bad):
+                with self.assertRaises(ValueError):
+                    parse_cards(bad)
+
+    def test_categories_and_extremes(self):
+        """Test the best five of seven cards for each kind of hand"""
+        cases = [
+            ("AsKsQsJsTs2d3c", STRAIGHT_FLUSH),
+            ("5h4h3h2hAh9c9d", STRAIGHT_FLUSH),
+            ("KdKcKh7s7d7c2h", FULL_HOUSE),
+            ("Ah9h5h3h2hAdAc", FLUSH),
+            ("Ad2c3h4s5d9c9h", STRAIGHT),
+            ("AhAd9s9c5h5d2c", TWO_PAIR),
+            ("7c5d4h3s2c9s8s", HIGH_CARD),
+        ]
+        for cards, category in cases:
+            with self.subTest(cards=cards):
+                self.assertEqual(hand_category(self.strength(cards)), category)
+        self.assertEqual(self.strength("AsKsQsJsTs2d3c"), HAND_CLASSES)
+        self.assertEqual(self.evaluator.describe(self.strength("KdKcKh7s7d7c2h")), "Full House")
+        self.assertEqual(len(CATEGORY_NAMES), 9)
+
+    def test_ordering_and_ties(self):
+        """Test kickers, the wheel and hands that split"""
+        self.assertGreater(self.strength("AhKd9s9c5h3d2c"), self.strength("AhQd9s9c5h3d2c"))
+        self.assertGreater(self.strength("6d2c3h4s5d9cJh"), self.strength("Ad2c3h4s5d9cJh"))
+        # The board plays for both players
+        self.assertEqual(self.strength("2c3dAsKsQsJsTs"), self.strength("4h5hAsKsQsJsTs"))
+        # Two pair with a third pair counts the best kicker
+        self.assertEqual(self.strength("AhAd9s9c5h5dKc"), self.strength("AhAd9s9cKh4d2c"))
+
+    def test_rejects_wrong_card_counts(self):
+        """Test that exactly seven distinct cards are required"""
+        with self.assertRaises(ValueError):
+            self.strength("AsKsQsJsTs2d")
+        with self.assertRaises(ValueError):
+            self.strength("AsAsQsJsTs2d3c")
+
+    def test_batch_matches_single(self):
+        """Test evaluate_batch against evaluate on random deals, across chunks"""
+        rng = np.random.default_rng(7)
+        cards = np.argsort(rng.random((3000, 52)), axis=1)[:, :7].astype(np.uint8)
+
+        strengths = self.evaluator.evaluate_batch(cards, chunk_size=1000)
+
+        self.assertEqual(strengths.dtype, np.uint16)
+        self.assertEqual(
+            strengths.tolist(), [self.evaluator.evaluate(row.tolist()) for row in cards]
+        )
+        with self.assertRaises(ValueError):
+            self.evaluator.evaluate_batch(cards[:, :5])
+
+    def test_tables_memory_mapped_from_file(self):
+        """Test that load writes the table file once and maps it afterwards"""
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "tables", "hand_ranks.npy")
+
+            built = HandEvaluator.load(path)
+            mapped = HandEvaluator.load(path)
+
+            self.assertIsInstance(mapped.rank_table, np.memmap)
+            self.assertEqual(os.listdir(os.path.dirname(path)), ["hand_ranks.npy"])
+            self.assertEqual(
+                mapped.evaluate_string("KdKcKh7s7d7c2h"), built.evaluate_string("KdKcKh7s7d7c2h")
+            )
+
+            with open(path, "wb") as fileobj:
+                np.save(fileobj, np.zeros(10, dtype=np.uint16))
+            with self.assertRaises(ValueError):
+                HandEvaluator.load(path)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,235 @@
+import unittest
+
+from sqlalchemy import inspect, text
+
+from app import app, db, migrate_database
+from migrations import MIGRATIONS, migration_metadata, schema_migrations
+from models import Action, Hand, HandResult, Player, PlayerName, PlayerStats
+
+
+class TestMigrations(unittest.TestCase):
+    """Test cases for versioned schema migrations"""
+
+    def setUp(self):
+        """Start from an empty database"""
+        app.config["TESTING"] = True
+        with app.app_context():
+            db.drop_all()
+            migration_metadata.drop_all(db.engine)
+
+    def tearDown(self):
+        """Clean up"""
+        with app.app_context():
+            db.session.remove()
+            db.drop_all()
+            migration_metadata.drop_all(db.engine)
+
+    def applied_versions(self):
+        with app.app_context():
+            return db.session.scalars(
+                db.select(schema_migrations.c.version).order_by(schema_migrations.c.version)
+            ).all()
+
+    def test_fresh_database(self):
+        """Test that migrating an empty database creates every table once"""
+        applied = migrate_database()
+
+        self.assertEqual([version for version, _ in applied], [m[0] for m in MIGRATIONS])
+        self.assertEqual(self.applied_versions(), [m[0] for m in MIGRATIONS])
+        with app.app_context():
+            tables = set(inspect(db.engine).get_table_names())
+        self.assertTrue(set(db.metadata.tables).issubset(tables))
+
+        self.assertEqual(migrate_database(), [])
+
+    def test_legacy_database_catches_up(self):
+        """Test a database created before indexes and player_names existed"""
+        with app.app_context():
+            db.create_all()
+            hand = Hand(play_id="legacy-1")
+            db.session.add(hand)
+            db.session.flush()
+            db.session.add_all(
+                [
+                    Player(hand_id=hand.id, name="Alice", stack=100),
+                    Player(hand_id=hand.id, name="Bob", stack=100),
+                ]
+            )
+            db.session.execute(text("DROP INDEX ix_players_name"))
+            db.session.commit()
+
+        migrate_database()
+
+        with app.app_context():
+            indexes = {index["name"] for index in inspect(db.engine).get_indexes("players")}
+            self.assertIn("ix_players_name", indexes)
+            self.assertEqual(
+                sorted(name for (name,) in db.session.query(PlayerName.name)), ["Alice", "Bob"]
+            )
+
+    def test_backfill_skips_known_names(self):
+        """Test that names already in player_names are not inserted twice"""
+        with app.app_context():
+            db.create_all()
+            hand = Hand(play_id="legacy-2")
+            db.session.add(hand)
+            db.session.flush()
+            db.session.add(Player(hand_id=hand.id, name="Alice", stack=100))
+            db.session.add(PlayerName(name="Alice", name_key="alice"))
+            db.session.commit()
+
+        migrate_database()
+
+        with app.app_context():
+            self.assertEqual(PlayerName.query.count(), 1)
+
+    def test_player_stats_counted_from_stored_actions(self):
+        """Test that a database without player_stats gets it filled on migrate"""
+        with app.app_context():
+            db.create_all()
+            hand = Hand(play_id="legacy-3")
+            db.session.add(hand)
+            db.session.flush()
+            db.session.add_all(
+                [
+                    Player(hand_id=hand.id, name="Alice", stack=100),
+                    Player(hand_id=hand.id, name="Bob", stack=100),
+                    Action(
+                        hand_id=hand.id,
+                        street="preflop",
+                        player_name="Alice",
+                        action_type="raise",
+                        amount=6,
+                        action_order=1,
+                    ),
+                    Action(
+                        hand_id=hand.id,
+                        street="preflop",
+                        player_name="Bob",
+                        action_type="fold",
+                        amount=0,
+                        action_order=2,
+                    ),
+                ]
+            )
+            db.session.commit()
+            PlayerStats.__table__.drop(db.engine)
+
+        migrate_database()
+
+        with app.app_context():
+            alice = db.session.get(PlayerStats, "Alice")
+            bob = db.session.get(PlayerStats, "Bob")
+            self.assertEqual((alice.hands, alice.vpip_hands, alice.pfr_hands), (1, 1, 1))
+            self.assertEqual((bob.hands, bob.vpip_hands, bob.three_bet_opportunities), (1, 0, 1))
+
+    def test_hand_results_awarded_from_stored_hands(self):
+        """Test that a database without hand_results gets every pot awarded on migrate"""
+        with app.app_context():
+            db.create_all()
+            hand = Hand(play_id="legacy-4", small_blind=1.0, big_blind=2.0, board="2c7d9hTs3c")
+            db.session.add(hand)
+            db.session.flush()
+            db.session.add_all(
+                [
+                    Player(hand_id=hand.id, name="Alice", stack=100, position="SB", hole_cards="KsKd"),
+                    Player(hand_id=hand.id, name="Bob", stack=100, position="BB", hole_cards="AhAc"),
+                ]
+            )
+            db.session.add_all(
+                Action(
+                    hand_id=hand.id,
+                    street=street,
+                    player_name=name,
+                    action_type=action_type,
+                    amount=amount,
+                    action_order=order,
+                )
+                for order, (street, name, action_type, amount) in enumerate(
+                    [("preflop", "Alice", "call", 1.0), ("preflop", "Bob", "check", 0)]
+                    + [
+                        (street, name, "check", 0)
+                        for street in ("flop", "turn", "river")
+                        for name in ("Bob", "Alice")
+                    ],
+                    start=1,
+                )
+            )
+            db.session.commit()
+            HandResult.__table__.drop(db.engine)
+
+        migrate_database()
+
+        with app.app_context():
+            self.assertEqual(
+                sorted((row.player_name, row.invested, row.won, row.net) for row in HandResult.query),
+                [("Alice", 2.0, 0.0, -2.0), ("Bob", 2.0, 4.0, 2.0)],
+            )
+
+    def test_import_job_owner_columns_added(self):
+        """Test that an import_jobs table from before job recovery gets the new columns"""
+        with app.app_context():
+            db.create_all()
+            db.session.execute(text("DROP TABLE import_jobs"))
+            db.session.execute(
+                text(
+                    "CREATE TABLE import_jobs (id VARCHAR(36) PRIMARY KEY, "
+                    "status VARCHAR(20) NOT NULL, processed INTEGER NOT NULL, "
+                    "succeeded INTEGER NOT NULL, failed INTEGER NOT NULL, errors TEXT, "
+                    "created_at DATETIME, finished_at DATETIME)"
+                )
+            )
+            db.session.commit()
+
+        migrate_database()
+
+        with app.app_context():
+            columns = {column["name"] for column in inspect(db.engine).get_columns("import_jobs")}
+        self.assertTrue({"owner", "heartbeat_at", "spool_path"}.issubset(columns))
+
+    def test_action_auto_folded_column_added(self):
+        """Test that an actions table from before auto-fold flags keeps its rows unflagged"""
+        with app.app_context():
+            db.create_all()
+            db.session.execute(text("DROP TABLE actions"))
+            db.session.execute(
+                text(
+                    "CREATE TABLE actions (id INTEGER PRIMARY KEY, hand_id INTEGER NOT NULL, "
+                    "street VARCHAR(20) NOT NULL, player_name VARCHAR(50) NOT NULL, "
+                    "action_type VARCHAR(20) NOT NULL, amount FLOAT, pot_size FLOAT, "
+                    "remaining_stack FLOAT, action_order INTEGER NOT NULL)"
+                )
+            )
+            db.session.execute(
+                text(
+                    "INSERT INTO actions (hand_id, street, player_name, action_type, action_order) "
+                    "VALUES (1, 'preflop', 'Alice', 'fold', 0)"
+                )
+            )
+            db.session.commit()
+
+        migrate_database()
+
+        with app.app_context():
+            self.assertEqual(db.session.scalars(db.select(Action.auto_folded)).all(), [False])
+
+    def test_migrate_command(self):
+        """Test the flask migrate CLI command"""
+        runner = app.test_cli_runner()
+
+        result = runner.invoke(args=["migrate"])
+        self.assertEqual(result.exit_code, 0, result.output)
+        self.assertIn("Applied migration 1: Create base tables", result.output)
+
+        result = runner.invoke(args=["migrate"])
+        self.assertIn("Database schema is up to date", result.output)
+
+    def test_requests_do_not_run_ddl(self):
+        """Test that no before_request hook touches the schema"""
+        hooks = [f.__name__ for f in app.before_request_funcs.get(None, [])]
+
+        self.assertNotIn("create_tables", hooks)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -4,8 +4,9 @@ import unittest
 from datetime import datetime
 
 from flask import Flask
+from sqlalchemy import inspect, text
 
-from models import Action, Hand, Player, db
+from models import Action, Hand, Player, create_missing_indexes, db
 
 
 class TestModels(unittest.TestCase):
@@ -473,6 +474,51 @@ class TestModels(unittest.TestCase):
         self.assertEqual(len(preflop_actions), 3)
         self.assertEqual(len(flop_actions), 2)
 
+    def test_declared_indexes_exist(self):
+        """Test that the hot lookup columns are indexed"""
+        inspector = inspect(db.engine)
+        index_columns = {
+            index["name"]: index["column_names"]
+            for table in ("hands", "players", "actions")
+            for index in inspector.get_indexes(table)
+        }
+
+        self.assertEqual(index_columns["ix_hands_created_at_id"], ["created_at", "id"])
+        self.assertEqual(index_columns["ix_players_hand_id"], ["hand_id"])
+        self.assertEqual(index_columns["ix_players_name"], ["name"])
+        self.assertEqual(
+            index_columns["ix_actions_hand_id_action_order"], ["hand_id", "action_order"]
+        )
+
+    def test_action_lookup_uses_index(self):
+        """Test that loading a hand's ordered actions is an index search, not a scan"""
+        if db.engine.dialect.name != "sqlite":
+            self.skipTest("EXPLAIN QUERY PLAN is SQLite-specific")
+        plan = db.session.execute(
+            text(
+                "EXPLAIN QUERY PLAN SELECT * FROM actions "
+                "WHERE hand_id = 1 ORDER BY action_order"
+            )
+        ).all()
+        detail = " ".join(row[-1] for row in plan)
+
+        self.assertIn("ix_actions_hand_id_action_order", detail)
+        self.assertNotIn("TEMP B-TREE", detail)
+
+    def test_create_missing_indexes_on_existing_database(self):
+        """Test that databases created before the indexes existed catch up"""
+        for name in ("ix_players_hand_id", "ix_players_name", "ix_actions_hand_id_action_order"):
+            db.session.execute(text(f"DROP INDEX {name}"))
+        db.session.commit()
+
+        created = create_missing_indexes(db.engine)
+
+        self.assertEqual(
+            sorted(created),
+            ["ix_actions_hand_id_action_order", "ix_players_hand_id", "ix_players_name"],
+        )
+        self.assertEqual(create_missing_indexes(db.engine), [])
+
 
 if __name__ == "__main__":
     unittest.main()
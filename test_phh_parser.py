@@ -0,0 +1,201 @@
+import os
+import shutil
+import tempfile
+import unittest
+from concurrent.futures import Future
+
+from app import app, db, get_sample_hand_patterns, iter_parsed_files, prepare_hand
+from models import Action, Hand, Player
+from phh_parser import load_phh_file, parse_phh, phh_to_hand_data, split_phhs
+
+STANDARD_PHH = """
+variant = 'NLHE'
+antes = [0, 0, 0]
+blinds_or_straddles = [1, 2, 0]
+min_bet = 2
+starting_stacks = [100, 100, 150]
+players = ['Alice', 'Bob', 'Charlie']
+actions = [
+  'd dh p1 AsKh',
+  'd dh p2 QdQc',
+  'd dh p3 7s2h',
+  'p3 f',
+  'p1 cbr 6',
+  'p2 cc',
+  'd db AhKd5c',
+  'p1 cc',
+  'p2 cbr 8',
+  'p1 f',
+]
+"""
+
+
+class TestPHHParser(unittest.TestCase):
+    """Test cases for reading PHH back into hand payloads"""
+
+    def test_parse_standard_phh(self):
+        """Test parsing a standard PHH hand with an actions array"""
+        hand_data = phh_to_hand_data(parse_phh(STANDARD_PHH), play_id="std-1")
+
+        self.assertEqual(hand_data["play_id"], "std-1")
+        self.assertEqual(
+            hand_data["players"],
+            [
+                {"name": "Alice", "stack": 100.0},
+                {"name": "Bob", "stack": 100.0},
+                {"name": "Charlie", "stack": 150.0},
+            ],
+        )
+        self.assertEqual(hand_data["small_blind"], 1.0)
+        self.assertEqual(hand_data["big_blind"], 2.0)
+        self.assertEqual(hand_data["hole_cards"]["Charlie"], "7s2h")
+        self.assertEqual(hand_data["flop"], "AhKd5c")
+        self.assertEqual(
+            [(a["player_name"], a["action_type"], a.get("amount")) for a in hand_data["actions"]],
+            [
+                ("Charlie", "fold", None),
+                ("Alice", "raise", 6.0),
+                ("Bob", "call", None),
+                ("Alice", "check", None),
+                ("Bob", "bet", 8.0),
+                ("Alice", "fold", None),
+            ],
+        )
+
+    def test_generated_phh_round_trip(self):
+        """Test that PHH written by generate_phh parses back to the same hand"""
+        for name, pattern in get_sample_hand_patterns().items():
+            with self.subTest(pattern=name):
+                original = prepare_hand(dict(pattern, play_id="original"))
+                parsed = phh_to_hand_data(parse_phh(original["hand"]["phh_content"]))
+                reparsed = prepare_hand(dict(parsed, play_id="reparsed"))
+
+                self.assertEqual(
+                    reparsed["hand"]["phh_content"], original["hand"]["phh_content"]
+                )
+                self.assertEqual(
+                    [(a["action_type"], a["amount"], a["street"]) for a in reparsed["actions"]],
+                    [(a["action_type"], a["amount"], a["street"]) for a in original["actions"]],
+                )
+
+    def test_split_phhs(self):
+        """Test splitting a .phhs document into hands"""
+        text = f"[1]\n{STANDARD_PHH}\n[2]\n{STANDARD_PHH}"
+
+        sections = split_phhs(text)
+
+        self.assertEqual(len(sections), 2)
+        for section in sections:
+            self.assertEqual(parse_phh(section)["starting_stacks"], [100, 100, 150])
+        self.assertEqual(len(split_phhs(STANDARD_PHH)), 1)
+
+    def test_unknown_player_is_reported(self):
+        """Test that actions for seats beyond starting_stacks are rejected"""
+        text = STANDARD_PHH.replace("'p3 f'", "'p7 f'")
+
+        with self.assertRaises(ValueError):
+            phh_to_hand_data(parse_phh(text))
+
+
+class TestPHHImportCommand(unittest.TestCase):
+    """Test cases for the import-phh CLI command"""
+
+    def setUp(self):
+        """Set up an archive directory and a clean database"""
+        self.archive = tempfile.mkdtemp()
+        app.config["TESTING"] = True
+        with app.app_context():
+            db.create_all()
+
+    def tearDown(self):
+        """Clean up"""
+        with app.app_context():
+            db.session.remove()
+            db.drop_all()
+        shutil.rmtree(self.archive)
+
+    def write_archive(self):
+        """Write one .phh file and one two-hand .phhs file"""
+        os.makedirs(os.path.join(self.archive, "nested"))
+        with open(os.path.join(self.archive, "single.phh"), "w") as f:
+            f.write(STANDARD_PHH)
+        with open(os.path.join(self.archive, "nested", "session.phhs"), "w") as f:
+            f.write(f"[1]\n{STANDARD_PHH}\n[2]\n{STANDARD_PHH}")
+        with open(os.path.join(self.archive, "notes.txt"), "w") as f:
+            f.write("not a hand")
+
+    def test_import_directory_with_worker_pool(self):
+        """Test importing a directory tree with several worker processes"""
+        self.write_archive()
+        runner = app.test_cli_runner()
+
+        result = runner.invoke(args=["import-phh", self.archive, "--workers", "2"])
+
+        self.assertEqual(result.exit_code, 0, result.output)
+        self.assertIn("Imported 3 hands from 2 files (0 failed)", result.output)
+        with app.app_context():
+            self.assertEqual(Hand.query.count(), 3)
+            self.assertEqual(Player.query.count(), 9)
+            self.assertEqual(Action.query.count(), 18)
+
+    def test_reimport_reports_duplicates(self):
+        """Test that importing the same archive twice does not duplicate hands"""
+        self.write_archive()
+        runner = app.test_cli_runner()
+        runner.invoke(args=["import-phh", self.archive, "--workers", "1"])
+
+        result = runner.invoke(args=["import-phh", self.archive, "--workers", "1"])
+
+        self.assertIn("Imported 0 hands from 2 files (3 failed)", result.output)
+        with app.app_context():
+            self.assertEqual(Hand.query.count(), 3)
+
+    def test_parse_tasks_submitted_in_a_window(self):
+        """Test that files are parsed only a window ahead of the consumer"""
+        self.write_archive()
+        files = [os.path.join(self.archive, "single.phh")] * 6
+        submitted = []
+
+        class RecordingPool:
+            def submit(self, function, path):
+                submitted.append(path)
+                future = Future()
+                future.set_result(function(path))
+                return future
+
+        in_flight = []
+        for hands in iter_parsed_files(files, RecordingPool(), window=2):
+            self.assertEqual(len(hands), 1)
+            in_flight.append(len(submitted) - len(in_flight))
+
+        self.assertEqual(in_flight, [2, 2, 2, 2, 2, 1])
+
+    def test_load_phh_file_reports_bad_hands(self):
+        """Test that unparsable hands come back as errors, not exceptions"""
+        path = os.path.join(self.archive, "bad.phhs")
+        with open(path, "w") as f:
+            f.write(f"[1]\n{STANDARD_PHH}\n[2]\nstarting_stacks = [\n")
+
+        hands = load_phh_file(path)
+
+        self.assertEqual(len(hands), 2)
+        self.assertIsInstance(hands[0], dict)
+        self.assertIsInstance(hands[1], ValueError)
+
+    def test_load_phh_file_reports_unreadable_files(self):
+        """Test that a file that isn't UTF-8, or is gone, is one error rather than an exception"""
+        path = os.path.join(self.archive, "latin1.phh")
+        with open(path, "wb") as f:
+            f.write(STANDARD_PHH.encode() + b"\n# Jos\xe9\n")
+
+        for bad in (path, os.path.join(self.archive, "missing.phh")):
+            with self.subTest(path=bad):
+                hands = load_phh_file(bad)
+
+                self.assertEqual(len(hands), 1)
+                self.assertIsInstance(hands[0], ValueError)
+                self.assertIn(bad, str(hands[0]))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,6 +1,13 @@
 import unittest
 
-from poker_engine import PokerHandBuilder, create_sample_hand
+from hand_evaluator import HandEvaluator
+from poker_engine import (
+    HandState,
+    PokerHandBuilder,
+    count_player_stats,
+    create_sample_hand,
+    split_pots,
+)
 
 
 class TestPokerHandBuilder(unittest.TestCase):
@@ -284,5 +291,335 @@ class TestPokerHandBuilderEdgeCases(unittest.TestCase):
         self.assertEqual(actions[1]["amount"], 0)
 
 
+class TestHandState(unittest.TestCase):
+    """Test cases for the single-pass HandState engine"""
+
+    def setUp(self):
+        """Set up a three-handed hand that reaches the flop"""
+        self.players = [
+            {"name": "Alice", "stack": 100.0, "position": "SB", "hole_cards": "AsKh"},
+            {"name": "Bob", "stack": 100.0, "position": "BB", "hole_cards": "QdQc"},
+            {"name": "Charlie", "stack": 150.0, "position": "BTN", "hole_cards": ""},
+        ]
+        self.actions = [
+            {"player_name": "Charlie", "action_type": "fold"},
+            {"player_name": "Alice", "action_type": "raise", "amount": 6.0},
+            {"player_name": "Bob", "action_type": "call"},
+            {"player_name": "Alice", "action_type": "bet", "amount": 8.0},
+            {"player_name": "Bob", "action_type": "fold"},
+        ]
+
+    def test_process_assigns_streets_and_amounts(self):
+        """Test stored action fields, including the per-street remaining_stack"""
+        state = HandState(self.players, 1.0, 2.0, "AhKd5c")
+
+        processed = state.process(self.actions)
+
+        self.assertEqual(
+            [(a["action_type"], a["amount"], a["street"], a["pot_size"]) for a in processed],
+            [
+                ("fold", 0, "preflop", 3.0),
+                ("raise", 6.0, "preflop", 8.0),
+                ("call", 4.0, "preflop", 12.0),
+                ("bet", 8.0, "flop", 20.0),
+                ("fold", 0, "flop", 20.0),
+            ],
+        )
+        # Bets reset each street, so Alice's flop bet leaves 100 - 8
+        self.assertEqual(processed[3]["remaining_stack"], 92.0)
+
+    def test_players_without_actions_auto_fold(self):
+        """Test that players who never act are folded preflop at the end"""
+        state = HandState(self.players, 1.0, 2.0)
+
+        processed = state.process(self.actions[1:3])
+
+        self.assertEqual(processed[-1]["player_name"], "Charlie")
+        self.assertEqual(processed[-1]["action_type"], "fold")
+        self.assertEqual(processed[-1]["street"], "preflop")
+
+    def test_invalid_actions(self):
+        """Test the validation errors raised while walking the actions"""
+        cases = [
+            ({"player_name": "Dave", "action_type": "fold"}, "Player Dave not found"),
+            ({"player_name": "Charlie", "action_type": "check"}, "cannot check"),
+            ({"player_name": "Charlie", "action_type": "raise", "amount": 500}, "cannot bet"),
+        ]
+        for action, message in cases:
+            with self.subTest(action=action):
+                with self.assertRaisesRegex(ValueError, message):
+                    HandState(self.players, 1.0, 2.0).process([action])
+
+        with self.assertRaisesRegex(ValueError, "already folded"):
+            HandState(self.players, 1.0, 2.0).process(self.actions[:1] * 2)
+
+    def test_bets_are_capped_by_chips_from_earlier_streets(self):
+        """Test that a stack covers the whole hand, not each street separately"""
+        players = [{"name": "Alice", "stack": 100.0}, {"name": "Bob", "stack": 80.0}]
+        actions = [
+            {"player_name": "Alice", "action_type": "raise", "amount": 60.0},
+            {"player_name": "Bob", "action_type": "call"},
+        ]
+
+        with self.assertRaisesRegex(ValueError, r"only \$20.0 additional available"):
+            HandState(players, 1.0, 2.0).process(
+                actions + [{"player_name": "Bob", "action_type": "bet", "amount": 80.0}]
+            )
+
+        # Bob can only call with the 20 the preflop call left him
+        actions.append({"player_name": "Alice", "action_type": "bet", "amount": 40.0})
+        actions.append({"player_name": "Bob", "action_type": "call"})
+        processed = HandState(players, 1.0, 2.0).process(actions)
+        self.assertEqual(processed[-1]["street"], "flop")
+        self.assertEqual(processed[-1]["amount"], 20.0)
+        self.assertEqual(processed[-1]["pot_size"], 180.0)
+
+        with self.assertRaisesRegex(ValueError, "Player Bob is already all-in"):
+            HandState(players, 1.0, 2.0).process(
+                actions + [{"player_name": "Bob", "action_type": "check"}]
+            )
+
+    def test_phh_matches_builder(self):
+        """Test that the PHH from the walk matches PokerHandBuilder output"""
+        state = HandState(self.players, 1.0, 2.0)
+        processed = state.process(self.actions)
+
+        builder = PokerHandBuilder()
+        builder.create_game(self.players, small_blind=1.0, big_blind=2.0)
+        builder.deal_hole_cards({"Alice": "AsKh", "Bob": "QdQc"})
+        for action in processed:
+            builder.add_action(action["player_name"], action["action_type"], action["amount"])
+        builder.deal_flop("AhKd5c")
+
+        self.assertEqual(
+            state.phh({"Alice": "AsKh", "Bob": "QdQc"}, {"flop": "AhKd5c"}),
+            builder.generate_phh(),
+        )
+
+    def test_replay_recorded_in_same_pass(self):
+        """Test that the recorded frames equal a replay of the stored actions"""
+        state = HandState(self.players, 1.0, 2.0, "AhKd5c")
+        processed = state.process(self.actions)
+
+        replayed = HandState(self.players, 1.0, 2.0, "AhKd5c")
+        for action in processed:
+            replayed.replay_action(
+                action["player_name"], action["action_type"], action["amount"], action["street"]
+            )
+
+        self.assertEqual(state.steps, replayed.steps)
+        self.assertEqual(
+            [step["description"] for step in state.steps[:3]],
+            ["Hand begins", "Blinds posted: Alice ($1.0), Bob ($2.0)", "Charlie fold"],
+        )
+        flop = next(step for step in state.steps if step["street"] == "flop")
+        self.assertEqual(flop["board"], ["Ah", "Kd", "5c"])
+        self.assertEqual(state.steps[-1]["pot_size"], 20.0)
+
+    def test_record_disabled(self):
+        """Test that validation-only walks skip replay frames"""
+        state = HandState(self.players, 1.0, 2.0, record=False)
+
+        state.process(self.actions)
+
+        self.assertEqual(state.steps, [])
+
+    def test_reraise_reopens_the_street(self):
+        """Test that a re-raise keeps the street open until everyone matches it"""
+        actions = [
+            {"player_name": "Charlie", "action_type": "raise", "amount": 6.0},
+            {"player_name": "Alice", "action_type": "call"},
+            {"player_name": "Bob", "action_type": "raise", "amount": 18.0},
+            {"player_name": "Charlie", "action_type": "call"},
+            {"player_name": "Alice", "action_type": "call"},
+            {"player_name": "Bob", "action_type": "check"},
+        ]
+
+        processed = HandState(self.players, 1.0, 2.0, record=False).process(actions)
+
+        self.assertEqual(
+            [a["street"] for a in processed],
+            ["preflop"] * 5 + ["flop"],
+        )
+        self.assertEqual(processed[4]["pot_size"], 54.0)
+
+    def test_showdown_splits_between_equal_hands(self):
+        """Test that tied best hands split the pot in the result frame"""
+        players = [
+            dict(player, hole_cards=cards)
+            for player, cards in zip(self.players, ("2c3d", "4h5h", "9c9d"))
+        ]
+        actions = [
+            {"player_name": "Charlie", "action_type": "call"},
+            {"player_name": "Alice", "action_type": "call"},
+            {"player_name": "Bob", "action_type": "check"},
+            *[
+                {"player_name": name, "action_type": "check"}
+                for _ in range(2)
+                for name in ("Alice", "Bob", "Charlie")
+            ],
+            {"player_name": "Alice", "action_type": "check"},
+            {"player_name": "Bob", "action_type": "check"},
+            {"player_name": "Charlie", "action_type": "fold"},
+        ]
+        state = HandState(players, 1.0, 2.0, "AsKsQsJsTs")
+        state.process(actions)
+
+        result = state.showdown(HandEvaluator.load())
+
+        self.assertEqual(result["winners"], ["Alice", "Bob"])
+        self.assertEqual(result["pot"], 6.0)
+        self.assertEqual(result["hands"]["Alice"]["category"], "Straight Flush")
+        self.assertEqual(
+            state.steps[-1]["description"], "Alice and Bob split $6.0 with Straight Flush"
+        )
+        self.assertEqual([p["stack"] for p in state.steps[-1]["players"]], [101.0, 101.0, 148.0])
+
+    def test_split_pots(self):
+        """Test main and side pots, folded chips and an uncalled bet"""
+        # Three all-ins of different sizes plus a folded player's blind
+        pots = split_pots([15.0, 50.0, 75.0, 2.0], [True, True, True, False])
+        self.assertEqual(
+            pots,
+            [
+                {"amount": 47.0, "eligible": [0, 1, 2]},
+                {"amount": 70.0, "eligible": [1, 2]},
+                {"amount": 25.0, "eligible": [2]},
+            ],
+        )
+        # A folded player who put in more than anyone left feeds the last pot
+        self.assertEqual(
+            split_pots([10.0, 30.0, 10.0], [True, False, True]),
+            [{"amount": 50.0, "eligible": [0, 2]}],
+        )
+        self.assertEqual(
+            split_pots([1.0, 2.0, 0.0], [False, False, True]),
+            [{"amount": 3.0, "eligible": [2]}],
+        )
+        self.assertEqual(split_pots([0, 0], [True, True]), [])
+
+    def test_showdown_awards_side_pots(self):
+        """Test that the short all-in stack can only win the main pot"""
+        players = [
+            {"name": "Short", "stack": 15.0, "position": "SB", "hole_cards": "AdAc"},
+            {"name": "Big", "stack": 200.0, "position": "BB", "hole_cards": "KsQh"},
+            {"name": "Mid", "stack": 75.0, "position": "BTN", "hole_cards": "JcTd"},
+        ]
+        actions = [
+            {"player_name": "Mid", "action_type": "raise", "amount": 6.0},
+            {"player_name": "Short", "action_type": "raise", "amount": 15.0},
+            {"player_name": "Big", "action_type": "call"},
+            {"player_name": "Mid", "action_type": "call"},
+            {"player_name": "Big", "action_type": "bet", "amount": 20.0},
+            {"player_name": "Mid", "action_type": "call"},
+            *[
+                {"player_name": name, "action_type": "check"}
+                for _ in range(2)
+                for name in ("Big", "Mid")
+            ],
+        ]
+        state = HandState(players, 1.0, 2.0, "As7c2h9d3s")
+        state.process(actions)
+
+        result = state.showdown(HandEvaluator.load())
+
+        self.assertEqual(
+            [(pot["amount"], pot["eligible"], pot["winners"]) for pot in result["pots"]],
+            [(45.0, ["Short", "Big", "Mid"], ["Short"]), (40.0, ["Big", "Mid"], ["Big"])],
+        )
+        self.assertEqual(
+            result["results"],
+            {
+                "Short": {"invested": 15.0, "won": 45.0, "net": 30.0},
+                "Big": {"invested": 35.0, "won": 40.0, "net": 5.0},
+                "Mid": {"invested": 35.0, "won": 0.0, "net": -35.0},
+            },
+        )
+        self.assertEqual(
+            state.steps[-1]["description"],
+            "Short wins $45.0 with Three of a Kind; Big wins $40.0 with High Card",
+        )
+        self.assertEqual([p["stack"] for p in state.steps[-1]["players"]], [45.0, 205.0, 40.0])
+
+    def test_showdown_without_known_cards(self):
+        """Test that unknown hole cards leave the pot undecided and unrecorded"""
+        players = [dict(player, hole_cards="????") for player in self.players]
+        state = HandState(players, 1.0, 2.0, "AsKsQsJsTs")
+        state.process(
+            [
+                {"player_name": "Charlie", "action_type": "call"},
+                {"player_name": "Alice", "action_type": "call"},
+                {"player_name": "Bob", "action_type": "check"},
+            ]
+        )
+        steps = len(state.steps)
+
+        result = state.showdown(HandEvaluator.load())
+
+        self.assertEqual((result["winners"], result["hands"], result["results"]), ([], {}, {}))
+        self.assertEqual(len(state.steps), steps)
+
+    def test_count_player_stats(self):
+        """Test VPIP, PFR, 3-bet, postflop and showdown counts for one hand"""
+        actions = [
+            {"player_name": "Charlie", "action_type": "raise", "amount": 6.0},
+            {"player_name": "Alice", "action_type": "call"},
+            {"player_name": "Bob", "action_type": "raise", "amount": 18.0},
+            {"player_name": "Charlie", "action_type": "call"},
+            {"player_name": "Alice", "action_type": "fold"},
+            {"player_name": "Bob", "action_type": "bet", "amount": 20.0},
+            {"player_name": "Charlie", "action_type": "call"},
+            {"player_name": "Bob", "action_type": "check"},
+            {"player_name": "Charlie", "action_type": "check"},
+            {"player_name": "Bob", "action_type": "check"},
+            {"player_name": "Charlie", "action_type": "check"},
+        ]
+        processed = HandState(self.players, 1.0, 2.0, record=False).process(actions)
+
+        stats = count_player_stats(["Alice", "Bob", "Charlie"], processed)
+
+        fields = (
+            "hands",
+            "vpip_hands",
+            "pfr_hands",
+            "three_bet_hands",
+            "three_bet_opportunities",
+            "postflop_aggressive",
+            "postflop_calls",
+            "saw_flop_hands",
+            "showdown_hands",
+        )
+        self.assertEqual(
+            {name: tuple(counts[field] for field in fields) for name, counts in stats.items()},
+            {
+                "Alice": (1, 1, 0, 0, 1, 0, 0, 0, 0),
+                "Bob": (1, 1, 1, 1, 1, 1, 0, 1, 1),
+                "Charlie": (1, 1, 1, 0, 0, 0, 1, 1, 1),
+            },
+        )
+
+    def test_auto_folds_are_not_three_bet_opportunities(self):
+        """Test that only players who chose to fold to a single raise had the option"""
+        players = self.players + [{"name": "Dave", "stack": 100.0, "position": "CO"}]
+        actions = [
+            {"player_name": "Charlie", "action_type": "raise", "amount": 6.0},
+            {"player_name": "Alice", "action_type": "fold"},
+            {"player_name": "Bob", "action_type": "fold"},
+        ]
+        state = HandState(players, 1.0, 2.0, record=False)
+        processed = state.process(actions)
+
+        stats = count_player_stats(
+            ["Alice", "Bob", "Charlie", "Dave"], processed, state.auto_folded
+        )
+
+        self.assertEqual(state.auto_folded, ["Dave"])
+        self.assertEqual(processed[-1]["player_name"], "Dave")
+        self.assertEqual(
+            {name: counts["three_bet_opportunities"] for name, counts in stats.items()},
+            {"Alice": 1, "Bob": 1, "Charlie": 0, "Dave": 0},
+        )
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -1,3 +1,4 @@
+import gzip
 import json
 import os
 import tempfile
@@ -5,8 +6,8 @@ import unittest
 
 from flask import Flask
 
-from app import app, db
-from models import Action, Hand, Player
+from app import REPLAY_VERSION, app, db, response_cache
+from models import Action, Hand, HandReplay, Player
 
 
 class TestReplayFunctionality(unittest.TestCase):
@@ -25,6 +26,8 @@ class TestReplayFunctionality(unittest.TestCase):
 
         # Create test client
         self.client = app.test_client()
+        # Tests reuse play_ids across fresh databases, so drop cached responses
+        response_cache.clear()
 
         # Create application context and database
         with app.app_context():
@@ -285,8 +288,10 @@ class TestReplayFunctionality(unittest.TestCase):
         replay_data = json.loads(replay_response.data)
         steps = replay_data["steps"]
 
-        # Should have: initial, blinds, raise, call, intermediate(flop), bet, fold = 7 steps
-        self.assertEqual(len(steps), 7)
+        # Should have: initial, blinds, raise, call, intermediate(flop), bet, fold, result = 8 steps
+        self.assertEqual(len(steps), 8)
+        self.assertEqual(steps[-1]["description"], "Player2 wins $14.0")
+        self.assertEqual(steps[-1]["action"]["winners"], ["Player2"])
 
         # Verify specific actions
         raise_step = steps[2]  # First action after blinds
@@ -408,6 +413,176 @@ class TestReplayFunctionality(unittest.TestCase):
             if len(turn_step["board"]) > 0:
                 self.assertEqual(len(turn_step["board"]), 4)  # Flop + turn
 
+    def test_replay_timeline_is_persisted(self):
+        """Test that the replay timeline is stored when the hand is saved and reused"""
+        create_response = self.client.post("/api/create-sample")
+        play_id = json.loads(create_response.data)["play_id"]
+
+        first = self.client.get(f"/api/hands/{play_id}/replay")
+        self.assertEqual(first.status_code, 200)
+
+        with app.app_context():
+            hand = Hand.query.filter_by(play_id=play_id).first()
+            replay = HandReplay.query.filter_by(hand_id=hand.id, format="full").one()
+            self.assertEqual(replay.format, "full")
+            self.assertEqual(replay.version, REPLAY_VERSION)
+            self.assertEqual(json.loads(gzip.decompress(replay.payload)), first.get_json())
+
+            # Later requests must come from the stored bytes, not a rebuild
+            replay.payload = gzip.compress(b'{"stored": true}')
+            db.session.commit()
+
+        # The first response is cached in this worker; another worker reads the row
+        self.assertEqual(self.client.get(f"/api/hands/{play_id}/replay").get_json(), first.get_json())
+        response_cache.clear()
+        second = self.client.get(f"/api/hands/{play_id}/replay")
+        self.assertEqual(second.get_json(), {"stored": True})
+
+    def test_replay_timeline_rebuilt_for_old_version(self):
+        """Test that timelines from an older replay algorithm are rebuilt"""
+        create_response = self.client.post("/api/create-sample")
+        play_id = json.loads(create_response.data)["play_id"]
+        expected = self.client.get(f"/api/hands/{play_id}/replay").get_json()
+
+        with app.app_context():
+            replay = HandReplay.query.filter_by(format="full").one()
+            replay.version = REPLAY_VERSION - 1
+            replay.payload = gzip.compress(b'{"stale": true}')
+            db.session.commit()
+        # A version bump ships with a restart, so nothing is cached yet
+        response_cache.clear()
+
+        response = self.client.get(f"/api/hands/{play_id}/replay")
+        self.assertEqual(response.get_json(), expected)
+
+        with app.app_context():
+            self.assertEqual(
+                HandReplay.query.filter_by(format="full").one().version, REPLAY_VERSION
+            )
+
+    def test_replay_gzip_passthrough(self):
+        """Test that gzip-capable clients receive the stored bytes as-is"""
+        create_response = self.client.post("/api/create-sample")
+        play_id = json.loads(create_response.data)["play_id"]
+        plain = self.client.get(f"/api/hands/{play_id}/replay").get_json()
+
+        response = self.client.get(
+            f"/api/hands/{play_id}/replay", headers={"Accept-Encoding": "gzip"}
+        )
+        self.assertEqual(response.headers["Content-Encoding"], "gzip")
+        self.assertIn("Accept-Encoding", response.headers["Vary"])
+        self.assertEqual(json.loads(gzip.decompress(response.data)), plain)
+
+    def expand_delta(self, data):
+        """Rebuild full frames from a delta replay, mirroring the HandReplay JS class"""
+        frames = []
+        previous = {"players": [dict(p) for p in data["players"]]}
+        for delta in data["steps"]:
+            frame = {
+                field: delta.get(field, previous.get(field))
+                for field in ("step", "description", "action", "street", "pot_size", "board", "current_bet")
+            }
+            frame["players"] = [dict(p) for p in previous["players"]]
+            for index, changes in delta.get("players", {}).items():
+                frame["players"][int(index)].update(changes)
+            frames.append(frame)
+            previous = frame
+        return frames
+
+    def test_replay_delta_format_rebuilds_full_steps(self):
+        """Test that the delta format expands back to the full step list"""
+        players = [{"name": f"Player{i}", "stack": 100.0 + i} for i in range(9)]
+        hand_data = {
+            "players": players,
+            "actions": [
+                {"player_name": "Player2", "action_type": "raise", "amount": 6.0},
+                *[{"player_name": f"Player{i}", "action_type": "call"} for i in range(3, 9)],
+                {"player_name": "Player0", "action_type": "call"},
+                {"player_name": "Player1", "action_type": "call"},
+                *[{"player_name": f"Player{i}", "action_type": "check"} for i in range(9)],
+                {"player_name": "Player0", "action_type": "bet", "amount": 10.0},
+                *[{"player_name": f"Player{i}", "action_type": "call"} for i in range(1, 9)],
+            ],
+            "hole_cards": {f"Player{i}": "AsKh" for i in range(9)},
+            "flop": "AhKd5c",
+            "turn": "9s",
+            "small_blind": 1.0,
+            "big_blind": 2.0,
+        }
+        save_response = self.client.post(
+            "/api/save-hand",
+            data=json.dumps(hand_data),
+            content_type="application/json",
+        )
+        play_id = json.loads(save_response.data)["play_id"]
+
+        full = self.client.get(f"/api/hands/{play_id}/replay")
+        delta = self.client.get(f"/api/hands/{play_id}/replay?format=delta")
+        self.assertEqual(delta.status_code, 200)
+
+        full_data = full.get_json()
+        delta_data = delta.get_json()
+        self.assertEqual(delta_data["format"], "delta")
+        self.assertEqual(delta_data["total_steps"], full_data["total_steps"])
+        self.assertEqual(delta_data["meta"], full_data["meta"])
+        self.assertEqual(self.expand_delta(delta_data), full_data["steps"])
+        self.assertLess(len(delta.data) * 4, len(full.data))
+
+        with app.app_context():
+            formats = sorted(r.format for r in HandReplay.query.all())
+            self.assertEqual(formats, ["delta", "full"])
+
+    def test_replay_showdown_shows_winner(self):
+        """Test that a hand reaching the river ends with the showdown result"""
+        hand_data = {
+            "players": [
+                {"name": "Alice", "stack": 100.0},
+                {"name": "Bob", "stack": 100.0},
+            ],
+            "actions": [
+                {"player_name": "Alice", "action_type": "call"},
+                {"player_name": "Bob", "action_type": "check"},
+                *[
+                    {"player_name": name, "action_type": "check"}
+                    for _ in range(3)
+                    for name in ("Bob", "Alice")
+                ],
+            ],
+            "hole_cards": {"Alice": "AhKh", "Bob": "QsQd"},
+            "flop": "Kd7c2h",
+            "turn": "9s",
+            "river": "3c",
+        }
+        save_response = self.client.post("/api/save-hand", json=hand_data)
+        play_id = save_response.get_json()["play_id"]
+
+        steps = self.client.get(f"/api/hands/{play_id}/replay").get_json()["steps"]
+
+        result = steps[-1]
+        self.assertEqual(result["street"], "showdown")
+        self.assertEqual(result["description"], "Alice wins $4.0 with Pair")
+        self.assertEqual(
+            result["action"],
+            {
+                "type": "showdown",
+                "winners": ["Alice"],
+                "amount": 4.0,
+                "pots": [{"amount": 4.0, "winners": ["Alice"]}],
+                "hands": {"Alice": "Pair", "Bob": "Pair"},
+            },
+        )
+        self.assertEqual(result["pot_size"], 0)
+        self.assertEqual([p["stack"] for p in result["players"]], [102.0, 98.0])
+
+    def test_replay_unknown_format(self):
+        """Test that unknown replay formats are rejected"""
+        create_response = self.client.post("/api/create-sample")
+        play_id = json.loads(create_response.data)["play_id"]
+
+        response = self.client.get(f"/api/hands/{play_id}/replay?format=xml")
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("Unknown replay format", response.get_json()["error"])
+
 
 class TestReplayIntegration(unittest.TestCase):
     """Integration tests for replay functionality with existing features"""
@@ -418,6 +593,8 @@ class TestReplayIntegration(unittest.TestCase):
         app.config["SQLALCHEMY_DATABASE_URI"] = f"sqlite:///{self.db_path}"
         app.config["TESTING"] = True
         self.client = app.test_client()
+        # Tests reuse play_ids across fresh databases, so drop cached responses
+        response_cache.clear()
 
         with app.app_context():
             db.create_all()
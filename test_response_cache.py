@@ -0,0 +1,296 @@
+import gzip
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from app import (
+    HAND_RESPONSE_VERSION,
+    REPLAY_VERSION,
+    app,
+    db,
+    hand_cache_key,
+    response_cache,
+)
+from models import Hand
+from response_cache import MemoryCache, RedisCache, SQLiteCache, create_response_cache
+
+
+class CacheBackendTests:
+    """Behaviour every response cache backend must share"""
+
+    def make_cache(self, max_bytes):
+        raise NotImplementedError
+
+    def entry(self, size):
+        return {"body": b"x" * size, "mimetype": "text/html", "etag": f"etag-{size}"}
+
+    def test_round_trip(self):
+        """Test that entries come back with body, mimetype and ETag"""
+        cache = self.make_cache(max_bytes=100)
+        cache.set(("details", "hand-1"), self.entry(3))
+
+        self.assertEqual(cache.get(("details", "hand-1")), self.entry(3))
+        self.assertIsNone(cache.get(("details", "hand-2")))
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+
+    def test_evicts_least_recently_used(self):
+        """Test that the oldest unused entries go first once over budget"""
+        cache = self.make_cache(max_bytes=10)
+        cache.set(("a",), self.entry(4))
+        cache.set(("b",), self.entry(4))
+        cache.get(("a",))
+
+        cache.set(("c",), self.entry(4))
+
+        self.assertIsNone(cache.get(("b",)))
+        self.assertIsNotNone(cache.get(("a",)))
+        self.assertIsNotNone(cache.get(("c",)))
+        self.assertEqual(cache.evictions, 1)
+        self.assertEqual(cache.stats()["bytes"], 8)
+
+    def test_replacing_and_oversized_entries(self):
+        """Test byte accounting on replace, and that oversized bodies are skipped"""
+        cache = self.make_cache(max_bytes=10)
+        cache.set(("a",), self.entry(4))
+        cache.set(("a",), self.entry(6))
+        cache.set(("big",), self.entry(11))
+
+        stats = cache.stats()
+        self.assertEqual((stats["entries"], stats["bytes"]), (1, 6))
+        self.assertIsNone(cache.get(("big",)))
+
+        cache.clear()
+        stats = cache.stats()
+        self.assertEqual((stats["entries"], stats["bytes"]), (0, 0))
+
+
+class TestMemoryCache(CacheBackendTests, unittest.TestCase):
+    """Test cases for the per-worker LRU"""
+
+    def make_cache(self, max_bytes):
+        return MemoryCache(max_bytes)
+
+
+class TestSQLiteCache(CacheBackendTests, unittest.TestCase):
+    """Test cases for the shared on-disk cache"""
+
+    def setUp(self):
+        """Use a scratch cache file"""
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, "cache", "responses.db")
+
+    def tearDown(self):
+        """Clean up"""
+        shutil.rmtree(self.directory)
+
+    def make_cache(self, max_bytes):
+        return SQLiteCache(self.path, max_bytes, touch_interval=0)
+
+    def test_shared_between_instances(self):
+        """Test that a second worker, or a restarted one, sees the same entries"""
+        first = self.make_cache(max_bytes=100)
+        first.set(("replay", "hand-1", "full"), self.entry(5))
+
+        second = self.make_cache(max_bytes=100)
+
+        self.assertEqual(second.get(("replay", "hand-1", "full")), self.entry(5))
+        self.assertEqual(second.stats()["entries"], 1)
+
+    def test_running_total_matches_stored_sizes(self):
+        """Test that the kept byte total follows inserts, replaces, evictions and clears"""
+        first = self.make_cache(max_bytes=10)
+        second = self.make_cache(max_bytes=10)
+
+        def totals():
+            conn = first._connect()
+            stored = conn.execute("SELECT COALESCE(SUM(size), 0) FROM response_cache").fetchone()
+            kept = conn.execute("SELECT total FROM response_cache_usage").fetchone()
+            return stored[0], kept[0]
+
+        first.set(("a",), self.entry(4))
+        second.set(("b",), self.entry(4))
+        first.set(("a",), self.entry(2))
+        self.assertEqual(totals(), (6, 6))
+        second.set(("c",), self.entry(7))
+        self.assertEqual(totals(), (9, 9))
+        self.assertEqual(second.evictions, 1)
+
+        # A cache file from before the total was kept is seeded on open
+        conn = first._connect()
+        with conn:
+            conn.execute("DROP TABLE response_cache_usage")
+        self.make_cache(max_bytes=10)
+        self.assertEqual(totals(), (9, 9))
+
+        first.clear()
+        self.assertEqual(totals(), (0, 0))
+
+
+class TestRedisCache(unittest.TestCase):
+    """Test cases that need REDIS_URL to point at a Redis-protocol server"""
+
+    def setUp(self):
+        """Connect with a throwaway key prefix"""
+        url = os.environ.get("REDIS_URL")
+        if not url:
+            self.skipTest("REDIS_URL is not set")
+        try:
+            self.cache = RedisCache(url, max_bytes=100, prefix="jamnesia-test:")
+        except ImportError:
+            self.skipTest("redis is not installed")
+
+    def tearDown(self):
+        """Clean up"""
+        self.cache.clear()
+
+    def test_round_trip_and_stats(self):
+        """Test that entries are shared through the server and counted"""
+        entry = {"body": b"\x1f\x8b payload", "mimetype": "application/json", "etag": "1-replay-full-v1"}
+        self.cache.set(("replay", "hand-1", "full"), entry)
+
+        other_worker = RedisCache(os.environ["REDIS_URL"], max_bytes=100, prefix="jamnesia-test:")
+
+        self.assertEqual(other_worker.get(("replay", "hand-1", "full")), entry)
+        self.assertIsNone(other_worker.get(("replay", "hand-2", "full")))
+        stats = other_worker.stats()
+        self.assertEqual((stats["hits"], stats["misses"], stats["entries"]), (1, 1, 1))
+
+
+class TestCreateResponseCache(unittest.TestCase):
+    """Test cases for picking a backend from RESPONSE_CACHE_URL"""
+
+    def test_backends_by_url(self):
+        """Test the memory default, sqlite URLs and unknown schemes"""
+        self.assertIsInstance(create_response_cache("memory", 10), MemoryCache)
+        self.assertIsInstance(create_response_cache("", 10), MemoryCache)
+        with tempfile.TemporaryDirectory() as directory:
+            cache = create_response_cache(f"sqlite:///{directory}/cache.db", 10)
+            self.assertIsInstance(cache, SQLiteCache)
+            self.assertEqual(cache.path, f"{directory}/cache.db")
+        with self.assertRaises(ValueError):
+            create_response_cache("memcached://localhost", 10)
+
+
+class TestHandResponseCaching(unittest.TestCase):
+    """Test cases for ETag and Cache-Control headers on hand endpoints"""
+
+    def setUp(self):
+        """Create a hand with an empty response cache"""
+        app.config["TESTING"] = True
+        self.client = app.test_client()
+        response_cache.clear()
+
+        with app.app_context():
+            db.create_all()
+
+        response = self.client.post("/api/create-sample", json={"pattern": "standard"})
+        self.play_id = response.get_json()["play_id"]
+        with app.app_context():
+            self.hand_id = Hand.query.filter_by(play_id=self.play_id).one().id
+
+    def tearDown(self):
+        """Clean up"""
+        with app.app_context():
+            db.session.remove()
+            db.drop_all()
+
+    def test_cache_headers_and_etags(self):
+        """Test strong ETags built from hand id, endpoint and version"""
+        cases = [
+            ("", f"{self.hand_id}-hand-v{HAND_RESPONSE_VERSION}"),
+            ("/details", f"{self.hand_id}-details-v{HAND_RESPONSE_VERSION}"),
+            ("/replay-ui", f"{self.hand_id}-replay-ui-v{HAND_RESPONSE_VERSION}"),
+            ("/replay?format=delta", f"{self.hand_id}-replay-delta-v{REPLAY_VERSION}"),
+        ]
+        for url, etag in cases:
+            with self.subTest(url=url):
+                response = self.client.get(f"/api/hands/{self.play_id}{url}")
+
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(response.get_etag(), (etag, False))
+                self.assertTrue(response.cache_control.public)
+                self.assertTrue(response.cache_control.no_cache)
+                self.assertFalse(response.cache_control.immutable)
+                self.assertIsNone(response.cache_control.max_age)
+
+    def test_if_none_match_returns_304(self):
+        """Test revalidation on both a cache miss and a cache hit"""
+        url = f"/api/hands/{self.play_id}/details"
+        first = self.client.get(url)
+        etag = first.headers["ETag"]
+
+        response_cache.clear()
+        miss = self.client.get(url, headers={"If-None-Match": etag})
+        hit = self.client.get(url, headers={"If-None-Match": etag})
+
+        self.assertEqual((miss.status_code, hit.status_code), (304, 304))
+        self.assertEqual(hit.data, b"")
+        self.assertEqual(self.client.get(url).data, first.data)
+
+    def test_replay_etag_per_encoding(self):
+        """Test that gzip and identity replay bodies have different ETags"""
+        url = f"/api/hands/{self.play_id}/replay"
+        plain = self.client.get(url)
+        gzipped = self.client.get(url, headers={"Accept-Encoding": "gzip"})
+
+        self.assertEqual(gzipped.headers["Content-Encoding"], "gzip")
+        self.assertEqual(gzipped.get_etag()[0], plain.get_etag()[0] + "-gzip")
+        self.assertEqual(
+            self.client.get(url, headers={"If-None-Match": plain.headers["ETag"]}).status_code, 304
+        )
+
+    def test_version_bump_skips_stale_entries(self):
+        """Test that a persistent cache never serves bodies from an older version"""
+        cases = [
+            ("/details", "app.HAND_RESPONSE_VERSION", HAND_RESPONSE_VERSION, "details", ()),
+            ("/replay?format=delta", "app.REPLAY_VERSION", REPLAY_VERSION, "replay", ("delta",)),
+        ]
+        with tempfile.TemporaryDirectory() as directory:
+            cache = SQLiteCache(os.path.join(directory, "responses.db"), 10**6, touch_interval=0)
+            with patch("app.response_cache", cache):
+                for url, target, version, endpoint, parts in cases:
+                    with self.subTest(url=url):
+                        url = f"/api/hands/{self.play_id}{url}"
+                        fresh = self.client.get(url).data
+                        # Overwrite with a body rendered before the bump
+                        key = hand_cache_key(endpoint, self.play_id, *parts, version=version)
+                        entry = cache.get(key)
+                        entry["body"] = gzip.compress(b"{}") if endpoint == "replay" else b"stale"
+                        cache.set(key, entry)
+                        self.assertNotEqual(self.client.get(url).data, fresh)
+
+                        with patch(target, version + 1):
+                            response = self.client.get(url)
+
+                        self.assertEqual(response.data, fresh)
+                        self.assertTrue(response.get_etag()[0].endswith(f"-v{version + 1}"))
+
+    def test_missing_hand_not_cached(self):
+        """Test that 404s carry no caching headers and are not stored"""
+        response = self.client.get("/api/hands/missing/details")
+
+        self.assertEqual(response.status_code, 404)
+        self.assertIsNone(response.headers.get("ETag"))
+        self.assertEqual(response_cache.stats()["entries"], 0)
+
+    def test_cache_stats_endpoint(self):
+        """Test that the stats endpoint reports hits, misses and contents"""
+        url = f"/api/hands/{self.play_id}/details"
+        self.client.get(url)
+        self.client.get(url)
+
+        response = self.client.get("/api/cache/stats")
+
+        stats = response.get_json()
+        self.assertEqual(stats["backend"], response_cache.backend)
+        self.assertGreaterEqual(stats["hits"], 1)
+        self.assertGreaterEqual(stats["misses"], 1)
+        self.assertEqual(stats["entries"], 1)
+        self.assertIn("evictions", stats)
+        self.assertTrue(response.cache_control.no_store)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,5 +1,5 @@
 import unittest
-from app import process_hand_actions, should_advance_street
+from app import get_sample_hand_patterns, process_hand_actions, should_advance_street
 
 
 class TestStreetEdgeCases(unittest.TestCase):
@@ -59,6 +59,32 @@ class TestStreetEdgeCases(unittest.TestCase):
         alice_action = next(action for action in result if action["player_name"] == "Alice")
         self.assertEqual(alice_action["remaining_stack"], 0)  # Should be 0 after all-in
 
+        # Alice has nothing left to call with, so her short call still closes preflop
+        self.assertEqual(result[-1]["street"], "preflop")
+        more = actions + [
+            {"player_name": "Bob", "action_type": "check"},
+            {"player_name": "Charlie", "action_type": "check"},
+        ]
+        result = process_hand_actions(short_stack_players, more, self.small_blind, self.big_blind)
+        self.assertEqual([action["street"] for action in result[-2:]], ["flop", "flop"])
+
+    def test_all_in_sample_reaches_turn_and_river(self):
+        """Test that a player all-in preflop does not hold up later streets"""
+        sample = get_sample_hand_patterns()["all_in"]
+
+        result = process_hand_actions(
+            sample["players"], sample["actions"], sample["small_blind"], sample["big_blind"]
+        )
+
+        # The sample records the street each action was taken on
+        self.assertEqual(
+            [action["street"] for action in result],
+            [action["street"] for action in sample["actions"]],
+        )
+        self.assertEqual(
+            [action["street"] for action in result[-4:]], ["turn", "turn", "river", "river"]
+        )
+
     def test_single_player_remaining(self):
         """Test when only one player remains active"""
         actions = [
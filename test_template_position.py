@@ -7,7 +7,7 @@ import os
 import tempfile
 import unittest
 
-from app import app, db
+from app import app, db, response_cache
 from models import Action, Hand, Player
 
 
@@ -25,6 +25,8 @@ class TestPositionTemplateRendering(unittest.TestCase):
         app.config["TESTING"] = True
 
         self.client = app.test_client()
+        # Tests reuse play_ids across fresh databases, so drop cached responses
+        response_cache.clear()
 
         # Create application context and initialize database
         with app.app_context():